@@ -1,12 +1,67 @@
+from django import forms
 from django.contrib import admin
 
-from .models import Teacher, Room, Group, Subject, GroupSubject, TimeSlot, ScheduledPeriod
+from .models import (
+    Teacher, Room, Group, Subject, GroupSubject, TimeSlot, ScheduledPeriod, GenerationJob,
+    GenerationRun, TimetableSettings, TeacherUnavailability, RoomUnavailability,
+)
+
+
+class ScheduledPeriodForm(forms.ModelForm):
+    """Report double bookings in the active timetable as form errors."""
+
+    def clean(self):
+        cleaned_data = super().clean()
+        timeslot = cleaned_data.get("timeslot")
+        if timeslot is None:
+            return cleaned_data
+        others = ScheduledPeriod.objects.active().filter(timeslot=timeslot).exclude(pk=self.instance.pk)
+        for field in ("group", "teacher", "room"):
+            value = cleaned_data.get(field)
+            if value is not None and others.filter(**{field: value}).exists():
+                self.add_error(field, f"{value} is already booked in {timeslot}.")
+        return cleaned_data
+
+
+class ScheduledPeriodAdmin(admin.ModelAdmin):
+    """
+    Edits the active timetable only. Manual edits bypass the generator, so
+    invalidate cached timetable views here.
+    """
+
+    form = ScheduledPeriodForm
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).active()
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.version = TimetableSettings.objects.values_list("active_version", flat=True).first() or 0
+        super().save_model(request, obj, form, change)
+        TimetableSettings.bump_generation()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        TimetableSettings.bump_generation()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        TimetableSettings.bump_generation()
 
 
 admin.site.register(Teacher)
 admin.site.register(Room)
+admin.site.register(TeacherUnavailability)
+admin.site.register(RoomUnavailability)
 admin.site.register(Group)
 admin.site.register(Subject)
 admin.site.register(GroupSubject)
 admin.site.register(TimeSlot)
-admin.site.register(ScheduledPeriod)
+admin.site.register(ScheduledPeriod, ScheduledPeriodAdmin)
+admin.site.register(GenerationJob)
+
+
+@admin.register(GenerationRun)
+class GenerationRunAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'solver', 'seed', 'success', 'placed', 'total', 'duration', 'queries', 'checks')
+    readonly_fields = [field.name for field in GenerationRun._meta.fields]
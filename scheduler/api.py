@@ -0,0 +1,96 @@
+"""
+Read-only queries behind the JSON endpoints.
+
+Each query reads only the rows it answers for, through the (group,
+timeslot), (teacher, timeslot) and (room, timeslot) indexes on
+ScheduledPeriod, and returns plain dicts ready for JsonResponse. The views
+tag responses with ``TimetableSettings.generation`` so polling clients get
+304s until the timetable changes.
+"""
+from django.db.models import Q
+
+from .models import Group, Room, RoomUnavailability, ScheduledPeriod, Teacher
+from .viewmodel import DAY_NAMES, build_period_layout
+
+ENTITY_MODELS = {"group": Group, "teacher": Teacher, "room": Room}
+
+
+def parse_day(value):
+    """A day index (0 = Monday) from ``"2"`` or ``"wednesday"``; None when not given."""
+    if value in (None, ""):
+        return None
+    names = [name.lower() for name in DAY_NAMES]
+    if value.lower() in names:
+        return names.index(value.lower())
+    day = int(value) if value.isdigit() else -1
+    if not 0 <= day < len(DAY_NAMES):
+        raise ValueError(f"day must be 0-{len(DAY_NAMES) - 1} or a weekday name, got {value!r}")
+    return day
+
+
+def parse_period(value, settings):
+    """A period number within the configured day; None when not given."""
+    if value in (None, ""):
+        return None
+    period = int(value) if value.isdigit() else 0
+    if not 1 <= period <= settings.periods_per_day:
+        raise ValueError(f"period must be 1-{settings.periods_per_day}, got {value!r}")
+    return period
+
+
+def period_times(settings):
+    return {item["number"]: item["time"] for item in build_period_layout(settings) if item["type"] == "period"}
+
+
+def entity_timetable(settings, kind, name, pk, day=None, period=None):
+    """Every lesson of one group, teacher or room, in slot order."""
+    scheduled = ScheduledPeriod.objects.active().filter(**{f"{kind}_id": pk})
+    if day is not None:
+        scheduled = scheduled.filter(timeslot__day=day)
+    if period is not None:
+        scheduled = scheduled.filter(timeslot__period=period)
+    scheduled = scheduled.order_by("timeslot__day", "timeslot__period").values_list(
+        "timeslot__day", "timeslot__period", "subject__name", "group__name", "teacher__name", "room__name",
+    )
+
+    times = period_times(settings)
+    return {
+        "generation": settings.generation,
+        kind: {"id": pk, "name": name},
+        "periods": [
+            {
+                "day": DAY_NAMES[d],
+                "period": p,
+                "time": times.get(p),
+                "subject": subject,
+                "group": group,
+                "teacher": teacher,
+                "room": room,
+            }
+            for d, p, subject, group, teacher, room in scheduled
+        ],
+    }
+
+
+def free_rooms(settings, day, period, min_capacity=0):
+    """Rooms nobody uses in one slot and that are not closed then, smallest first."""
+    busy = ScheduledPeriod.objects.active().filter(
+        timeslot__day=day, timeslot__period=period, room__isnull=False,
+    ).values("room_id")
+    closed = RoomUnavailability.objects.filter(
+        Q(last_period__isnull=True) | Q(last_period__gte=period), day=day, first_period__lte=period,
+    ).values("room_id")
+    rooms = (
+        Room.objects.exclude(pk__in=busy)
+        .exclude(pk__in=closed)
+        .filter(capacity__gte=min_capacity)
+        .order_by("capacity", "name")
+        .values_list("id", "name", "capacity")
+    )
+    return {
+        "generation": settings.generation,
+        "day": DAY_NAMES[day],
+        "period": period,
+        "time": period_times(settings).get(period),
+        "rooms": [{"id": pk, "name": name, "capacity": capacity} for pk, name, capacity in rooms],
+    }
@@ -0,0 +1,169 @@
+"""
+Benchmarks of the generation, persistence and rendering hot paths.
+
+Each stage is run against fixed-seed synthetic datasets from
+scheduler.sampledata, smallest first. Wall time is the best of ``repeat``
+plain runs; query count and peak Python memory come from one extra run
+under CaptureQueriesContext and tracemalloc, so tracing overhead never
+shows up in the timings. Results are plain dicts that serialise to JSON,
+and ``compare`` diffs two such result sets to flag regressions.
+"""
+import time
+import tracemalloc
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Sum
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import views
+from .export import combined_pdf
+from .generator import generate_timetable
+from .models import GroupSubject, ScheduledPeriod, TimetableSettings
+from .persistence import replace_timetable
+from .sampledata import DEFAULT_TIGHTNESS, create_sample_data
+
+STAGES = ("generate", "persist", "home", "pdf")
+
+# Relative slow-down in wall time or peak memory tolerated by ``compare``.
+DEFAULT_TOLERANCE = 0.25
+
+
+def measure(fn, repeat=1):
+    """
+    Time ``fn`` and trace its queries and memory.
+
+    Returns ``(metrics, outcome)`` where outcome is what the traced run of
+    ``fn`` returned.
+    """
+    walls = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        walls.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            outcome = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    metrics = {
+        "wall_s": min(walls) if walls else None,
+        "wall_runs": walls,
+        "queries": len(queries),
+        "peak_kib": round(peak / 1024, 1),
+    }
+    return metrics, outcome
+
+
+def _placement():
+    placed = ScheduledPeriod.objects.active().count()
+    total = GroupSubject.objects.aggregate(total=Sum("hours_per_week"))["total"] or 0
+    return {
+        "placed": placed,
+        "total": total,
+        "placement_rate": round(placed / total, 4) if total else None,
+    }
+
+
+# --- Stages: each returns a zero-argument callable to measure ---
+def _generate_stage(seed, solver):
+    def run():
+        success, message = generate_timetable(solver=solver, seed=seed)
+        return message
+    return run
+
+
+def _persist_stage(seed, solver):
+    # Rewrite the saved timetable the way the generator's save step does.
+    fields = ("timeslot_id", "group_id", "subject_id", "teacher_id", "room_id")
+    rows = list(ScheduledPeriod.objects.active().values_list(*fields))
+
+    def run():
+        replace_timetable(ScheduledPeriod(**dict(zip(fields, row))) for row in rows)
+    return run
+
+
+def _home_stage(seed, solver):
+    # Call the view directly: the test client's "testserver" host is not in
+    # ALLOWED_HOSTS outside the test runner, and middleware is not measured.
+    request = RequestFactory().get(reverse("home"))
+
+    def run():
+        cache.clear()  # measure a cold timetable view, not a cache hit
+        response = views.home(request)
+        if response.status_code != 200:
+            raise RuntimeError(f"Home page returned HTTP {response.status_code}")
+    return run
+
+
+def _pdf_stage(seed, solver):
+    def run():
+        cache.clear()
+        return len(combined_pdf(TimetableSettings.objects.first()))
+    return run
+
+
+STAGE_RUNNERS = {
+    "generate": _generate_stage,
+    "persist": _persist_stage,
+    "home": _home_stage,
+    "pdf": _pdf_stage,
+}
+
+
+def run_benchmark(presets, stages=STAGES, seed=0, solver=None, repeat=3, tightness=DEFAULT_TIGHTNESS, report=None):
+    """
+    Load each preset's dataset in turn and measure ``stages`` against it.
+
+    Replaces all school data in the database. ``report(result)`` is called
+    after every stage. Returns the list of result dicts.
+    """
+    results = []
+    for preset in presets:
+        dataset = create_sample_data(preset, tightness=tightness, seed=seed, flush=True)
+        if "generate" not in stages:
+            generate_timetable(solver=solver, seed=seed)
+
+        for stage in stages:
+            metrics, _ = measure(STAGE_RUNNERS[stage](seed, solver), repeat=repeat)
+            result = {"dataset": preset, "stage": stage, **metrics}
+            result.update({k: dataset[k] for k in ("groups", "mappings", "hours")})
+            if stage == "generate":
+                result.update(_placement())
+            results.append(result)
+            if report:
+                report(result)
+    return results
+
+
+def compare(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """
+    Return regressions of ``current`` against ``baseline`` as readable strings.
+
+    Stages are matched on (dataset, stage). Wall time or peak memory growing
+    by more than ``tolerance``, any extra query, or a lower placement rate
+    counts as a regression.
+    """
+    before = {(r["dataset"], r["stage"]): r for r in baseline}
+    regressions = []
+    for result in current:
+        old = before.get((result["dataset"], result["stage"]))
+        if old is None:
+            continue
+        label = f"{result['dataset']}/{result['stage']}"
+        for metric in ("wall_s", "peak_kib"):
+            if old.get(metric) and result.get(metric) and result[metric] > old[metric] * (1 + tolerance):
+                regressions.append(f"{label}: {metric} {old[metric]:.3f} → {result[metric]:.3f}")
+        if result["queries"] > old["queries"]:
+            regressions.append(f"{label}: queries {old['queries']} → {result['queries']}")
+        if (old.get("placement_rate") or 0) > (result.get("placement_rate") or 0):
+            regressions.append(
+                f"{label}: placement rate {old['placement_rate']} → {result.get('placement_rate')}"
+            )
+    return regressions
@@ -0,0 +1,181 @@
+"""
+Solving a Problem as independent components.
+
+Lessons only interact through a shared group or teacher, or through the
+room pool. The lesson rows are split into the connected components of the
+group–teacher graph (groups and teachers are nodes, every group–subject
+mapping an edge); components are packed into one part per worker, the
+rooms are divided between the parts, and each part is solved on its own
+in a worker process. Hours a part could not place in its share of the
+rooms get one more pass over the whole room pool, with everything already
+placed fixed, so splitting the rooms never costs more than that pass can
+win back.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .lessons import AssignmentTable, LessonTable
+from .multistart import attempt_seeds, run_attempt
+from .scoring import soft_penalty
+from .solver import SolveResult
+
+
+def components(lessons):
+    """Lesson rows grouped by connected component of the group–teacher graph, largest (by hours) first."""
+    parent = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for group, teacher in zip(lessons.group, lessons.teacher):
+        a, b = find(("g", group)), find(("t", teacher))
+        if a != b:
+            parent[a] = b
+
+    rows_of = {}
+    for row, group in enumerate(lessons.group):
+        rows_of.setdefault(find(("g", group)), []).append(row)
+    hours = lessons.hours
+    return sorted(rows_of.values(), key=lambda rows: -sum(hours[row] for row in rows))
+
+
+def pack(parts_rows, hours, n_parts):
+    """Pack components into at most ``n_parts`` parts, each into the part with the fewest hours so far."""
+    parts = [[] for _ in range(min(n_parts, len(parts_rows)))]
+    load = [0] * len(parts)
+    for rows in parts_rows:  # largest first
+        p = load.index(min(load))
+        parts[p].extend(rows)
+        load[p] += sum(hours[row] for row in rows)
+    return parts
+
+
+def split_rooms(problem, parts):
+    """
+    Give every room to one part; returns the room positions (into ``problem.rooms``) of each part.
+
+    Rooms are handed out largest first. Each one goes to a part still
+    short of rooms, preferring one whose largest unseated group only this
+    room or a bigger one can seat, then the part with the most hours left
+    unseated; a room is counted as seating the part's biggest lessons in
+    every slot it is open. Rooms left over once every part is seated go to the
+    part with the fewest room-hours per lesson hour.
+    """
+    lessons, sizes = problem.lessons, problem.group_sizes
+    periods = len(problem.slots)
+    every = (1 << periods) - 1
+    capacities = problem.capacities or (0,) * len(problem.rooms)
+
+    # Per part: [size, hours] still unseated, biggest groups first.
+    queues, totals = [], []
+    for rows in parts:
+        by_size = {}
+        for row in rows:
+            size = sizes.get(lessons.group[row], 0) if problem.capacities else 0
+            by_size[size] = by_size.get(size, 0) + lessons.hours[row]
+        queues.append([[size, by_size[size]] for size in sorted(by_size, reverse=True)])
+        totals.append(sum(by_size.values()))
+
+    assigned = [[] for _ in parts]
+    for i in reversed(range(len(capacities))):
+        capacity = capacities[i]
+        smaller = capacities[i - 1] if i else -1
+        best, best_key = None, None
+        for p, queue in enumerate(queues):
+            while queue and queue[0][0] > capacity:
+                queue.pop(0)  # no room from here down seats it; left to the final pass
+            if queue:
+                key = (1, queue[0][0] > smaller, sum(hours for _, hours in queue))
+            else:
+                key = (0, 0, totals[p] / ((len(assigned[p]) + 1) * periods))
+            if best_key is None or key > best_key:
+                best, best_key = p, key
+        assigned[best].append(i)
+
+        left = periods - (problem.room_blocked.get(problem.rooms[i], 0) & every).bit_count()
+        queue = queues[best]
+        while queue and left:
+            used = min(left, queue[0][1])
+            queue[0][1] -= used
+            left -= used
+            if not queue[0][1]:
+                queue.pop(0)
+    return assigned
+
+
+def subproblem(problem, rows, room_positions):
+    """The part of ``problem`` made of lesson ``rows`` and the rooms at ``room_positions``."""
+    table = LessonTable()
+    for row in rows:
+        table.add(problem.lessons.group[row], problem.lessons.subject[row], problem.lessons.teacher[row],
+                  problem.lessons.hours[row])
+    rooms = [problem.rooms[i] for i in room_positions]
+    capacities = [problem.capacities[i] for i in room_positions] if problem.capacities is not None else None
+    sizes = {g: problem.group_sizes[g] for g in set(table.group) if g in problem.group_sizes}
+    return problem.replace(lessons=table, rooms=rooms, capacities=capacities, group_sizes=sizes)
+
+
+def solve_decomposed(problem, solver=None, seed=None, workers=None, progress=None, **options):
+    """
+    Solve ``problem`` part by part across up to ``workers`` processes and merge the results.
+
+    Falls back to a single solve when there is one component, one worker
+    or fixed cells (incremental runs already solve only a small diff).
+    ``progress(done, parts)`` is called as parts finish. The result is a
+    SolveResult over the rows of ``problem.lessons`` with ``components``,
+    ``parts`` and ``largest_part`` hours added to its stats.
+    """
+    workers = workers or os.cpu_count() or 1
+    seed = attempt_seeds(seed, 1)[0]
+    found = components(problem.lessons)
+    if len(found) < 2 or workers < 2 or problem.fixed:
+        result = run_attempt(problem, solver, seed, progress, **options)
+        result.stats["components"] = len(found)
+        return result
+
+    lessons = problem.lessons
+    parts = pack(found, lessons.hours, workers)
+    rooms = split_rooms(problem, parts)
+    seeds = attempt_seeds(seed, len(parts))
+
+    placements = AssignmentTable()
+    unplaced = []
+    stats = {}
+
+    def merge(rows, result):
+        for sub_row, slot, room in result.placements:
+            placements.append(rows[sub_row], slot, room)
+        unplaced.extend((rows[sub_row], hours, reason) for sub_row, hours, reason in result.unplaced)
+        for name, value in result.stats.items():
+            stats[name] = stats.get(name, 0) + value
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(parts))) as pool:
+        futures = {
+            pool.submit(run_attempt, subproblem(problem, rows, rooms[p]), solver, seeds[p], None, **options): p
+            for p, rows in enumerate(parts)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            merge(parts[futures[future]], future.result())
+            if progress:
+                progress(done, len(parts))
+
+    if unplaced:
+        # One more pass for the leftovers over every room, with the merged placements fixed.
+        rows = [row for row, _, _ in unplaced]
+        leftover = LessonTable()
+        for row, hours, _ in unplaced:
+            leftover.add(lessons.group[row], lessons.subject[row], lessons.teacher[row], hours)
+        fixed = list(problem.cells(placements))
+        unplaced.clear()
+        merge(rows, run_attempt(problem.replace(lessons=leftover, fixed=fixed), solver, seeds[0], None, **options))
+
+    largest = max(sum(lessons.hours[row] for row in rows) for rows in parts)
+    stats.update(components=len(found), parts=len(parts), largest_part=largest)
+    result = SolveResult(placements, unplaced, stats)
+    result.seed = seeds[0]
+    result.penalty = soft_penalty(problem, placements)
+    return result
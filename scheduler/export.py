@@ -0,0 +1,218 @@
+"""
+PDF export of the timetable, one document per group, teacher or room.
+
+Each entity's timetable is rendered on its own, from plain names read with
+one ordered query, so documents can be built in parallel in a process pool
+and handed out one at a time. Rendered bytes are cached per entity under
+``TimetableSettings.generation`` and are never re-rendered until the
+timetable changes. The combined download joins every entity into a single
+PDF; the ZIP download streams per-entity PDFs as they finish, so memory
+stays bounded by a few documents whatever the size of the school.
+"""
+import hashlib
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import groupby
+
+from django.core.cache import cache
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import landscape, A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+from .models import ScheduledPeriod
+from .viewmodel import CACHE_TIMEOUT, DAY_NAMES, build_period_layout
+
+# kind -> (heading label, entity name field, the three lines shown in a cell)
+EXPORT_KINDS = {
+    "group": ("Group", "group__name", ("subject__name", "teacher__name", "room__name")),
+    "teacher": ("Teacher", "teacher__name", ("subject__name", "group__name", "room__name")),
+    "room": ("Room", "room__name", ("subject__name", "group__name", "teacher__name")),
+}
+
+# Rendered documents kept in flight per worker; bounds memory while streaming.
+PENDING_PER_WORKER = 2
+
+
+def iter_entity_grids(kind):
+    """
+    Yield ``(name, grid)`` for every entity of ``kind`` with lessons, in name order.
+
+    ``grid[day][period]`` is a tuple of the three cell lines. Rows are read
+    with a server-side iterator and grouped as they arrive, so only one
+    entity's grid is held at a time.
+    """
+    _, name_field, line_fields = EXPORT_KINDS[kind]
+    rows = (
+        ScheduledPeriod.objects.active()
+        .filter(**{f"{name_field}__isnull": False})
+        .values_list(name_field, "timeslot__day", "timeslot__period", *line_fields)
+        .order_by(name_field, "timeslot__day", "timeslot__period")
+        .iterator(chunk_size=2000)
+    )
+    for name, entity_rows in groupby(rows, key=lambda row: row[0]):
+        grid = {}
+        for _, day, period, *lines in entity_rows:
+            grid.setdefault(day, {})[period] = tuple(line or "-" for line in lines)
+        yield name, grid
+
+
+def _entity_table(grid, layout, cell_style):
+    data = [["Period", "Time"] + DAY_NAMES]
+    span_rows = []
+
+    for item in layout:
+        if item["type"] == "break":
+            data.append([item["emoji"], item["time"], item["name"]] + [""] * (len(DAY_NAMES) - 1))
+            span_rows.append(len(data) - 1)
+            continue
+        row = [str(item["number"]), item["time"]]
+        for day in range(len(DAY_NAMES)):
+            lines = grid.get(day, {}).get(item["number"])
+            row.append(Paragraph("<br/>".join(lines), cell_style) if lines else "-")
+        data.append(row)
+
+    table = Table(data, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#1976d2")),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+    ]))
+
+    # Merge (SPAN) break rows to align properly across columns
+    for row_index in span_rows:
+        table.setStyle(TableStyle([
+            ('SPAN', (2, row_index), (-1, row_index)),
+            ('BACKGROUND', (0, row_index), (-1, row_index), colors.HexColor("#FFF3CD")),
+            ('TEXTCOLOR', (0, row_index), (-1, row_index), colors.HexColor("#795548")),
+            ('ALIGN', (0, row_index), (-1, row_index), 'CENTER'),
+        ]))
+    return table
+
+
+def render_pdf(title, sections, layout):
+    """
+    Render ``sections`` — ``(heading, grid)`` pairs — into one PDF and return its bytes.
+
+    Takes and returns plain data only, so it can run in a worker process.
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), title=title)
+    styles = getSampleStyleSheet()
+    cell_style = ParagraphStyle(name='cell', fontSize=9, leading=10, alignment=1)
+    elements = [Paragraph(title, styles["Title"]), Spacer(1, 12)]
+    for heading, grid in sections:
+        elements.append(Paragraph(f"<b>{heading}</b>", styles["Heading2"]))
+        elements.append(_entity_table(grid, layout, cell_style))
+        elements.append(Spacer(1, 20))
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def _render_entity(kind, name, grid, layout):
+    label = EXPORT_KINDS[kind][0]
+    return render_pdf(f"{label}: {name}", [(name, grid)], layout)
+
+
+def _cache_key(settings, kind, name=None):
+    # Entity names may hold spaces or other characters some cache backends reject.
+    suffix = f":{hashlib.md5(str(name).encode()).hexdigest()}" if name is not None else ""
+    return f"scheduler:pdf:{settings.pk}:{settings.generation}:{kind}{suffix}"
+
+
+def _collect(name, key, pending):
+    """Resolve a queued document: cached bytes as-is, a finished render into the cache."""
+    if isinstance(pending, bytes):
+        return name, pending
+    pdf = pending.result()
+    cache.set(key, pdf, CACHE_TIMEOUT)
+    return name, pdf
+
+
+def iter_entity_pdfs(settings, kind, workers=None):
+    """
+    Yield ``(name, pdf_bytes)`` for every entity of ``kind``, in name order.
+
+    Cached documents are reused; the rest are rendered in a process pool
+    (or in this process with one worker) with at most
+    ``PENDING_PER_WORKER`` documents per worker queued ahead of the consumer.
+    """
+    layout = build_period_layout(settings)
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pending = deque()
+    try:
+        for name, grid in iter_entity_grids(kind):
+            key = _cache_key(settings, kind, name)
+            pdf = cache.get(key)
+            if pool is None:
+                if pdf is None:
+                    pdf = _render_entity(kind, name, grid, layout)
+                    cache.set(key, pdf, CACHE_TIMEOUT)
+                yield name, pdf
+                continue
+            if pdf is None:
+                pdf = pool.submit(_render_entity, kind, name, grid, layout)
+            pending.append((name, key, pdf))
+            while len(pending) > workers * PENDING_PER_WORKER:
+                yield _collect(*pending.popleft())
+        while pending:
+            yield _collect(*pending.popleft())
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+
+def combined_pdf(settings, kind="group"):
+    """
+    One PDF with every entity of ``kind``, cached for the current generation.
+
+    Every grid and the rendered document are held in memory at once; use
+    ``stream_zip`` when that matters.
+    """
+    key = _cache_key(settings, kind)
+    pdf = cache.get(key)
+    if pdf is None:
+        sections = list(iter_entity_grids(kind))
+        pdf = render_pdf("Automatic Timetable", sections, build_period_layout(settings))
+        cache.set(key, pdf, CACHE_TIMEOUT)
+    return pdf
+
+
+class _ZipStream:
+    """Write-only sink for ZipFile; ``drain()`` hands out what was written since the last call."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(settings, kind="group", workers=None):
+    """Yield a ZIP archive of per-entity PDFs chunk by chunk."""
+    sink = _ZipStream()
+    # PDF content streams are already compressed; storing avoids a second pass.
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, pdf in iter_entity_pdfs(settings, kind, workers):
+            archive.writestr(f"{kind}/{_safe_filename(name)}.pdf", pdf)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _safe_filename(name):
+    return "".join(c if c.isalnum() or c in " -_." else "_" for c in str(name)).strip() or "unnamed"
@@ -0,0 +1,157 @@
+"""
+Pre-solve feasibility checks.
+
+Necessary conditions every timetable must meet, checked over a Problem in
+one pass over its lessons plus a sort of rooms and group sizes, so a run
+that cannot succeed is stopped before the solver starts:
+
+- the lessons of the busiest possible period fit in the rooms;
+- every group fits in some room, and the groups of each size (and larger)
+  fit in the room-hours of the rooms big enough for them;
+- no teacher teaches more hours than the periods they are available for,
+  and no group attends more hours than the week has periods;
+- every mapping taught in blocks has room for its blocks in the week, given
+  the block length, the periods in a day and its per-day limit.
+
+Passing the checks does not guarantee a full timetable; failing any one
+of them rules it out. Already-placed (``fixed``) cells count against the
+same limits, and a room's closed slots are taken off its room-hours.
+"""
+from bisect import bisect_left
+from collections import Counter
+
+from .models import Group, Teacher
+
+
+def issue(check, pk=None, need=0, have=0, size=None):
+    """``check`` is teacher_load, group_load, peak, group_room, capacity or blocks; ``pk`` the teacher or group."""
+    return {"check": check, "id": pk, "need": need, "have": have, "size": size}
+
+
+def check_feasibility(problem):
+    """Return the violated conditions, empty when there are none: room shortages first, then overloads, worst first."""
+    lessons = problem.lessons
+    periods = len(problem.slots)
+    issues = []
+
+    teacher_load, group_load, group_demand = Counter(), Counter(), Counter()
+    for group, teacher, hours in zip(lessons.group, lessons.teacher, lessons.hours):
+        teacher_load[teacher] += hours
+        group_load[group] += hours
+        group_demand[group] += hours
+    for group, _, teacher, _, _ in problem.fixed:
+        teacher_load[teacher] += 1
+        group_load[group] += 1
+
+    rooms = len(problem.rooms)
+    total = lessons.total_hours() + len(problem.fixed)
+    if total > periods * rooms:
+        issues.append(issue("peak", need=-(-total // periods), have=rooms))
+
+    if problem.capacities is not None and group_demand:
+        issues.extend(_capacity_issues(problem, group_demand, periods))
+
+    every = (1 << periods) - 1
+    available = {
+        pk: periods - (problem.teacher_blocked.get(pk, 0) & every).bit_count() for pk in teacher_load
+    }
+    for check, load, have in (
+        ("teacher_load", teacher_load, available),
+        ("group_load", group_load, dict.fromkeys(group_load, periods)),
+    ):
+        over = [(hours, pk) for pk, hours in load.items() if hours > have[pk]]
+        issues.extend(issue(check, pk, hours, have[pk]) for hours, pk in sorted(over, reverse=True))
+
+    if problem.blocks:
+        issues.extend(_block_issues(problem))
+    return issues
+
+
+def _block_issues(problem):
+    """Mappings with more blocks than fit in the week (fixed hours of the mapping included)."""
+    lessons = problem.lessons
+    fixed = Counter((group, subject) for group, subject, _, _, _ in problem.fixed)
+    issues = []
+    for group, subject, hours in zip(lessons.group, lessons.subject, lessons.hours):
+        if (group, subject) not in problem.blocks:
+            continue
+        length, per_day = problem.block_of(group, subject)
+        a_day = problem.periods_per_day // length
+        if per_day:
+            a_day = min(a_day, per_day)
+        need, have = (hours + fixed[group, subject]) // length, problem.days * a_day
+        if need > have:
+            issues.append(issue("blocks", group, need, have, size=length))
+    return issues
+
+
+def _capacity_issues(problem, group_demand, periods):
+    """Groups no room seats, then size tiers whose demand exceeds the free room-hours big enough for them."""
+    capacities = problem.capacities  # sorted, smallest first
+    largest = capacities[-1] if capacities else 0
+    sizes = problem.group_sizes
+    issues = []
+
+    by_size = Counter()
+    for group, hours in group_demand.items():
+        size = sizes.get(group, 0)
+        if size > largest:
+            issues.append(issue("group_room", group, size, largest))
+        else:
+            by_size[size] += hours
+
+    room_capacity = dict(zip(problem.rooms, capacities))
+    fixed_capacities = sorted(room_capacity.get(room, 0) for _, _, _, _, room in problem.fixed)
+    # closed[i]: room-hours closed in rooms i and up.
+    every = (1 << periods) - 1
+    closed = [0] * (len(capacities) + 1)
+    for i in reversed(range(len(capacities))):
+        closed[i] = closed[i + 1] + (problem.room_blocked.get(problem.rooms[i], 0) & every).bit_count()
+
+    # Walk sizes from the largest down: the demand of every group at least this big
+    # must fit in the rooms seating this many, less the cells fixed or closed there.
+    demand = 0
+    for size in sorted(by_size, reverse=True):
+        demand += by_size[size]
+        first = bisect_left(capacities, size)
+        taken = len(fixed_capacities) - bisect_left(fixed_capacities, size)
+        free = periods * (len(capacities) - first) - taken - closed[first]
+        if demand > free:
+            issues.append(issue("capacity", need=demand, have=free, size=size))
+    return issues
+
+
+def describe_issues(issues, limit=5):
+    """One sentence per issue, with teacher and group names; at most ``limit`` plus a count of the rest."""
+    teachers = Teacher.objects.in_bulk({i["id"] for i in issues[:limit] if i["check"] == "teacher_load"})
+    groups = Group.objects.in_bulk(
+        {i["id"] for i in issues[:limit] if i["check"] in ("group_load", "group_room", "blocks")}
+    )
+    details = []
+    for item in issues[:limit]:
+        check, need, have = item["check"], item["need"], item["have"]
+        if check == "teacher_load":
+            name = teachers[item["id"]].name
+            details.append(f"Teacher '{name}' has {need} hours a week but is available for only {have} periods")
+        elif check == "group_load":
+            name = groups[item["id"]].name
+            details.append(f"Group '{name}' needs {need} hours a week but there are only {have} periods")
+        elif check == "blocks":
+            name = groups[item["id"]].name
+            details.append(
+                f"Group '{name}' needs {need} blocks of {item['size']} periods of one subject "
+                f"but only {have} fit in the week"
+            )
+        elif check == "peak":
+            details.append(f"Lessons need at least {need} rooms in some period but there are only {have} rooms")
+        elif check == "group_room":
+            name = groups[item["id"]].name
+            details.append(f"Group '{name}' has {need} students but the largest room seats {have}")
+        else:
+            details.append(
+                f"Groups of {item['size']}+ students need {need} room-hours in rooms seating {item['size']}+, "
+                f"which have only {have} free"
+            )
+    if len(issues) > limit:
+        details.append(f"... and {len(issues) - limit} more")
+    return "; ".join(details)
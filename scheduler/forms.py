@@ -61,13 +61,21 @@ class RoomForm(forms.ModelForm):
 class GroupSubjectForm(forms.ModelForm):
     class Meta:
         model = GroupSubject
-        fields = ['group', 'hours_per_week']
+        fields = ['group', 'hours_per_week', 'block_length', 'blocks_per_day']
         widgets = {
             'group': forms.Select(attrs={'class': 'form-control'}),
             'hours_per_week': forms.NumberInput(attrs={
                 'class': 'form-control',
                 'placeholder': 'Hours per week (e.g. 3)',
             }),
+            'block_length': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'Periods per block (2 for a double lab)',
+            }),
+            'blocks_per_day': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'Most blocks per day (blank = no limit)',
+            }),
         }
 
 
@@ -1,99 +1,422 @@
+import logging
+import time
+from collections import Counter
+
 from django.db import transaction
-from .models import TimeSlot, GroupSubject, ScheduledPeriod, Room, TimetableSettings
-import random
+from .models import (
+    ScheduledPeriod, TimetableSettings,
+    Group, Subject, Teacher, GenerationRun,
+)
+from .feasibility import check_feasibility, describe_issues
+from .instrumentation import RunReport
+from .lessons import LessonTable
+from .decompose import solve_decomposed
+from .multistart import solve_multistart, solve_until
+from .optimizer import improve
+from .persistence import SAVE_BATCH_SIZE, active_version, replace_timetable
+from .problem import ProblemError
+from .snapshot import load_problem
+from .solver import DEFAULT_SOLVER
+from .warmstart import fixed_cells, repair, saved_positions
+
+logger = logging.getLogger(__name__)
+
+# Unplaced lesson rows named in a run report.
+UNPLACED_DETAIL = 20
 
 
-def generate_timetable(days=5, periods_per_day=None):
+def generate_timetable(days=5, periods_per_day=None, solver=None, seed=None, incremental=False,
+                       progress=None, attempts=1, workers=None, optimize=0, report=None, record=False,
+                       batch_size=SAVE_BATCH_SIZE, decompose=False, time_budget=None, warm_start=False):
     """
     Generate timetable dynamically for all groups, based on user-defined settings.
     Ensures no conflicts between groups, teachers, and rooms.
+
+    ``solver`` names an engine from ``scheduler.solver.SOLVERS`` (defaults to
+    the backtracking engine); ``seed`` makes a run reproducible. With
+    ``incremental`` the saved timetable is kept where still valid, only the
+    new or invalidated lesson hours are placed and just the diff is written.
+    ``warm_start`` is incremental too, but seeds the solver with where each
+    re-placed hour was saved and, when new lessons do not fit around the
+    kept periods, moves as few of those as it can to make room (see
+    scheduler.warmstart).
+    ``progress(placed, total)`` is called as lesson hours get placed.
+
+    With ``attempts`` > 1 that many seeded attempts are solved across up to
+    ``workers`` processes (default: every core) and only the best one, by
+    hours placed and then soft-constraint penalty, is saved. ``optimize``
+    gives a time budget in seconds for a simulated-annealing pass that
+    lowers the soft-constraint penalty before saving. With ``decompose`` (and
+    a single attempt) groups and teachers that never share a lesson are
+    solved as separate parts across the ``workers`` processes, each with its
+    own share of the rooms (see scheduler.decompose).
+
+    ``time_budget`` (seconds, from the start of the run) makes the run
+    anytime: the search is cut off when the budget runs out and the best
+    assignment found so far is saved, complete or not. Time left after a
+    complete solve (a single attempt restarts with new seeds until one is
+    complete) goes to the improvement pass, capped by ``optimize`` when
+    that is given. Loading and saving are not cut short.
+    ``run.timed_out`` tells whether the budget ended the search; the
+    returned success flag tells whether the timetable is complete.
+
+    A full run writes the new timetable beside the saved one,
+    ``batch_size`` rows per statement, and then switches readers over in
+    one step (see scheduler.persistence); an incremental run applies its
+    diff in one transaction.
+
+    Runs that the pre-solve checks in scheduler.feasibility rule out stop
+    before solving and save nothing.
+
+    Every run is profiled into a RunReport (time and queries per step,
+    solver counters, seed, unplaced hours). It is logged, passed to
+    ``report(run)`` when given and, with ``record``, saved as a
+    GenerationRun.
     """
+    incremental = incremental or warm_start
+    run = RunReport(solver=solver or DEFAULT_SOLVER, seed=seed, incremental=incremental)
+    with run.tracking():
+        success, message = _generate(
+            run, days, periods_per_day, solver, seed, incremental, progress, attempts, workers, optimize,
+            batch_size, decompose, time_budget, warm_start,
+        )
+    run.success, run.message = success, message
+
+    logger.info("Timetable generation %s: %s", "succeeded" if success else "failed", run.summary())
+    for item in run.unplaced:
+        logger.warning(
+            "Unplaced: %s / %s (%s) ×%s: %s",
+            item["group"], item["subject"], item["teacher"], item["hours"], item["reason"],
+        )
+    if record:
+        GenerationRun.objects.create(
+            solver=run.solver,
+            seed=run.seed,
+            incremental=incremental,
+            success=success,
+            placed=run.placed,
+            total=run.total,
+            duration=run.duration,
+            queries=run.queries,
+            checks=run.checks,
+            message=message,
+            report=run.to_dict(),
+        )
+    if report:
+        report(run)
+    return success, message
+
+
+def _generate(run, days, periods_per_day, solver, seed, incremental, progress, attempts, workers, optimize,
+              batch_size, decompose, time_budget, warm_start):
+    deadline = time.monotonic() + time_budget if time_budget else None
 
-    # --- Step 1: Get timetable settings ---
-    settings = TimetableSettings.objects.first()
-    if settings:
-        periods_per_day = settings.periods_per_day
-    if not periods_per_day:
-        periods_per_day = 6  # fallback
-
-    # --- Step 2: Ensure timeslots exist for all days/periods ---
-    timeslots = []
-    for day in range(days):
-        for p in range(1, periods_per_day + 1):
-            ts, _ = TimeSlot.objects.get_or_create(day=day, period=p)
-            timeslots.append(ts)
-
-    if not timeslots:
-        return False, "No timeslots available."
-
-    # --- Step 3: Gather lessons from group–subject mappings ---
-    lessons = []
-    mappings = GroupSubject.objects.select_related('group', 'subject', 'subject__teacher').all()
-    for gs in mappings:
-        teacher = gs.subject.teacher
-        if not teacher:
-            return False, f"Subject '{gs.subject.name}' has no teacher assigned (group {gs.group.name})."
-        for _ in range(gs.hours_per_week):
-            lessons.append({
-                'group': gs.group,
-                'subject': gs.subject,
-                'teacher': teacher,
-            })
-
-    if not lessons:
-        return False, "No group-subject mappings found. Add subjects and groups first."
-
-    # --- Step 4: Prepare resources ---
-    rooms = list(Room.objects.all())
-    if not rooms:
-        return False, "No rooms found. Please add at least one room."
-
-    random.shuffle(lessons)
-    random.shuffle(timeslots)
-    random.shuffle(rooms)
-
-    # --- Step 5: Conflict trackers ---
-    slot_group = {ts.id: set() for ts in timeslots}
-    slot_teacher = {ts.id: set() for ts in timeslots}
-    slot_room = {ts.id: set() for ts in timeslots}
-
-    assignments = []
-
-    # --- Step 6: Assign lessons to timeslots ---
-    for lesson in lessons:
-        assigned = False
-        random.shuffle(timeslots)
-        for ts in timeslots:
-            sid = ts.id
-            random.shuffle(rooms)
-            for room in rooms:
-                if (
-                    lesson['group'].id not in slot_group[sid]
-                    and lesson['teacher'].id not in slot_teacher[sid]
-                    and room.id not in slot_room[sid]
-                ):
-                    assignments.append({
-                        'timeslot': ts,
-                        'group': lesson['group'],
-                        'subject': lesson['subject'],
-                        'teacher': lesson['teacher'],
-                        'room': room,
-                    })
-                    slot_group[sid].add(lesson['group'].id)
-                    slot_teacher[sid].add(lesson['teacher'].id)
-                    slot_room[sid].add(room.id)
-                    assigned = True
-                    break
-            if assigned:
-                break
-
-    # --- Step 7: Save to database atomically ---
-    with transaction.atomic():
-        ScheduledPeriod.objects.all().delete()
-        ScheduledPeriod.objects.bulk_create([ScheduledPeriod(**a) for a in assignments])
-
-    # --- Step 8: Return result ---
-    if assignments:
-        return True, f"✅ Timetable generated successfully with {len(assignments)} scheduled periods ({periods_per_day} per day)."
+    # --- Step 1: Load the problem snapshot (settings, timeslots, lessons, rooms) ---
+    run.step("load")
+    try:
+        problem = load_problem(days, periods_per_day)
+    except ProblemError as e:
+        return False, str(e)
+    lessons, periods_per_day = problem.lessons, problem.periods_per_day
+
+    # --- Step 2: Pin still-valid periods (incremental mode) ---
+    demand, pinned, stale = lessons, [], []
+    hints, released = None, []
+    if incremental:
+        run.step("pin")
+        demand, pinned, stale = pin_existing(problem)
+        problem = problem.replace(lessons=demand, fixed=fixed_cells(pinned))
+        if warm_start:
+            hints = saved_positions(stale)
+    fixed = problem.fixed
+
+    # --- Step 3: Rule out impossible instances before searching ---
+    run.step("check")
+    total = lessons.total_hours()
+    run.issues = check_feasibility(problem)
+    if run.issues:
+        run.total = total
+        return False, "❌ The timetable cannot be completed: " + describe_issues(run.issues) + "."
+
+    # --- Step 4: Solve placement ---
+    run.step("solve")
+    def report_progress(done, of):
+        # Hours placed for a single attempt, finished attempts otherwise.
+        progress(len(fixed) + (total - len(fixed)) * done // max(of, 1), total)
+
+    if progress:
+        progress(len(fixed), total)
+    on_progress = report_progress if progress else None
+    if decompose and attempts == 1:
+        result = solve_decomposed(
+            problem, solver, seed=seed, workers=workers, progress=on_progress, deadline=deadline, hints=hints
+        )
+    elif deadline and attempts == 1:
+        result = solve_until(problem, deadline, solver, seed=seed, progress=on_progress, hints=hints)
     else:
-        return False, "⚠️ Could not generate timetable — try adding more rooms, teachers, or reducing weekly hours."
+        result = solve_multistart(
+            problem, solver, seed=seed, attempts=attempts, workers=workers, progress=on_progress,
+            deadline=deadline, hints=hints,
+        )
+    if warm_start and not result.complete and pinned:
+        # Make room by moving kept periods around what did not fit.
+        run.step("repair")
+        problem, repaired, released = repair(problem, result, pinned, solver, result.seed, hints, deadline)
+        repaired.seed, repaired.stats["released"] = result.seed, len(released)
+        result, demand, fixed = repaired, problem.lessons, problem.fixed
+        stale = stale + released
+    placements = result.placements
+    run.seed = result.seed
+    run.solver_stats = result.stats
+    run.timed_out = bool(result.stats.get("timed_out"))
+
+    # --- Step 5: Improve soft constraints (optional, or whatever the time budget leaves) ---
+    if deadline:
+        left = max(deadline - time.monotonic(), 0)
+        optimize = min(optimize, left) if optimize else left
+    if optimize and placements:
+        run.step("optimize")
+        placements, penalty_before, penalty_after = improve(
+            problem, placements, optimize, seed=result.seed, anchors=saved_positions(stale) if warm_start else None
+        )
+
+    # --- Step 6: Save to database (readers never see a half-written timetable) ---
+    run.step("save")
+    if incremental:
+        with transaction.atomic():
+            changes = save_diff(demand, placements, stale)
+            TimetableSettings.bump_generation()
+    else:
+        replace_timetable(
+            (
+                ScheduledPeriod(
+                    timeslot_id=slot_id,
+                    group_id=demand.group[row],
+                    subject_id=demand.subject[row],
+                    teacher_id=demand.teacher[row],
+                    room_id=room_id,
+                )
+                for row, slot_id, room_id in placements
+            ),
+            batch_size=batch_size,
+        )
+
+    # --- Step 7: Return result ---
+    run.step("report")
+    placed = len(fixed) + len(placements)
+    run.placed, run.total = placed, total
+    if progress:
+        progress(placed, total)
+    if result.unplaced:
+        run.unplaced = name_unplaced(demand, result.unplaced, limit=UNPLACED_DETAIL)
+        return False, (
+            (f"⏱️ Time limit of {time_budget:g}s reached; saved the best timetable found. " if run.timed_out else "")
+            + f"⚠️ Placed {placed} of {total} periods; {total - placed} could not be placed — "
+            + describe_unplaced(demand, result.unplaced, named=run.unplaced)
+        )
+    summary = f"✅ Timetable generated successfully with {placed} scheduled periods ({periods_per_day} per day)."
+    if incremental:
+        summary += (
+            f" Kept {len(fixed) + changes['unchanged']}, added {changes['inserted']}, moved {changes['updated']}, "
+            f"removed {changes['deleted']}."
+        )
+        if released:
+            summary += f" Re-solved {len(released)} kept periods to make room."
+    if attempts > 1:
+        summary += f" Best of {attempts} attempts (seed {result.seed}, penalty {result.penalty['total']})."
+    if optimize and placements:
+        summary += f" Soft penalty improved {penalty_before['total']} → {penalty_after['total']}."
+    return True, summary
+
+
+def pin_existing(problem):
+    """
+    Split the lesson demand of ``problem`` into periods already saved and still valid, and the rest.
+
+    A saved period stays pinned while its mapping still exists with the same
+    teacher, its slot and room still exist, the room still seats the group,
+    neither the teacher nor the room is unavailable in the slot, its mapping
+    is not over its weekly hours and it clashes with no other pinned period.
+    Mappings with block rules are pinned a whole block at a time: the block's
+    periods must run back to back in one room on one day, each valid as
+    above, within the per-day limit. Returns the remaining
+    demand as a LessonTable, the pinned periods and the stale periods, both
+    as ``(id, group_id, subject_id, timeslot_id, teacher_id, room_id)``.
+    """
+    lessons = problem.lessons
+    row_of = {(lessons.group[row], lessons.subject[row]): row for row in range(len(lessons))}
+    position = problem.slot_index
+    room_capacity = dict(zip(problem.rooms, problem.capacities))
+    pinned = [0] * len(lessons)
+    day_blocks = Counter()
+    taken = set()
+    pinned_periods, stale = [], []
+
+    def valid(pk, slot_id, group_id, subject_id, teacher_id, room_id):
+        blocked = problem.teacher_blocked.get(teacher_id, 0) | problem.room_blocked.get(room_id, 0)
+        return (
+            teacher_id == lessons.teacher[row_of[group_id, subject_id]]
+            and slot_id in position
+            and not blocked >> position[slot_id] & 1
+            and room_id in room_capacity
+            and room_capacity[room_id] >= problem.group_sizes.get(group_id, 0)
+        )
+
+    existing = ScheduledPeriod.objects.active().order_by('id').values_list(
+        'id', 'timeslot_id', 'group_id', 'subject_id', 'teacher_id', 'room_id'
+    )
+    units, ruled = [], {}
+    for period in existing:
+        key = period[2], period[3]
+        if key in row_of and key in problem.blocks and period[1] in position:
+            ruled.setdefault(key, []).append(period)
+        else:
+            units.append([period])
+    for key, periods in ruled.items():
+        units.extend(saved_blocks(periods, problem.block_of(*key)[0], position, problem.periods_per_day))
+
+    for unit in units:
+        _, slot_id, group_id, subject_id, _, _ = unit[0]
+        row = row_of.get((group_id, subject_id))
+        cells = [
+            cell
+            for _, slot_id, group_id, _, teacher_id, room_id in unit
+            for cell in (('g', slot_id, group_id), ('t', slot_id, teacher_id), ('r', slot_id, room_id))
+        ]
+        length, per_day = problem.block_of(group_id, subject_id)
+        day = position[slot_id] // problem.periods_per_day if slot_id in position else None
+        if (
+            row is not None
+            and len(unit) == length
+            and all(valid(*period) for period in unit)
+            and pinned[row] + length <= lessons.hours[row]
+            and not (per_day and day_blocks[row, day] >= per_day)
+            and not any(cell in taken for cell in cells)
+        ):
+            pinned[row] += length
+            day_blocks[row, day] += 1
+            taken.update(cells)
+            target = pinned_periods
+        else:
+            target = stale
+        target.extend(
+            (pk, group_id, subject_id, slot_id, teacher_id, room_id)
+            for pk, slot_id, group_id, subject_id, teacher_id, room_id in unit
+        )
+
+    remaining = LessonTable()
+    for row in range(len(lessons)):
+        left = lessons.hours[row] - pinned[row]
+        if left:
+            remaining.add(lessons.group[row], lessons.subject[row], lessons.teacher[row], left)
+    return remaining, pinned_periods, stale
+
+
+def saved_blocks(periods, length, position, periods_per_day):
+    """
+    Cut one mapping's saved periods into candidate blocks of ``length``.
+
+    Periods are chained while they follow each other in the same room on
+    the same day; each chain is cut into ``length``-long pieces, and a
+    shorter leftover piece comes back as it is (it cannot be pinned).
+    """
+    ordered = sorted(periods, key=lambda p: (p[5] or 0, position[p[1]]))
+    chains = []
+    for period in ordered:
+        if chains:
+            last = chains[-1][-1]
+            at, previous = position[period[1]], position[last[1]]
+            if period[5] == last[5] and at == previous + 1 and at // periods_per_day == previous // periods_per_day:
+                chains[-1].append(period)
+                continue
+        chains.append([period])
+    return [chain[i:i + length] for chain in chains for i in range(0, len(chain), length)]
+
+
+def save_diff(demand, placements, stale):
+    """
+    Write new placements over the stale periods of the active timetable instead of rewriting it.
+
+    A placement identical to a stale period (a warm start putting a period
+    back where it was) leaves that row alone. Otherwise a stale period of
+    the same mapping is moved (UPDATE) onto a new placement when its target
+    group, teacher and room cells are not still held by a stale row, so no
+    intermediate state trips the unique constraints; leftover stale periods
+    are deleted and leftover placements inserted.
+    """
+    same = {}
+    for pk, group_id, subject_id, slot_id, teacher_id, room_id in stale:
+        same.setdefault((group_id, subject_id, slot_id, teacher_id, room_id), []).append(pk)
+    unchanged, moving = set(), []
+    for row, slot_id, room_id in placements:
+        pks = same.get((demand.group[row], demand.subject[row], slot_id, demand.teacher[row], room_id))
+        if pks:
+            unchanged.add(pks.pop())
+        else:
+            moving.append((row, slot_id, room_id))
+
+    movable = {}
+    occupied = set()
+    for pk, group_id, subject_id, slot_id, teacher_id, room_id in stale:
+        if pk in unchanged:
+            continue
+        movable.setdefault((group_id, subject_id), []).append(pk)
+        occupied.update((('g', slot_id, group_id), ('t', slot_id, teacher_id), ('r', slot_id, room_id)))
+
+    version = active_version()
+    updates, inserts = [], []
+    for row, slot_id, room_id in moving:
+        group_id, subject_id = demand.group[row], demand.subject[row]
+        period = ScheduledPeriod(
+            timeslot_id=slot_id,
+            group_id=group_id,
+            subject_id=subject_id,
+            teacher_id=demand.teacher[row],
+            room_id=room_id,
+            version=version,
+        )
+        candidates = movable.get((group_id, subject_id))
+        targets = (('g', slot_id, group_id), ('t', slot_id, period.teacher_id), ('r', slot_id, room_id))
+        if candidates and not any(cell in occupied for cell in targets):
+            period.id = candidates.pop()
+            updates.append(period)
+        else:
+            inserts.append(period)
+
+    deleted = [pk for pks in movable.values() for pk in pks]
+    ScheduledPeriod.objects.filter(id__in=deleted).delete()
+    ScheduledPeriod.objects.bulk_update(updates, ['timeslot', 'teacher', 'room'])
+    ScheduledPeriod.objects.bulk_create(inserts)
+    return {
+        'unchanged': len(unchanged), 'inserted': len(inserts), 'updated': len(updates), 'deleted': len(deleted),
+    }
+
+
+def name_unplaced(lessons, unplaced, limit=5):
+    """The first ``limit`` unplaced lesson rows as dicts of names, hours and reason."""
+    rows = [row for row, _, _ in unplaced[:limit]]
+    groups = Group.objects.in_bulk({lessons.group[row] for row in rows})
+    subjects = Subject.objects.in_bulk({lessons.subject[row] for row in rows})
+    teachers = Teacher.objects.in_bulk({lessons.teacher[row] for row in rows})
+    return [
+        {
+            "group": groups[lessons.group[row]].name,
+            "subject": subjects[lessons.subject[row]].name,
+            "teacher": teachers[lessons.teacher[row]].name,
+            "hours": hours,
+            "reason": reason,
+        }
+        for row, hours, reason in unplaced[:limit]
+    ]
+
+
+def describe_unplaced(lessons, unplaced, limit=5, named=None):
+    """Name the first few lesson rows the solver left unplaced (``named`` reuses name_unplaced output)."""
+    named = (named or name_unplaced(lessons, unplaced, limit))[:limit]
+    details = [
+        f"{item['group']} / {item['subject']} ({item['teacher']}) ×{item['hours']}: {item['reason']}"
+        for item in named
+    ]
+    if len(unplaced) > limit:
+        details.append(f"... and {len(unplaced) - limit} more")
+    return "; ".join(details)
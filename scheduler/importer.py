@@ -0,0 +1,261 @@
+"""
+Bulk import of teachers, rooms, groups, subjects and group–subject mappings.
+
+Files are read row by row (CSV with a header line, or JSON Lines with one
+object per line), validated, and upserted in chunks with
+``bulk_create(update_conflicts=...)`` keyed by name (by group and subject
+for mappings). Names in subject and mapping rows are resolved to ids with
+in-memory maps loaded once per kind. A bad row is skipped and reported
+with its line number; the rest of the file is still imported.
+
+Kinds are imported in dependency order inside one transaction, so a single
+call can load teachers and the subjects that name them. Columns:
+
+    teachers  name
+    rooms     name, capacity
+    groups    name, size
+    subjects  name, teacher (a teacher name; blank leaves it unassigned)
+    mappings  group, subject, hours_per_week, block_length (default 1),
+              blocks_per_day (blank = no limit)
+"""
+import csv
+import io
+import itertools
+import json
+
+from django.db import transaction
+
+from .models import Group, GroupSubject, Room, Subject, Teacher, TimetableSettings
+from .persistence import INSERT_BATCH_SIZE
+
+# Dependency order: subjects name teachers, mappings name groups and subjects.
+IMPORT_KINDS = ("teachers", "rooms", "groups", "subjects", "mappings")
+
+# Errors kept for the report; later ones are only counted.
+MAX_ERRORS = 200
+
+
+class RowError(ValueError):
+    """A row that cannot be imported."""
+
+
+class FileError(ValueError):
+    """A file that cannot be read at all."""
+
+
+class ImportReport:
+    """Rows read, imported and rejected per kind, with the first errors."""
+
+    def __init__(self):
+        self.counts = {}
+        self.errors = []  # [{"kind", "line", "error"}]
+        self.error_count = 0
+        self.dry_run = False
+
+    def count(self, kind, field, n=1):
+        counts = self.counts.setdefault(kind, {"read": 0, "imported": 0, "rejected": 0})
+        counts[field] += n
+
+    def reject(self, kind, line, error):
+        self.count(kind, "rejected")
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"kind": kind, "line": line, "error": str(error)})
+
+    @property
+    def imported(self):
+        return sum(c["imported"] for c in self.counts.values())
+
+    def to_dict(self):
+        return {
+            "dry_run": self.dry_run,
+            "counts": self.counts,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+    def summary(self):
+        parts = ", ".join(f"{c['imported']} {kind}" for kind, c in self.counts.items())
+        return f"Imported {parts or 'nothing'}; {self.error_count} rejected."
+
+
+# --- Reading ---
+def read_rows(stream, name=""):
+    """
+    Yield ``(line, row dict)`` from a text or binary file.
+
+    ``.jsonl``/``.ndjson``/``.json`` files are read as JSON Lines (a
+    ``.json`` file holding one top-level array is loaded whole); anything
+    else as CSV with a header line.
+    """
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if name.lower().endswith((".jsonl", ".ndjson", ".json")):
+        yield from _read_json(stream)
+    else:
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {k.strip().lower(): v for k, v in row.items() if k}
+
+
+def _read_json(stream):
+    first = stream.readline()
+    if first.lstrip().startswith("["):
+        try:
+            rows = json.loads(first + stream.read())
+        except ValueError as e:
+            raise FileError(f"Invalid JSON: {e}")
+        for line, row in enumerate(rows, 1):
+            yield line, row
+        return
+    for line, text in enumerate(itertools.chain([first], stream), 1):
+        if not text.strip():
+            continue
+        try:
+            yield line, json.loads(text)
+        except ValueError as e:
+            yield line, RowError(f"Invalid JSON: {e}")
+
+
+# --- Validation ---
+def _text(row, field, required=True, max_length=100):
+    value = row.get(field)
+    value = "" if value is None else str(value).strip()
+    if required and not value:
+        raise RowError(f"'{field}' is required.")
+    if len(value) > max_length:
+        raise RowError(f"'{field}' is longer than {max_length} characters.")
+    return value
+
+
+def _positive(row, field, default):
+    value = row.get(field)
+    if value in (None, ""):
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise RowError(f"'{field}' must be a whole number, got {value!r}.")
+    if number < 1:
+        raise RowError(f"'{field}' must be at least 1, got {number}.")
+    return number
+
+
+class Importer:
+    """Upserts rows of each kind; name → id maps are loaded on first use."""
+
+    def __init__(self, report):
+        self.report = report
+        self._ids = {}
+
+    def ids(self, model):
+        if model not in self._ids:
+            self._ids[model] = dict(model.objects.values_list("name", "id"))
+        return self._ids[model]
+
+    def resolve(self, model, name, field):
+        try:
+            return self.ids(model)[name]
+        except KeyError:
+            raise RowError(f"Unknown {field} '{name}'.")
+
+    # Each builder turns a row into (unique key, unsaved instance).
+    def build_teachers(self, row):
+        name = _text(row, "name")
+        return name, Teacher(name=name)
+
+    def build_rooms(self, row):
+        name = _text(row, "name", max_length=50)
+        return name, Room(name=name, capacity=_positive(row, "capacity", 30))
+
+    def build_groups(self, row):
+        name = _text(row, "name")
+        return name, Group(name=name, size=_positive(row, "size", 30))
+
+    def build_subjects(self, row):
+        name = _text(row, "name")
+        teacher = _text(row, "teacher", required=False)
+        teacher_id = self.resolve(Teacher, teacher, "teacher") if teacher else None
+        return name, Subject(name=name, teacher_id=teacher_id)
+
+    def build_mappings(self, row):
+        group_id = self.resolve(Group, _text(row, "group"), "group")
+        subject_id = self.resolve(Subject, _text(row, "subject"), "subject")
+        hours = _positive(row, "hours_per_week", 3)
+        block_length = _positive(row, "block_length", 1)
+        if hours % block_length:
+            raise RowError(f"'hours_per_week' ({hours}) must be a multiple of 'block_length' ({block_length}).")
+        return (group_id, subject_id), GroupSubject(
+            group_id=group_id, subject_id=subject_id, hours_per_week=hours,
+            block_length=block_length, blocks_per_day=_positive(row, "blocks_per_day", None),
+        )
+
+    UPSERTS = {
+        "teachers": (Teacher, {"ignore_conflicts": True}),
+        "rooms": (Room, {"update_conflicts": True, "unique_fields": ["name"], "update_fields": ["capacity"]}),
+        "groups": (Group, {"update_conflicts": True, "unique_fields": ["name"], "update_fields": ["size"]}),
+        "subjects": (Subject, {"update_conflicts": True, "unique_fields": ["name"], "update_fields": ["teacher"]}),
+        "mappings": (GroupSubject, {
+            "update_conflicts": True, "unique_fields": ["group", "subject"],
+            "update_fields": ["hours_per_week", "block_length", "blocks_per_day"],
+        }),
+    }
+
+    def import_rows(self, kind, rows):
+        build = getattr(self, f"build_{kind}")
+        model, options = self.UPSERTS[kind]
+        chunk = {}
+        for line, row in rows:
+            self.report.count(kind, "read")
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                if not isinstance(row, dict):
+                    raise RowError("Expected an object with named fields.")
+                key, obj = build(row)
+            except RowError as e:
+                self.report.reject(kind, line, e)
+                continue
+            # A repeated key within a chunk would hit the same row twice in one upsert; the last one wins.
+            chunk[key] = obj
+            if len(chunk) >= INSERT_BATCH_SIZE:
+                self._flush(kind, model, options, chunk)
+        self._flush(kind, model, options, chunk)
+        # Later kinds must see the ids of rows just inserted.
+        self._ids.pop(model, None)
+
+    def _flush(self, kind, model, options, chunk):
+        if chunk:
+            model.objects.bulk_create(chunk.values(), **options)
+            self.report.count(kind, "imported", len(chunk))
+            chunk.clear()
+
+
+def import_data(files, dry_run=False):
+    """
+    Import ``{kind: (file, filename)}`` in dependency order; return an ImportReport.
+
+    Everything runs in one transaction; ``dry_run`` validates and writes,
+    then rolls back. Cached problem snapshots and timetable views are
+    invalidated once at the end.
+    """
+    unknown = set(files) - set(IMPORT_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown import kind(s): {', '.join(sorted(unknown))}.")
+
+    report = ImportReport()
+    report.dry_run = dry_run
+    importer = Importer(report)
+    with transaction.atomic():
+        for kind in IMPORT_KINDS:
+            if kind in files:
+                stream, name = files[kind]
+                try:
+                    importer.import_rows(kind, read_rows(stream, name))
+                except (UnicodeDecodeError, csv.Error, FileError) as e:
+                    report.reject(kind, None, f"Unreadable file {name}: {e}")
+        if dry_run:
+            transaction.set_rollback(True)
+        elif report.imported:
+            TimetableSettings.bump_data_version()
+    return report
@@ -0,0 +1,109 @@
+"""
+Per-step profiling of a timetable generation run.
+
+A RunReport splits a run into named steps and records, for each one, the
+wall time plus the number and total time of the database queries it made.
+Queries are counted with a connection execute wrapper, so this works with
+DEBUG off. The generator adds the solver's counters (candidate checks,
+nodes, backtracks), the seed, and the hours placed and left unplaced.
+"""
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+class RunReport:
+    """Structured account of one generate_timetable call."""
+
+    def __init__(self, solver=None, seed=None, incremental=False):
+        self.solver = solver
+        self.seed = seed
+        self.incremental = incremental
+        self.steps = []
+        self.solver_stats = {}
+        self.placed = 0
+        self.total = 0
+        self.unplaced = []  # [{"group", "subject", "teacher", "hours", "reason"}]
+        self.issues = []  # feasibility violations, see scheduler.feasibility
+        self.timed_out = False  # the time budget ended the search
+        self.success = None
+        self.message = ""
+        self.duration = 0.0
+        self._current = None
+        self._step_started = None
+
+    # --- collection ---
+    @contextmanager
+    def tracking(self):
+        """Record steps and queries made inside the block."""
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(self._count_query):
+                yield self
+        finally:
+            self._close_step()
+            self.duration = time.perf_counter() - started
+
+    def step(self, name):
+        """End the current step and start timing ``name``."""
+        self._close_step()
+        self._current = {"name": name, "seconds": 0.0, "queries": 0, "query_seconds": 0.0}
+        self._step_started = time.perf_counter()
+
+    def _close_step(self):
+        if self._current is not None:
+            self._current["seconds"] = time.perf_counter() - self._step_started
+            self.steps.append(self._current)
+            self._current = None
+
+    def _count_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if self._current is not None:
+                self._current["queries"] += 1
+                self._current["query_seconds"] += time.perf_counter() - started
+
+    # --- results ---
+    @property
+    def queries(self):
+        return sum(step["queries"] for step in self.steps)
+
+    @property
+    def query_seconds(self):
+        return sum(step["query_seconds"] for step in self.steps)
+
+    @property
+    def checks(self):
+        return self.solver_stats.get("checks", 0)
+
+    def to_dict(self):
+        return {
+            "solver": self.solver,
+            "seed": self.seed,
+            "incremental": self.incremental,
+            "success": self.success,
+            "placed": self.placed,
+            "total": self.total,
+            "duration": round(self.duration, 4),
+            "queries": self.queries,
+            "query_seconds": round(self.query_seconds, 4),
+            "solver_stats": self.solver_stats,
+            "steps": [
+                dict(step, seconds=round(step["seconds"], 4), query_seconds=round(step["query_seconds"], 4))
+                for step in self.steps
+            ],
+            "unplaced": self.unplaced,
+            "issues": self.issues,
+            "timed_out": self.timed_out,
+        }
+
+    def summary(self):
+        """One line for logs."""
+        steps = ", ".join(f"{s['name']} {s['seconds']:.3f}s/{s['queries']}q" for s in self.steps)
+        return (
+            f"placed {self.placed}/{self.total} in {self.duration:.3f}s "
+            f"({self.queries} queries, {self.checks} checks, seed {self.seed}): {steps}"
+        )
@@ -0,0 +1,110 @@
+"""
+Background timetable generation.
+
+Generation runs on a single worker thread instead of inside the request.
+Each run is a GenerationJob row, so any process can poll its progress.
+A unique constraint allows one queued or running job at a time, so a new
+job is only claimed when no other job is active, across every web
+process and the ``generate_timetable`` command; otherwise the active job
+is returned, and two regenerations never rewrite the timetable at the
+same time.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .generator import generate_timetable
+from .models import GenerationJob
+
+# An active job whose heartbeat is older than this is treated as dead
+# (e.g. the worker process was restarted mid-run). Running jobs beat on
+# every progress write, so only runs that stopped progressing time out.
+STALE_AFTER = timedelta(minutes=15)
+
+# Progress (and the heartbeat) is written to the job row at most this often (seconds).
+PROGRESS_INTERVAL = 0.5
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="timetable")
+_start_lock = threading.Lock()
+
+
+def claim_generation_job(incremental=False, status=GenerationJob.QUEUED):
+    """
+    Insert an active GenerationJob unless one exists; returns ``(job, created)``.
+
+    An active job with no heartbeat for STALE_AFTER is marked failed first. When
+    another process claims a job at the same moment, the unique constraint
+    lets only one insert through and the other gets that job back.
+    """
+    with _start_lock:
+        GenerationJob.objects.filter(
+            status__in=GenerationJob.ACTIVE, heartbeat_at__lt=timezone.now() - STALE_AFTER,
+        ).update(
+            status=GenerationJob.FAILED, success=False, message="Abandoned: no progress for too long.",
+            finished_at=timezone.now(),
+        )
+        while True:
+            try:
+                with transaction.atomic():
+                    return GenerationJob.objects.create(incremental=incremental, status=status), True
+            except IntegrityError:
+                active = GenerationJob.objects.filter(status__in=GenerationJob.ACTIVE).first()
+                if active:  # else it finished in between; try again
+                    return active, False
+
+
+def start_generation_job(**options):
+    """
+    Queue a generation run in the background and return its GenerationJob.
+
+    ``options`` are passed to ``generate_timetable``. If another job is
+    already queued or running, that job is returned instead and nothing new
+    is queued; ``job.created`` tells the two cases apart.
+    """
+    job, created = claim_generation_job(options.get('incremental', False))
+    job.created = created
+    if created:
+        # Submit only once the job row is committed so the worker can see it.
+        _executor.submit(run_generation_job, job.pk, options)
+    return job
+
+
+def run_generation_job(job_id, options):
+    """
+    Run ``generate_timetable(**options)`` for a claimed job, recording progress and outcome on it.
+
+    Returns ``(success, message)``; errors are caught and recorded as a
+    failed job. The run is saved as a GenerationRun unless ``options``
+    say ``record=False``.
+    """
+    close_old_connections()
+    GenerationJob.objects.filter(pk=job_id).update(
+        status=GenerationJob.RUNNING, started_at=timezone.now(), heartbeat_at=timezone.now()
+    )
+    last_write = 0.0
+
+    def progress(placed, total):
+        nonlocal last_write
+        now = time.monotonic()
+        if now - last_write >= PROGRESS_INTERVAL or placed == total:
+            last_write = now
+            GenerationJob.objects.filter(pk=job_id).update(placed=placed, total=total, heartbeat_at=timezone.now())
+
+    try:
+        success, message = generate_timetable(progress=progress, **{'record': True, **options})
+        status = GenerationJob.DONE
+    except Exception as e:
+        success, message = False, f"Error generating timetable: {e}"
+        status = GenerationJob.FAILED
+
+    try:
+        GenerationJob.objects.filter(pk=job_id).update(
+            status=status, success=success, message=message, finished_at=timezone.now()
+        )
+    finally:
+        connection.close()
+    return success, message
@@ -0,0 +1,61 @@
+"""
+Compact lesson demand and assignment tables.
+
+A LessonTable holds one row per group-subject mapping as parallel integer
+arrays (group id, subject id, teacher id, hours per week) instead of one dict
+of model instances per lesson hour. An AssignmentTable holds placed lesson
+hours the same way. Model instances are only built when saving.
+"""
+from array import array
+
+
+class LessonTable:
+    """Lesson demand: one row per mapping, ``hours`` is the multiplicity."""
+
+    __slots__ = ("group", "subject", "teacher", "hours")
+
+    def __init__(self):
+        self.group = array("q")
+        self.subject = array("q")
+        self.teacher = array("q")
+        self.hours = array("l")
+
+    def add(self, group_id, subject_id, teacher_id, hours):
+        self.group.append(group_id)
+        self.subject.append(subject_id)
+        self.teacher.append(teacher_id)
+        self.hours.append(hours)
+
+    def __len__(self):
+        return len(self.group)
+
+    def total_hours(self):
+        return sum(self.hours)
+
+    def units(self):
+        """Yield the row index once per lesson hour."""
+        for row, hours in enumerate(self.hours):
+            for _ in range(hours):
+                yield row
+
+
+class AssignmentTable:
+    """Placed lesson hours: LessonTable row, slot key and room key."""
+
+    __slots__ = ("row", "slot", "room")
+
+    def __init__(self):
+        self.row = array("l")
+        self.slot = array("q")
+        self.room = array("q")
+
+    def append(self, row, slot, room):
+        self.row.append(row)
+        self.slot.append(slot)
+        self.room.append(room)
+
+    def __len__(self):
+        return len(self.row)
+
+    def __iter__(self):
+        return zip(self.row, self.slot, self.room)
@@ -0,0 +1,60 @@
+# scheduler/management/commands/benchmark_lessons.py
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from scheduler.lessons import LessonTable
+from scheduler.models import Group, Subject, Teacher, GroupSubject
+
+
+def _legacy_lessons(groups, subjects, hours):
+    """Per-hour lesson dicts, built the way the old Step 3 did it."""
+    lessons = []
+    for g in range(groups):
+        for s in range(subjects):
+            # select_related() builds fresh instances for every mapping row.
+            teacher = Teacher(id=s + 1, name=f"Teacher {s}")
+            subject = Subject(id=g * subjects + s + 1, name=f"Subject {g}-{s}", teacher=teacher)
+            gs = GroupSubject(group=Group(id=g + 1, name=f"Group {g}"), subject=subject, hours_per_week=hours)
+            for _ in range(gs.hours_per_week):
+                lessons.append({'group': gs.group, 'subject': gs.subject, 'teacher': teacher})
+    return lessons
+
+
+def _compact_lessons(groups, subjects, hours):
+    lessons = LessonTable()
+    for g in range(groups):
+        for s in range(subjects):
+            lessons.add(g + 1, g * subjects + s + 1, s + 1, hours)
+    return lessons
+
+
+def _peak(build, *args):
+    tracemalloc.start()
+    result = build(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+class Command(BaseCommand):
+    help = "Compare peak memory of per-hour lesson dicts against the compact LessonTable"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--groups', type=int, default=500)
+        parser.add_argument('--subjects', type=int, default=8)
+        parser.add_argument('--hours', type=int, default=4)
+
+    def handle(self, *args, **options):
+        groups, subjects, hours = options['groups'], options['subjects'], options['hours']
+        self.stdout.write(
+            f"{groups} groups × {subjects} subjects × {hours} h = {groups * subjects * hours} lesson hours"
+        )
+
+        legacy = _peak(_legacy_lessons, groups, subjects, hours)
+        compact = _peak(_compact_lessons, groups, subjects, hours)
+
+        self.stdout.write(f"per-hour dicts: {legacy / 1024:,.0f} KiB")
+        self.stdout.write(f"LessonTable:    {compact / 1024:,.0f} KiB")
+        self.stdout.write(self.style.SUCCESS(f"reduction: {legacy / max(compact, 1):.0f}×"))
@@ -0,0 +1,88 @@
+# scheduler/management/commands/benchmark_timetable.py
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from scheduler.benchmark import DEFAULT_TOLERANCE, STAGES, compare, run_benchmark
+from scheduler.models import Group, Teacher
+from scheduler.sampledata import DEFAULT_TIGHTNESS, PRESETS
+from scheduler.solver import DEFAULT_SOLVER, SOLVERS
+
+
+class Command(BaseCommand):
+    help = "Benchmark timetable generation, persistence, the home page and PDF export on synthetic datasets"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--presets', nargs='+', choices=sorted(PRESETS), default=['small-school', 'college'],
+            help="Datasets to run, in order (see create_sample_data)",
+        )
+        parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--solver', choices=sorted(SOLVERS), default=DEFAULT_SOLVER)
+        parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage; the best is reported")
+        parser.add_argument('--tightness', type=float, default=DEFAULT_TIGHTNESS)
+        parser.add_argument('--output', metavar='FILE', help="Write results as JSON")
+        parser.add_argument('--compare', metavar='FILE', help="Fail on regressions against an earlier --output")
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+        parser.add_argument(
+            '--flush', action='store_true',
+            help="Allow replacing existing school data (every dataset is loaded into the database)",
+        )
+
+    def handle(self, *args, **options):
+        if not options['flush'] and (Group.objects.exists() or Teacher.objects.exists()):
+            raise CommandError("The benchmark replaces all school data; pass --flush to allow it.")
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1.")
+
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)['results']
+
+        self.stdout.write(
+            f"{'dataset':<14}{'stage':<10}{'wall s':>9}{'queries':>9}{'peak KiB':>11}{'placed':>9}"
+        )
+
+        def report(result):
+            rate = result.get('placement_rate')
+            self.stdout.write(
+                f"{result['dataset']:<14}{result['stage']:<10}{result['wall_s']:>9.3f}"
+                f"{result['queries']:>9}{result['peak_kib']:>11,.0f}"
+                f"{'' if rate is None else f'{rate:.1%}':>9}"
+            )
+
+        results = run_benchmark(
+            options['presets'], stages=options['stages'], seed=options['seed'], solver=options['solver'],
+            repeat=options['repeat'], tightness=options['tightness'], report=report,
+        )
+
+        if options['output']:
+            meta = {
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'seed': options['seed'],
+                'solver': options['solver'],
+                'repeat': options['repeat'],
+                'tightness': options['tightness'],
+                'python': sys.version.split()[0],
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'machine': platform.platform(),
+            }
+            with open(options['output'], 'w') as f:
+                json.dump({'meta': meta, 'results': results}, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+
+        if baseline is not None:
+            regressions = compare(baseline, results, options['tolerance'])
+            if regressions:
+                for line in regressions:
+                    self.stdout.write(self.style.ERROR(line))
+                raise CommandError(f"{len(regressions)} regression(s) against {options['compare']}.")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}."))
@@ -1,8 +1,65 @@
 # scheduler/management/commands/create_sample_data.py
-from django.core.management.base import BaseCommand
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scheduler.models import Group, Teacher
+from scheduler.sampledata import DEFAULT_PRESET, DEFAULT_TIGHTNESS, PRESETS, create_sample_data
+
 
 class Command(BaseCommand):
-    help = "Test command"
+    help = "Load a seeded synthetic school (teachers, rooms, groups, subjects, mappings) for demos and load tests"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=sorted(PRESETS), default=DEFAULT_PRESET)
+        parser.add_argument(
+            '--tightness', type=float, default=DEFAULT_TIGHTNESS,
+            help="Lesson demand as a share of slot × room supply (1.0 fills every room every period)",
+        )
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--groups', type=int, default=None, help="Override the preset's group count")
+        parser.add_argument('--teachers', type=int, default=None, help="Override the preset's teacher count")
+        parser.add_argument('--rooms', type=int, default=None, help="Override the preset's room count")
+        parser.add_argument('--subjects-per-group', type=int, default=None)
+        parser.add_argument('--periods', type=int, default=None, help="Periods per day (updates the settings)")
+        parser.add_argument(
+            '--departments', type=int, default=None,
+            help="Split groups and teachers into departments that share only the rooms",
+        )
+        parser.add_argument(
+            '--flush', action='store_true',
+            help="Delete existing teachers, rooms, groups, subjects and the saved timetable first",
+        )
 
     def handle(self, *args, **options):
-        self.stdout.write(self.style.SUCCESS("create_sample_data command is working!"))
+        if not 0 < options['tightness'] <= 1.5:
+            raise CommandError("--tightness must be above 0 and at most 1.5.")
+        for field in ('groups', 'teachers', 'rooms', 'subjects_per_group', 'periods', 'departments'):
+            if options[field] is not None and options[field] < 1:
+                raise CommandError(f"--{field.replace('_', '-')} must be at least 1.")
+        if not options['flush'] and (Group.objects.exists() or Teacher.objects.exists()):
+            raise CommandError("Data already exists; pass --flush to replace it.")
+
+        started = time.perf_counter()
+        stats = create_sample_data(
+            preset=options['preset'],
+            tightness=options['tightness'],
+            seed=options['seed'],
+            flush=options['flush'],
+            groups=options['groups'],
+            teachers=options['teachers'],
+            rooms=options['rooms'],
+            subjects_per_group=options['subjects_per_group'],
+            periods=options['periods'],
+            departments=options['departments'],
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {stats['teachers']} teachers, {stats['rooms']} rooms, {stats['groups']} groups, "
+            f"{stats['subjects']} subjects and {stats['mappings']} mappings in {elapsed:.2f}s."
+        ))
+        self.stdout.write(
+            f"Demand {stats['hours']} lesson hours for {stats['supply']} slot × room cells "
+            f"(tightness {stats['tightness']:.2f})."
+        )
@@ -1,6 +1,14 @@
 # scheduler/management/commands/generate_timetable.py
-from django.core.management.base import BaseCommand
-from scheduler.generator import generate_timetable
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from scheduler.feasibility import check_feasibility, describe_issues
+from scheduler.jobs import claim_generation_job, run_generation_job
+from scheduler.models import GenerationJob
+from scheduler.persistence import SAVE_BATCH_SIZE
+from scheduler.problem import ProblemError
+from scheduler.snapshot import load_problem
+from scheduler.solver import SOLVERS, DEFAULT_SOLVER
 
 class Command(BaseCommand):
     help = "Generate a timetable using the scheduler.generator logic"
@@ -8,16 +16,105 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('--days', type=int, default=5)
         parser.add_argument('--periods', type=int, default=6)
+        parser.add_argument('--solver', choices=sorted(SOLVERS), default=DEFAULT_SOLVER)
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--attempts', type=int, default=1, help="Seeded attempts to run; the best one is saved")
+        parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+        parser.add_argument(
+            '--optimize', type=float, default=0, metavar='SECONDS',
+            help="Time budget for the soft-constraint improvement pass (0 disables it)",
+        )
+        parser.add_argument(
+            '--time-limit', type=float, default=None, metavar='SECONDS',
+            help="Stop searching after this long and save the best timetable found so far; "
+                 "time left after a complete solve goes to the improvement pass",
+        )
+        parser.add_argument(
+            '--decompose', action='store_true',
+            help="Solve groups and teachers that share no lessons as separate parts, one per worker",
+        )
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help="Keep still-valid saved periods and only place new or changed lessons",
+        )
+        parser.add_argument(
+            '--warm-start', action='store_true',
+            help="Like --incremental, but re-place changed lessons near their saved slots and move "
+                 "kept periods when new lessons do not fit around them",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=SAVE_BATCH_SIZE,
+            help="Rows written or deleted per statement when saving",
+        )
+        parser.add_argument('--profile', action='store_true', help="Print time and queries per step")
+        parser.add_argument('--record', action='store_true', help="Save the run profile as a GenerationRun")
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only run the feasibility checks on the stored data and list every violation",
+        )
 
     def handle(self, *args, **options):
-        self.stdout.write("Generating timetable...")
+        if options['attempts'] < 1:
+            raise CommandError("--attempts must be at least 1.")
+        if options['check']:
+            return self.check_feasibility(options['days'], options['periods'])
+
+        # Claim the same single job slot the web pages use, then run in the foreground.
+        job, created = claim_generation_job(options['incremental'] or options['warm_start'], GenerationJob.RUNNING)
+        if not created:
+            raise CommandError(f"A timetable generation is already {job.status} (job #{job.pk}).")
+        self.stdout.write(f"Generating timetable (job #{job.pk})...")
 
-        success, message = generate_timetable(
+        success, message = run_generation_job(job.pk, dict(
             days=options['days'],
-            periods_per_day=options['periods']
-        )
+            periods_per_day=options['periods'],
+            solver=options['solver'],
+            seed=options['seed'],
+            incremental=options['incremental'],
+            warm_start=options['warm_start'],
+            attempts=options['attempts'],
+            workers=options['workers'],
+            optimize=options['optimize'],
+            report=self.print_report if options['profile'] else None,
+            record=options['record'],
+            batch_size=options['batch_size'],
+            decompose=options['decompose'],
+            time_budget=options['time_limit'],
+        ))
 
         if success:
             self.stdout.write(self.style.SUCCESS(message))
         else:
             self.stdout.write(self.style.ERROR(message))
+
+    def print_report(self, run):
+        self.stdout.write(f"{'step':<12}{'seconds':>10}{'queries':>9}{'query s':>10}")
+        for step in run.steps:
+            self.stdout.write(
+                f"{step['name']:<12}{step['seconds']:>10.3f}{step['queries']:>9}{step['query_seconds']:>10.3f}"
+            )
+        self.stdout.write(
+            f"{'total':<12}{run.duration:>10.3f}{run.queries:>9}{run.query_seconds:>10.3f}"
+        )
+        stats = ", ".join(f"{name} {value}" for name, value in run.solver_stats.items())
+        self.stdout.write(f"{run.solver} solver, seed {run.seed}: {stats}")
+        self.stdout.write(
+            f"placed {run.placed} of {run.total} lesson hours" + (" (time limit reached)" if run.timed_out else "")
+        )
+
+    def check_feasibility(self, days, periods):
+        started = time.perf_counter()
+        try:
+            problem = load_problem(days, periods)
+        except ProblemError as e:
+            raise CommandError(str(e))
+        issues = check_feasibility(problem)
+        elapsed = (time.perf_counter() - started) * 1000
+        if not issues:
+            self.stdout.write(self.style.SUCCESS(
+                f"No feasibility problems found in {problem.lessons.total_hours()} lesson hours ({elapsed:.0f} ms)."
+            ))
+            return
+        for issue in issues:
+            self.stdout.write(self.style.ERROR(describe_issues([issue])))
+        raise CommandError(f"{len(issues)} feasibility problem(s) found ({elapsed:.0f} ms).")
@@ -0,0 +1,53 @@
+# scheduler/management/commands/import_timetable_data.py
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scheduler.importer import IMPORT_KINDS, import_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import teachers, rooms, groups, subjects and group-subject mappings from CSV or "
+        "JSON Lines files (by name; existing rows are updated)"
+    )
+
+    def add_arguments(self, parser):
+        for kind in IMPORT_KINDS:
+            parser.add_argument(f'--{kind}', metavar='FILE', help=f"CSV or .jsonl file of {kind}")
+        parser.add_argument('--dry-run', action='store_true', help="Validate and report, then roll back")
+        parser.add_argument('--output', metavar='FILE', help="Write the full report as JSON")
+
+    def handle(self, *args, **options):
+        paths = {kind: options[kind] for kind in IMPORT_KINDS if options[kind]}
+        if not paths:
+            raise CommandError(f"Give at least one of {', '.join('--' + k for k in IMPORT_KINDS)}.")
+
+        files = {}
+        try:
+            for kind, path in paths.items():
+                files[kind] = (open(path, 'rb'), path)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        started = time.perf_counter()
+        try:
+            report = import_data(files, dry_run=options['dry_run'])
+        finally:
+            for stream, _ in files.values():
+                stream.close()
+        elapsed = time.perf_counter() - started
+
+        for error in report.errors:
+            where = f"{error['kind']} line {error['line']}" if error['line'] else error['kind']
+            self.stderr.write(f"{where}: {error['error']}")
+        if report.error_count > len(report.errors):
+            self.stderr.write(f"... and {report.error_count - len(report.errors)} more errors.")
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report.to_dict(), f, indent=2)
+
+        style = self.style.SUCCESS if not report.error_count else self.style.WARNING
+        prefix = "Dry run, rolled back: " if options['dry_run'] else ""
+        self.stdout.write(style(f"{prefix}{report.summary()} ({elapsed:.2f}s)"))
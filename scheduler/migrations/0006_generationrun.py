@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0005_timetablesettings_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('solver', models.CharField(max_length=30)),
+                ('seed', models.BigIntegerField(blank=True, null=True)),
+                ('incremental', models.BooleanField(default=False)),
+                ('success', models.BooleanField(default=False)),
+                ('placed', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('duration', models.FloatField(default=0)),
+                ('queries', models.PositiveIntegerField(default=0)),
+                ('checks', models.BigIntegerField(default=0)),
+                ('message', models.TextField(blank=True)),
+                ('report', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:17
+
+from django.db import migrations
+
+
+def resolve_double_bookings(apps, schema_editor):
+    """
+    Clear conflicts the new constraints would reject, keeping the oldest row.
+
+    A later period reusing a teacher's slot is deleted; one reusing a room's
+    slot loses its room (as when a room is deleted). Regenerating fills both
+    back in.
+    """
+    ScheduledPeriod = apps.get_model('scheduler', 'ScheduledPeriod')
+    seen_teachers, seen_rooms = set(), set()
+    clash_ids, roomless_ids = [], []
+    rows = ScheduledPeriod.objects.order_by('id').values_list('id', 'timeslot_id', 'teacher_id', 'room_id')
+    for pk, slot_id, teacher_id, room_id in rows:
+        if (slot_id, teacher_id) in seen_teachers:
+            clash_ids.append(pk)
+            continue
+        seen_teachers.add((slot_id, teacher_id))
+        if room_id is not None:
+            if (slot_id, room_id) in seen_rooms:
+                roomless_ids.append(pk)
+            else:
+                seen_rooms.add((slot_id, room_id))
+    ScheduledPeriod.objects.filter(id__in=clash_ids).delete()
+    ScheduledPeriod.objects.filter(id__in=roomless_ids).update(room=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0007_timetablesettings_data_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_double_bookings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0008_resolve_double_bookings'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scheduledperiod',
+            index=models.Index(fields=['group', 'timeslot'], name='period_group_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledperiod',
+            index=models.Index(fields=['teacher', 'timeslot'], name='period_teacher_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledperiod',
+            index=models.Index(fields=['room', 'timeslot'], name='period_room_slot_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduledperiod',
+            constraint=models.UniqueConstraint(fields=('timeslot', 'teacher'), name='unique_teacher_per_timeslot'),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduledperiod',
+            constraint=models.UniqueConstraint(condition=models.Q(('room__isnull', False)), fields=('timeslot', 'room'), name='unique_room_per_timeslot'),
+        ),
+    ]
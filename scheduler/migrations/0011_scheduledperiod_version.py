@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0010_timetablesettings_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='scheduledperiod',
+            name='unique_teacher_per_timeslot',
+        ),
+        migrations.RemoveConstraint(
+            model_name='scheduledperiod',
+            name='unique_room_per_timeslot',
+        ),
+        migrations.RemoveIndex(
+            model_name='scheduledperiod',
+            name='period_group_slot_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='scheduledperiod',
+            name='period_teacher_slot_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='scheduledperiod',
+            name='period_room_slot_idx',
+        ),
+        migrations.AlterUniqueTogether(
+            name='scheduledperiod',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='scheduledperiod',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='timetablesettings',
+            name='active_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledperiod',
+            index=models.Index(fields=['version', 'group', 'timeslot'], name='period_group_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledperiod',
+            index=models.Index(fields=['version', 'teacher', 'timeslot'], name='period_teacher_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledperiod',
+            index=models.Index(fields=['version', 'room', 'timeslot'], name='period_room_slot_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduledperiod',
+            constraint=models.UniqueConstraint(fields=('version', 'timeslot', 'group'), name='unique_group_per_timeslot'),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduledperiod',
+            constraint=models.UniqueConstraint(fields=('version', 'timeslot', 'teacher'), name='unique_teacher_per_timeslot'),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduledperiod',
+            constraint=models.UniqueConstraint(condition=models.Q(('room__isnull', False)), fields=('version', 'timeslot', 'room'), name='unique_room_per_timeslot'),
+        ),
+    ]
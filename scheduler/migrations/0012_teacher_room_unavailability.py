@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0011_scheduledperiod_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomUnavailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.IntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday')])),
+                ('first_period', models.PositiveIntegerField(default=1)),
+                ('last_period', models.PositiveIntegerField(blank=True, null=True)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unavailability', to='scheduler.room')),
+            ],
+            options={
+                'verbose_name_plural': 'room unavailability',
+                'ordering': ('day', 'first_period'),
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TeacherUnavailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.IntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday')])),
+                ('first_period', models.PositiveIntegerField(default=1)),
+                ('last_period', models.PositiveIntegerField(blank=True, null=True)),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unavailability', to='scheduler.teacher')),
+            ],
+            options={
+                'verbose_name_plural': 'teacher unavailability',
+                'ordering': ('day', 'first_period'),
+                'abstract': False,
+            },
+        ),
+    ]
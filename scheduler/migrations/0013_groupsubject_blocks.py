@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0012_teacher_room_unavailability'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='groupsubject',
+            name='block_length',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='groupsubject',
+            name='blocks_per_day',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
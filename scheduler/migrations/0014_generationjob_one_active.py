@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:01
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fail_extra_active_jobs(apps, schema_editor):
+    """Keep only the newest queued or running job active so the constraint can be added."""
+    GenerationJob = apps.get_model('scheduler', 'GenerationJob')
+    active = GenerationJob.objects.filter(status__in=('queued', 'running')).order_by('-created_at', '-pk')
+    GenerationJob.objects.filter(pk__in=list(active.values_list('pk', flat=True)[1:])).update(
+        status='failed', success=False, message='Superseded by a newer job.', finished_at=timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0013_groupsubject_blocks'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_extra_active_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='generationjob',
+            constraint=models.UniqueConstraint(models.ExpressionWrapper(models.Q(('status__in', ('queued', 'running'))), output_field=models.BooleanField()), condition=models.Q(('status__in', ('queued', 'running'))), name='one_active_generation_job'),
+        ),
+    ]
@@ -1,4 +1,7 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Now
+from django.utils import timezone
 
 # --- Constants for days ---
 DAYS = [
@@ -27,6 +30,52 @@ class Room(models.Model):
         return f"{self.name} ({self.capacity})"
 
 
+# --- Availability (Teacher / Room) ---
+class Unavailability(models.Model):
+    """A run of periods on one day when a teacher or room cannot be used."""
+    day = models.IntegerField(choices=DAYS)
+    first_period = models.PositiveIntegerField(default=1)
+    last_period = models.PositiveIntegerField(null=True, blank=True)  # blank = to the end of the day
+
+    class Meta:
+        abstract = True
+        ordering = ("day", "first_period")
+
+    def clean(self):
+        if self.first_period < 1:
+            raise ValidationError({"first_period": "Periods are numbered from 1."})
+        if self.last_period is not None and self.last_period < self.first_period:
+            raise ValidationError({"last_period": "The last period cannot come before the first."})
+
+    def describe_periods(self):
+        day = dict(DAYS).get(self.day, 'Unknown')
+        if self.first_period == 1 and self.last_period is None:
+            return f"{day} (all day)"
+        if self.last_period is None:
+            return f"{day} from period {self.first_period}"
+        return f"{day} periods {self.first_period}-{self.last_period}"
+
+
+class TeacherUnavailability(Unavailability):
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name='unavailability')
+
+    class Meta(Unavailability.Meta):
+        verbose_name_plural = "teacher unavailability"
+
+    def __str__(self):
+        return f"{self.teacher} unavailable {self.describe_periods()}"
+
+
+class RoomUnavailability(Unavailability):
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='unavailability')
+
+    class Meta(Unavailability.Meta):
+        verbose_name_plural = "room unavailability"
+
+    def __str__(self):
+        return f"{self.room} closed {self.describe_periods()}"
+
+
 # --- Group (Class) Model ---
 class Group(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -57,10 +106,29 @@ class GroupSubject(models.Model):
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
     hours_per_week = models.PositiveIntegerField(default=3)
 
+    # Consecutive periods taught as one block in one room (2 for a double
+    # lab); hours_per_week must be a multiple of it.
+    block_length = models.PositiveIntegerField(default=1)
+    # Most blocks of this subject the group has on one day; blank = no limit.
+    blocks_per_day = models.PositiveIntegerField(null=True, blank=True)
+
     class Meta:
         unique_together = ("group", "subject")
 
+    def clean(self):
+        if self.block_length < 1:
+            raise ValidationError({"block_length": "A block is at least one period long."})
+        if self.hours_per_week % self.block_length:
+            raise ValidationError(
+                {"hours_per_week": f"Must be a multiple of the block length ({self.block_length})."}
+            )
+        if self.blocks_per_day == 0:
+            raise ValidationError({"blocks_per_day": "Leave blank for no limit."})
+
     def __str__(self):
+        if self.block_length > 1:
+            blocks = self.hours_per_week // self.block_length
+            return f"{self.group} - {self.subject} ({blocks}×{self.block_length}h)"
         return f"{self.group} - {self.subject} ({self.hours_per_week}h)"
 
 
@@ -78,6 +146,13 @@ class TimeSlot(models.Model):
 
 
 # --- ScheduledPeriod (Final Timetable Entry) ---
+class ScheduledPeriodQuerySet(models.QuerySet):
+    def active(self):
+        """Rows of the timetable readers should see (``TimetableSettings.active_version``)."""
+        active = TimetableSettings.objects.order_by('pk').values('active_version')[:1]
+        return self.filter(version=models.Subquery(active))
+
+
 class ScheduledPeriod(models.Model):
     timeslot = models.ForeignKey(TimeSlot, on_delete=models.CASCADE)
     group = models.ForeignKey(Group, on_delete=models.CASCADE)
@@ -85,8 +160,29 @@ class ScheduledPeriod(models.Model):
     teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE)
     room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True)
 
+    # Timetable this row belongs to; a new one is written beside the active
+    # one and switched to in one step (see scheduler.persistence).
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = ScheduledPeriodQuerySet.as_manager()
+
     class Meta:
-        unique_together = ("timeslot", "group")
+        constraints = [
+            # A group, teacher or room is in one place per slot, whoever writes the row.
+            models.UniqueConstraint(fields=["version", "timeslot", "group"], name="unique_group_per_timeslot"),
+            models.UniqueConstraint(fields=["version", "timeslot", "teacher"], name="unique_teacher_per_timeslot"),
+            models.UniqueConstraint(
+                fields=["version", "timeslot", "room"],
+                condition=models.Q(room__isnull=False),
+                name="unique_room_per_timeslot",
+            ),
+        ]
+        indexes = [
+            # Per-group, per-teacher and per-room timetables, read slot by slot.
+            models.Index(fields=["version", "group", "timeslot"], name="period_group_slot_idx"),
+            models.Index(fields=["version", "teacher", "timeslot"], name="period_teacher_slot_idx"),
+            models.Index(fields=["version", "room", "timeslot"], name="period_room_slot_idx"),
+        ]
 
     def __str__(self):
         return f"{self.timeslot} — {self.group}: {self.subject} ({self.teacher}) @ {self.room or 'No Room'}"
@@ -105,6 +201,134 @@ class TimetableSettings(models.Model):
     short_break_start = models.TimeField(blank=True, null=True)
     short_break_end = models.TimeField(blank=True, null=True)
 
+    # Bumped whenever the saved timetable or anything shown in it changes;
+    # cached timetable views are keyed by it.
+    generation = models.PositiveIntegerField(default=0, editable=False)
+
+    # Bumped whenever the generator's input data changes; cached problem
+    # snapshots are keyed by it (see scheduler.snapshot).
+    data_version = models.PositiveIntegerField(default=0, editable=False)
+
+    # When ``generation`` last moved; the JSON API sends it as Last-Modified.
+    updated_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # ScheduledPeriod.version readers see; moved by scheduler.persistence.
+    active_version = models.PositiveIntegerField(default=0, editable=False)
+
+    # Moved only by UPDATE statements (the bump_* methods and scheduler.persistence),
+    # never by save(): a settings form holding an older copy of the row would
+    # otherwise write a stale timetable version and stale cache keys back.
+    COUNTER_FIELDS = ('generation', 'data_version', 'updated_at', 'active_version')
+
     def __str__(self):
         return f"Custom Timetable ({self.periods_per_day} periods)"
- 
\ No newline at end of file
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def bump_generation(cls):
+        """Invalidate cached timetable views (an UPDATE, so no signals fire)."""
+        cls.objects.update(generation=models.F('generation') + 1, updated_at=Now())
+
+    @classmethod
+    def bump_data_version(cls):
+        """Invalidate cached problem snapshots and timetable views."""
+        cls.objects.update(
+            generation=models.F('generation') + 1,
+            data_version=models.F('data_version') + 1,
+            updated_at=Now(),
+        )
+
+
+# --- Background Generation Job ---
+class GenerationJob(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+    ACTIVE = (QUEUED, RUNNING)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    incremental = models.BooleanField(default=False)
+    placed = models.PositiveIntegerField(default=0)  # lesson hours placed so far
+    total = models.PositiveIntegerField(default=0)   # lesson hours to place
+    success = models.BooleanField(null=True, blank=True)
+    message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(default=timezone.now)  # last sign of life from the worker
+
+    class Meta:
+        ordering = ('-created_at',)
+        constraints = [
+            # At most one queued or running job, whichever process starts it
+            # (the indexed expression is the same for every active row).
+            models.UniqueConstraint(
+                models.ExpressionWrapper(
+                    models.Q(status__in=('queued', 'running')), output_field=models.BooleanField()
+                ),
+                condition=models.Q(status__in=('queued', 'running')),
+                name='one_active_generation_job',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Generation job #{self.pk} ({self.status})"
+
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE
+
+    def to_dict(self):
+        return {
+            'id': self.pk,
+            'status': self.status,
+            'incremental': self.incremental,
+            'placed': self.placed,
+            'total': self.total,
+            'success': self.success,
+            'message': self.message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+# --- Profiled Generation Run ---
+class GenerationRun(models.Model):
+    """A recorded generate_timetable call with its per-step profile (see scheduler.instrumentation)."""
+    created_at = models.DateTimeField(auto_now_add=True)
+    solver = models.CharField(max_length=30)
+    seed = models.BigIntegerField(null=True, blank=True)
+    incremental = models.BooleanField(default=False)
+    success = models.BooleanField(default=False)
+    placed = models.PositiveIntegerField(default=0)  # lesson hours placed
+    total = models.PositiveIntegerField(default=0)   # lesson hours demanded
+    duration = models.FloatField(default=0)           # seconds
+    queries = models.PositiveIntegerField(default=0)
+    checks = models.BigIntegerField(default=0)       # solver candidate checks
+    message = models.TextField(blank=True)
+    report = models.JSONField(default=dict, blank=True)  # RunReport.to_dict()
+
+    class Meta:
+        ordering = ('-created_at',)
+
+    def __str__(self):
+        return f"Generation run #{self.pk} ({self.placed}/{self.total} in {self.duration:.2f}s)"
+
+    @property
+    def steps(self):
+        return self.report.get('steps', [])
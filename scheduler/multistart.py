@@ -0,0 +1,102 @@
+"""
+Single and multi-start solving of a Problem.
+
+A multi-start run solves the same Problem with several seeds, spread over
+a ProcessPoolExecutor, and keeps the best result: most lesson hours placed
+first, then the lowest soft-constraint penalty. Attempt seeds are derived
+from one base seed, so a run is reproducible.
+
+An anytime run (``solve_until``) instead keeps starting new attempts until
+one places every hour or a deadline passes, and returns the best so far.
+"""
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .scoring import soft_penalty
+from .solver import get_solver
+
+
+def run_attempt(problem, solver=None, seed=None, progress=None, **options):
+    """Solve ``problem`` once and attach the seed and soft penalty to the result."""
+    engine = get_solver(solver, seed=seed, progress=progress, **options)
+    result = engine.solve(
+        problem.lessons, problem.slots, problem.rooms, fixed=problem.fixed, **problem.solver_options()
+    )
+    result.seed = seed
+    result.penalty = soft_penalty(problem, result.placements)
+    return result
+
+
+def rank(result):
+    """Sort key for results: more placed hours first, then lower penalty."""
+    return (-len(result.placements), result.penalty['total'])
+
+
+def attempt_seeds(seed, attempts):
+    """Seeds for ``attempts`` runs, derived from ``seed`` (random if None)."""
+    base = seed if seed is not None else random.randrange(2 ** 32)
+    return [base + i for i in range(attempts)]
+
+
+def solve_multistart(problem, solver=None, seed=None, attempts=1, workers=None, progress=None, **options):
+    """
+    Run ``attempts`` seeded solves and return the best result.
+
+    ``workers`` caps the process pool (defaults to every core); with one
+    worker or one attempt everything runs in this process and ``progress``
+    is forwarded to the solver. Otherwise ``progress(done, attempts)`` is
+    called as attempts finish. Ties keep the lowest attempt number.
+    """
+    seeds = attempt_seeds(seed, attempts)
+    workers = min(workers or os.cpu_count() or 1, len(seeds))
+
+    if workers <= 1:
+        results = []
+        for s in seeds:
+            results.append(run_attempt(problem, solver, s, progress if len(seeds) == 1 else None, **options))
+            if progress and len(seeds) > 1:
+                progress(len(results), len(seeds))
+    else:
+        results = [None] * len(seeds)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(run_attempt, problem, solver, s, None, **options): i
+                for i, s in enumerate(seeds)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if progress:
+                    progress(done, len(seeds))
+
+    best = min(results, key=rank)
+    best.stats['attempts'] = len(seeds)
+    return best
+
+
+def solve_until(problem, deadline, solver=None, seed=None, progress=None, **options):
+    """
+    Solve attempt after attempt until one is complete or ``deadline`` (a
+    ``time.monotonic()`` value) passes; return the best result so far.
+
+    Each attempt is cut short at the deadline as well, so this returns
+    shortly after it, and a new attempt is only started while the time
+    left is at least what the last one took. ``progress`` is forwarded to
+    the first attempt. The result's stats carry ``attempts`` and
+    ``timed_out`` (1 when the budget ran out before a complete timetable).
+    """
+    best, attempts = None, 0
+    for s in itertools.count(attempt_seeds(seed, 1)[0]):
+        started = time.monotonic()
+        result = run_attempt(problem, solver, s, None if attempts else progress, deadline=deadline, **options)
+        attempts += 1
+        if best is None or rank(result) < rank(best):
+            best = result
+        now = time.monotonic()
+        if best.complete or deadline - now < now - started:
+            break
+    best.stats['attempts'] = attempts
+    best.stats['timed_out'] = int(not best.complete)
+    return best
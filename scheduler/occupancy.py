@@ -0,0 +1,219 @@
+"""
+Bitmask occupancy index for group, teacher and room conflicts.
+
+Groups, teachers, rooms and slots are addressed by dense integer indices.
+Each group, teacher and room keeps one int whose bit ``s`` is set when it is
+busy in slot ``s``, and each slot keeps an int of the rooms taken in it, so
+"slots where this group and this teacher are free and a room is left" is a
+single OR/NOT per lesson instead of a loop over slots and rooms.
+
+Room capacity is handled with capacity classes. Rooms are indexed in
+ascending capacity order, so the rooms that seat a group are exactly the
+bits from ``bisect_left(capacities, size)`` upwards (its *floor*). Groups
+sharing a floor form a class, and each class keeps a mask of slots where no
+room at or above its floor is free. The best-fit room for a group in a slot
+is then the lowest free bit at or above its floor.
+
+A block of ``length`` consecutive periods is placed by its first slot. The
+slots a block may start in are fixed by the period grid (``block_starts``);
+of those, the free ones are where the group and teacher are free for the
+whole block and one fitting room is free throughout (``free_starts``). For
+every block length in use (``track_blocks``) each capacity class keeps a
+mask of the starts with such a room, updated for the few starts around a
+slot whenever a room in it is taken or freed.
+
+Availability windows are applied once, before any placement: a teacher's
+or room's unavailable slots are simply marked busy, so every later mask
+already leaves them out of each lesson's candidates.
+"""
+from bisect import bisect_left
+
+
+def dense_index(keys):
+    """Map keys to 0..n-1 in first-seen order."""
+    index = {}
+    for key in keys:
+        if key not in index:
+            index[key] = len(index)
+    return index
+
+
+def iter_bits(mask):
+    """Yield the positions of the set bits of ``mask``, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def lowest_bit(mask):
+    """Position of the lowest set bit, or -1 for an empty mask."""
+    return (mask & -mask).bit_length() - 1
+
+
+def block_starts(n_slots, periods_per_day, length):
+    """Bitmask of the slots a ``length``-period block can start in without running past the end of its day."""
+    day = ((1 << (periods_per_day - length + 1)) - 1) if length <= periods_per_day else 0
+    mask = 0
+    for start in range(0, n_slots, periods_per_day):
+        mask |= day << start
+    return mask & ((1 << n_slots) - 1)
+
+
+def capacity_classes(capacities, sizes):
+    """
+    Group rooms into capacity classes for best-fit room choice.
+
+    ``capacities`` must be in room index order, ascending; ``sizes`` are
+    the group sizes in dense group order. Returns ``(floors, group_class)``
+    where ``floors[c]`` is the lowest room index seating class ``c`` and
+    ``group_class[g]`` is the class of group ``g``. Class 0 is always floor
+    0 (any room). A floor equal to the room count means no room is big
+    enough.
+    """
+    floors, class_of, group_class = [0], {0: 0}, []
+    for size in sizes:
+        floor = bisect_left(capacities, size)
+        if floor not in class_of:
+            class_of[floor] = len(floors)
+            floors.append(floor)
+        group_class.append(class_of[floor])
+    return floors, group_class
+
+
+class OccupancyIndex:
+    """Who is busy in which slot, stored as bitmask rows."""
+
+    __slots__ = (
+        "n_slots", "n_rooms", "all_slots", "all_rooms",
+        "group_busy", "teacher_busy", "room_busy", "slot_rooms", "floors", "full", "runs",
+    )
+
+    def __init__(self, n_groups, n_teachers, n_rooms, n_slots, floors=(0,)):
+        self.n_slots = n_slots
+        self.n_rooms = n_rooms
+        self.all_slots = (1 << n_slots) - 1
+        self.all_rooms = (1 << n_rooms) - 1
+        self.group_busy = [0] * n_groups
+        self.teacher_busy = [0] * n_teachers
+        self.room_busy = [0] * n_rooms
+        self.slot_rooms = [0] * n_slots
+        # Per capacity class: slots with no room at or above its floor left
+        # (every slot, for a floor past the largest room).
+        self.floors = list(floors)
+        self.full = [self.all_slots if floor >= n_rooms else 0 for floor in self.floors]
+        # (capacity class, block length) -> starts with one fitting room free for the whole block.
+        self.runs = {}
+
+    @property
+    def rooms_full(self):
+        """Slots with no room left at all."""
+        return self.full[0]
+
+    def free_slots(self, group, teacher, capacity_class=0):
+        """Bitmask of slots where the group and teacher are free and a fitting room is left."""
+        return self.all_slots & ~(self.group_busy[group] | self.teacher_busy[teacher] | self.full[capacity_class])
+
+    def free_rooms(self, slot, capacity_class=0):
+        """Bitmask of rooms still free in ``slot`` that seat ``capacity_class``."""
+        return (self.all_rooms & ~self.slot_rooms[slot]) >> self.floors[capacity_class] << self.floors[capacity_class]
+
+    def block_rooms(self, slot, length, capacity_class=0):
+        """Bitmask of rooms that seat ``capacity_class`` and are free in all of ``slot`` .. ``slot + length - 1``."""
+        taken = 0
+        for s in range(slot, slot + length):
+            taken |= self.slot_rooms[s]
+        floor = self.floors[capacity_class]
+        return (self.all_rooms & ~taken) >> floor << floor
+
+    def track_blocks(self, length):
+        """Start keeping, per capacity class, the starts of ``length``-slot runs with one fitting room free."""
+        for c in range(len(self.floors)):
+            if (c, length) not in self.runs:
+                self.runs[c, length] = 0
+                self._update_runs(c, length, 0, self.n_slots - 1)
+
+    def _update_runs(self, c, length, first, last):
+        """Recompute the run bits of starts ``first`` .. ``last`` for class ``c``."""
+        mask = self.runs[c, length]
+        for start in range(max(first, 0), min(last, self.n_slots - length) + 1):
+            if self.block_rooms(start, length, c):
+                mask |= 1 << start
+            else:
+                mask &= ~(1 << start)
+        self.runs[c, length] = mask
+
+    def _room_changed(self, room, slot):
+        for c, length in self.runs:
+            if self.floors[c] <= room:
+                self._update_runs(c, length, slot - length + 1, slot)
+
+    def free_starts(self, free, length, capacity_class, starts):
+        """
+        Slots in ``starts`` that begin ``length`` slots all in ``free``
+        (a ``free_slots`` mask) with one fitting room free throughout;
+        ``length`` must be tracked.
+        """
+        mask = starts & self.runs[capacity_class, length]
+        for i in range(length):
+            mask &= free >> i
+        return mask
+
+    def filled_classes(self, room, slot):
+        """Classes with no fitting room left in ``slot`` that ``room`` could have seated."""
+        return [
+            c for c, floor in enumerate(self.floors)
+            if floor <= room and (self.full[c] >> slot) & 1
+        ]
+
+    def free_cells(self):
+        """Number of (slot, room) pairs still unused."""
+        return self.n_slots * self.n_rooms - sum(mask.bit_count() for mask in self.slot_rooms)
+
+    def is_free(self, group, teacher, room, slot):
+        bit = 1 << slot
+        return not (
+            (self.group_busy[group] | self.teacher_busy[teacher] | self.room_busy[room]) & bit
+        )
+
+    def block_teacher(self, teacher, slots):
+        """Mark the slots in the ``slots`` mask as unavailable to a teacher."""
+        self.teacher_busy[teacher] |= slots & self.all_slots
+
+    def block_room(self, room, slots):
+        """Mark the slots in the ``slots`` mask as unavailable in a room."""
+        slots &= self.all_slots
+        self.room_busy[room] |= slots
+        for slot in iter_bits(slots):
+            self.slot_rooms[slot] |= 1 << room
+            free = self.all_rooms & ~self.slot_rooms[slot]
+            for c, floor in enumerate(self.floors):
+                if floor <= room and not free >> floor:
+                    self.full[c] |= 1 << slot
+            if self.runs:
+                self._room_changed(room, slot)
+
+    def place(self, group, teacher, room, slot):
+        bit = 1 << slot
+        self.group_busy[group] |= bit
+        self.teacher_busy[teacher] |= bit
+        self.room_busy[room] |= bit
+        self.slot_rooms[slot] |= 1 << room
+        free = self.all_rooms & ~self.slot_rooms[slot]
+        for c, floor in enumerate(self.floors):
+            if floor <= room and not free >> floor:
+                self.full[c] |= bit
+        if self.runs:
+            self._room_changed(room, slot)
+
+    def release(self, group, teacher, room, slot):
+        bit = 1 << slot
+        self.group_busy[group] &= ~bit
+        self.teacher_busy[teacher] &= ~bit
+        self.room_busy[room] &= ~bit
+        self.slot_rooms[slot] &= ~(1 << room)
+        for c, floor in enumerate(self.floors):
+            if floor <= room:
+                self.full[c] &= ~bit
+        if self.runs:
+            self._room_changed(room, slot)
@@ -0,0 +1,273 @@
+"""
+Local-search improvement of a solved timetable.
+
+After placement, simulated annealing moves single lesson hours to other
+free slots, swaps two hours of the same group and changes rooms, to lower
+the soft penalty from scheduler.scoring. Every penalty term is local to one
+(teacher, day), (group, subject, day) or (group, day), so a move is scored
+by recomputing only the handful of terms it touches, never the whole week.
+Pinned (fixed) cells count towards the score but are never moved, nor are
+hours of mappings with block or per-day rules (moving one hour would break
+its block), and hours only ever move into rooms that seat their group and into slots
+where their teacher and room are available.
+
+With ``anchors`` (``(group, subject)`` → ``{slot: room}``, the saved
+positions of a warm start) every hour off the slots its mapping held costs
+MOVE_WEIGHT, so the search only reshuffles a teacher's week for a clear
+soft-constraint gain. The move cost steers the search but is not part of
+the reported soft penalty.
+"""
+import math
+import random
+import time
+
+from .lessons import AssignmentTable
+from .occupancy import OccupancyIndex, capacity_classes, dense_index, iter_bits
+from .scoring import SOFT_WEIGHTS, soft_penalty
+
+# How often (in iterations) the clock is checked.
+CLOCK_EVERY = 256
+
+# Penalty per anchored hour moved off its saved slots (see ``anchors``).
+MOVE_WEIGHT = 3
+
+
+class Annealer:
+    """Simulated annealing over the placed hours of one Problem."""
+
+    def __init__(self, problem, placements, seed=None, start_temperature=2.0, end_temperature=0.05,
+                 anchors=None):
+        self.problem = problem
+        self.rng = random.Random(seed)
+        self.start_temperature = start_temperature
+        self.end_temperature = end_temperature
+        self.periods = problem.periods_per_day
+        self.day_mask = (1 << self.periods) - 1
+
+        cells = list(problem.cells(()))
+        lessons = problem.lessons
+        self.groups = dense_index([c[0] for c in cells] + list(lessons.group))
+        self.teachers = dense_index([c[2] for c in cells] + list(lessons.teacher))
+        self.mappings = dense_index(
+            [(c[0], c[1]) for c in cells] + list(zip(lessons.group, lessons.subject))
+        )
+        self.room_index = {room: i for i, room in enumerate(problem.rooms)}
+        n_slots = len(problem.slots)
+        if problem.capacities is None:
+            floors, self.group_class = [0], [0] * len(self.groups)
+        else:
+            floors, self.group_class = capacity_classes(
+                problem.capacities, [problem.group_sizes.get(g, 0) for g in self.groups]
+            )
+        self.index = OccupancyIndex(len(self.groups), len(self.teachers), len(problem.rooms), n_slots, floors)
+        # Unavailable slots are busy in the index but are not teaching, so gaps ignore them.
+        self.teacher_blocked = [0] * len(self.teachers)
+        for teacher, t in self.teachers.items():
+            if teacher in problem.teacher_blocked:
+                self.teacher_blocked[t] = problem.teacher_blocked[teacher]
+                self.index.block_teacher(t, self.teacher_blocked[t])
+        for room, mask in problem.room_blocked.items():
+            if room in self.room_index:
+                self.index.block_room(self.room_index[room], mask)
+        self.group_room = [[-1] * n_slots for _ in self.groups]
+        self.mapping_days = [[0] * problem.days for _ in self.mappings]
+
+        for group, subject, teacher, slot, room in cells:
+            self._add(self.groups[group], self.teachers[teacher], self.mappings[group, subject],
+                      problem.slot_index[slot], self.room_index[room])
+
+        # Movable hours: parallel lists of group, teacher, mapping, slot, room.
+        self.rows = []
+        self.kept = AssignmentTable()  # placed hours that stay where they are
+        self.u_group, self.u_teacher, self.u_mapping, self.u_slot, self.u_room = [], [], [], [], []
+        self.u_anchor = []  # per unit, mask of the slots its mapping held in the saved timetable
+        anchor_masks = {}
+        for key, held in (anchors or {}).items():
+            anchor_masks[key] = sum(1 << problem.slot_index[slot] for slot in held if slot in problem.slot_index)
+        self.group_units = [[] for _ in self.groups]
+        for row, slot, room in placements:
+            g = self.groups[lessons.group[row]]
+            t = self.teachers[lessons.teacher[row]]
+            m = self.mappings[lessons.group[row], lessons.subject[row]]
+            s, r = problem.slot_index[slot], self.room_index[room]
+            if (lessons.group[row], lessons.subject[row]) in problem.blocks:
+                self.kept.append(row, slot, room)
+                self._add(g, t, m, s, r)
+                continue
+            self.rows.append(row)
+            self.group_units[g].append(len(self.u_group))
+            self.u_group.append(g)
+            self.u_teacher.append(t)
+            self.u_mapping.append(m)
+            self.u_slot.append(s)
+            self.u_room.append(r)
+            self.u_anchor.append(anchor_masks.get((lessons.group[row], lessons.subject[row]), 0))
+            self._add(g, t, m, s, r)
+
+        self.iterations = 0
+        self.accepted = 0
+
+    # --- occupancy bookkeeping ---
+    def _add(self, g, t, m, s, r):
+        self.index.place(g, t, r, s)
+        self.group_room[g][s] = r
+        self.mapping_days[m][s // self.periods] += 1
+
+    def _remove(self, g, t, m, s, r):
+        self.index.release(g, t, r, s)
+        self.group_room[g][s] = -1
+        self.mapping_days[m][s // self.periods] -= 1
+
+    # --- local penalty terms ---
+    def _term(self, key):
+        kind, who, day = key
+        if kind == 't':
+            busy = self.index.teacher_busy[who] & ~self.teacher_blocked[who]
+            busy = (busy >> (day * self.periods)) & self.day_mask
+            if not busy:
+                return 0
+            first = (busy & -busy).bit_length() - 1
+            return SOFT_WEIGHTS['teacher_gaps'] * (busy.bit_length() - first - busy.bit_count())
+        if kind == 's':
+            return SOFT_WEIGHTS['subject_repeats'] * max(self.mapping_days[who][day] - 1, 0)
+        if kind == 'm':
+            held = self.u_anchor[who]
+            return MOVE_WEIGHT if held and not held >> self.u_slot[who] & 1 else 0
+        rooms = self.group_room[who][day * self.periods:(day + 1) * self.periods]
+        changes = sum(1 for a, b in zip(rooms, rooms[1:]) if a >= 0 and b >= 0 and a != b)
+        return SOFT_WEIGHTS['room_changes'] * changes
+
+    def _terms(self, unit, *slots):
+        g, t, m = self.u_group[unit], self.u_teacher[unit], self.u_mapping[unit]
+        keys = set()
+        for s in slots:
+            day = s // self.periods
+            keys.update((('t', t, day), ('s', m, day), ('g', g, day)))
+        if self.u_anchor[unit]:
+            keys.add(('m', unit, 0))
+        return keys
+
+    def _local(self, keys):
+        return sum(self._term(key) for key in keys)
+
+    # --- moves ---
+    def _relocate(self, unit, s, r):
+        g, t, m = self.u_group[unit], self.u_teacher[unit], self.u_mapping[unit]
+        self._remove(g, t, m, self.u_slot[unit], self.u_room[unit])
+        self._add(g, t, m, s, r)
+        self.u_slot[unit], self.u_room[unit] = s, r
+
+    def _swap(self, a, b):
+        """Exchange the slot and room of two hours of the same group."""
+        sa, ra, sb, rb = self.u_slot[a], self.u_room[a], self.u_slot[b], self.u_room[b]
+        self._remove(self.u_group[a], self.u_teacher[a], self.u_mapping[a], sa, ra)
+        self._remove(self.u_group[b], self.u_teacher[b], self.u_mapping[b], sb, rb)
+        self._add(self.u_group[a], self.u_teacher[a], self.u_mapping[a], sb, rb)
+        self._add(self.u_group[b], self.u_teacher[b], self.u_mapping[b], sa, ra)
+        self.u_slot[a], self.u_room[a] = sb, rb
+        self.u_slot[b], self.u_room[b] = sa, ra
+
+    def _propose(self):
+        """Pick a random move; return ``(keys, apply, undo)`` or None."""
+        unit = self.rng.randrange(len(self.u_slot))
+        g, t = self.u_group[unit], self.u_teacher[unit]
+        s, r = self.u_slot[unit], self.u_room[unit]
+        cls = self.group_class[g]
+        kind = self.rng.random()
+
+        if kind < 0.5:
+            # Move one hour to another slot free for its group and teacher.
+            free = list(iter_bits(self.index.free_slots(g, t, cls)))
+            if not free:
+                return None
+            s2 = self.rng.choice(free)
+            r2 = r if not (self.index.slot_rooms[s2] >> r) & 1 else self._pick_room(g, s2)
+            keys = self._terms(unit, s, s2)
+            return keys, (lambda: self._relocate(unit, s2, r2)), (lambda: self._relocate(unit, s, r))
+
+        if kind < 0.9:
+            # Swap slot and room with another hour of the same group.
+            other = self.rng.choice(self.group_units[g])
+            s2, r2, t2 = self.u_slot[other], self.u_room[other], self.u_teacher[other]
+            if other == unit or s2 == s:
+                return None
+            busy = self.index.teacher_busy
+            if t != t2 and ((busy[t] >> s2) & 1 or (busy[t2] >> s) & 1):
+                return None
+            keys = self._terms(unit, s, s2) | self._terms(other, s, s2)
+            return keys, (lambda: self._swap(unit, other)), (lambda: self._swap(unit, other))
+
+        # Change room within the same slot.
+        rooms = list(iter_bits(self.index.free_rooms(s, cls)))
+        if not rooms:
+            return None
+        r2 = self.rng.choice(rooms)
+        keys = {('g', g, s // self.periods)}
+        return keys, (lambda: self._relocate(unit, s, r2)), (lambda: self._relocate(unit, s, r))
+
+    def _pick_room(self, g, s):
+        """Prefer the room the group uses in an adjacent period, else any free room that seats it."""
+        free = self.index.free_rooms(s, self.group_class[g])
+        day_start = s - s % self.periods
+        for neighbour in (s - 1, s + 1):
+            if day_start <= neighbour < day_start + self.periods:
+                room = self.group_room[g][neighbour]
+                if room >= 0 and (free >> room) & 1:
+                    return room
+        return self.rng.choice(list(iter_bits(free)))
+
+    # --- search ---
+    def run(self, seconds):
+        """Anneal for up to ``seconds``; returns the improvement in penalty."""
+        if not self.u_slot or seconds <= 0:
+            return 0
+        deadline = time.monotonic() + seconds
+        started = time.monotonic()
+        temperature = self.start_temperature
+        ratio = self.end_temperature / self.start_temperature
+        gained = 0
+
+        while True:
+            if self.iterations % CLOCK_EVERY == 0:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                temperature = self.start_temperature * ratio ** ((now - started) / seconds)
+            self.iterations += 1
+
+            move = self._propose()
+            if move is None:
+                continue
+            keys, apply, undo = move
+            before = self._local(keys)
+            apply()
+            delta = self._local(keys) - before
+            if delta <= 0 or self.rng.random() < math.exp(-delta / temperature):
+                self.accepted += 1
+                gained -= delta
+            else:
+                undo()
+        return gained
+
+    def placements(self):
+        table = AssignmentTable()
+        for row, slot, room in self.kept:
+            table.append(row, slot, room)
+        slots, rooms = self.problem.slots, self.problem.rooms
+        for row, s, r in zip(self.rows, self.u_slot, self.u_room):
+            table.append(row, slots[s], rooms[r])
+        return table
+
+
+def improve(problem, placements, seconds, seed=None, anchors=None):
+    """
+    Anneal ``placements`` for up to ``seconds``, keeping hours near ``anchors`` when given.
+
+    Returns ``(placements, before, after)`` where before/after are
+    soft_penalty breakdowns of the input and the improved timetable.
+    """
+    before = soft_penalty(problem, placements)
+    annealer = Annealer(problem, placements, seed=seed, anchors=anchors)
+    annealer.run(seconds)
+    improved = annealer.placements()
+    return improved, before, soft_penalty(problem, improved)
@@ -0,0 +1,81 @@
+"""
+Versioned, batched writes of the saved timetable.
+
+ScheduledPeriod rows carry a ``version`` and readers only see the rows of
+``TimetableSettings.active_version`` (``ScheduledPeriod.objects.active()``).
+A full save streams the new rows into the next version in batches, each
+its own short transaction, while readers keep seeing the old timetable.
+One UPDATE then flips the pointer and bumps the generation, and the old
+version is deleted in batches afterwards. A save that dies half way only
+leaves an inactive version behind, which the next save clears first.
+"""
+from itertools import islice
+
+from django.db import models
+from django.db.models.functions import Now
+
+from .models import ScheduledPeriod, TimetableSettings
+
+# Rows per bulk_create call (the backend may split it further) or DELETE statement.
+SAVE_BATCH_SIZE = 2000
+
+# Rows per bulk insert or upsert of school data (imports, sample data); keeps
+# statements under database parameter limits.
+INSERT_BATCH_SIZE = 1000
+
+
+def chunked(iterable, size):
+    """Yield lists of up to ``size`` items without materialising ``iterable``."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def active_version():
+    return TimetableSettings.objects.order_by('pk').values_list('active_version', flat=True).first() or 0
+
+
+def write_version(periods, version, batch_size=SAVE_BATCH_SIZE):
+    """Insert unsaved ScheduledPeriods under ``version``, ``batch_size`` at a time; return the count."""
+    count = 0
+    for batch in chunked(periods, batch_size):
+        for period in batch:
+            period.version = version
+        ScheduledPeriod.objects.bulk_create(batch)
+        count += len(batch)
+    return count
+
+
+def activate_version(version):
+    """Point readers at ``version`` and invalidate cached timetable views, in one statement."""
+    updated = TimetableSettings.objects.update(
+        active_version=version, generation=models.F('generation') + 1, updated_at=Now(),
+    )
+    if not updated:
+        TimetableSettings.objects.create(active_version=version)
+
+
+def purge_versions(keep, batch_size=SAVE_BATCH_SIZE):
+    """Delete every row outside version ``keep``, ``batch_size`` rows per statement."""
+    stale = ScheduledPeriod.objects.exclude(version=keep).order_by().values_list('id', flat=True)
+    deleted = 0
+    while ids := list(stale[:batch_size]):
+        deleted += ScheduledPeriod.objects.filter(id__in=ids).delete()[0]
+        if len(ids) < batch_size:
+            break
+    return deleted
+
+
+def replace_timetable(periods, batch_size=SAVE_BATCH_SIZE):
+    """
+    Save ``periods`` (any iterable of unsaved ScheduledPeriods) as the new active timetable.
+
+    Returns the number of rows written.
+    """
+    current = active_version()
+    purge_versions(keep=current, batch_size=batch_size)  # leftovers of an interrupted save
+    version = current + 1
+    count = write_version(periods, version, batch_size)
+    activate_version(version)
+    purge_versions(keep=version, batch_size=batch_size)
+    return count
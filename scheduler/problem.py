@@ -0,0 +1,117 @@
+"""
+In-memory scheduling problem.
+
+A Problem is everything the solving stage needs, as plain ids and arrays
+with no model instances or ORM access, so it can be pickled and solved in
+a worker process. It is immutable: derive a variant with ``replace()``.
+scheduler.snapshot loads one from the database.
+"""
+
+
+class ProblemError(ValueError):
+    """The stored data cannot be turned into a Problem (no rooms, a subject without a teacher, ...)."""
+
+
+class Problem:
+    """
+    A timetable instance to solve.
+
+    ``slots`` are TimeSlot ids in day-major order (slot index
+    ``day * periods_per_day + period - 1``), ``rooms`` are Room ids,
+    ``lessons`` is the LessonTable still to place and ``fixed`` holds
+    already-placed cells as ``(group, subject, teacher, slot, room)`` ids.
+
+    ``capacities`` (parallel to ``rooms``) and ``group_sizes`` (group id →
+    size) make room choice capacity-aware; rooms are kept sorted by
+    capacity, smallest first. Without them every room fits every group.
+
+    ``teacher_blocked`` and ``room_blocked`` map teacher and room ids to a
+    bitmask of the slot indices they cannot be used in (bit ``i`` is
+    ``slots[i]``); ids not listed are always available.
+
+    ``blocks`` maps ``(group, subject)`` to ``(length, per_day)`` for
+    mappings taught in blocks of ``length`` consecutive periods in one
+    room, at most ``per_day`` blocks a day (0 = no limit); their hours are
+    a multiple of ``length``. Mappings not listed are single periods.
+    """
+
+    __slots__ = (
+        "days", "periods_per_day", "slots", "rooms", "lessons", "fixed", "slot_index",
+        "capacities", "group_sizes", "teacher_blocked", "room_blocked",
+        "blocks",
+    )
+
+    def __init__(self, days, periods_per_day, slots, rooms, lessons, fixed=(), capacities=None, group_sizes=None,
+                 teacher_blocked=None, room_blocked=None, blocks=None):
+        init = object.__setattr__
+        init(self, "days", days)
+        init(self, "periods_per_day", periods_per_day)
+        init(self, "slots", tuple(slots))
+        init(self, "lessons", lessons)
+        init(self, "fixed", tuple(fixed))
+        init(self, "slot_index", {slot: i for i, slot in enumerate(self.slots)})
+        if capacities is None:
+            init(self, "rooms", tuple(rooms))
+            init(self, "capacities", None)
+        else:
+            pairs = sorted(zip(capacities, rooms), key=lambda pair: pair[0])
+            init(self, "capacities", tuple(capacity for capacity, _ in pairs))
+            init(self, "rooms", tuple(room for _, room in pairs))
+        init(self, "group_sizes", dict(group_sizes or {}))
+        init(self, "teacher_blocked", dict(teacher_blocked or {}))
+        init(self, "room_blocked", dict(room_blocked or {}))
+        init(self, "blocks", dict(blocks or {}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Problem is immutable; use replace({name}=...)")
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def replace(self, **changes):
+        """A copy with some constructor arguments changed (e.g. ``lessons`` and ``fixed``)."""
+        fields = {
+            "days": self.days,
+            "periods_per_day": self.periods_per_day,
+            "slots": self.slots,
+            "rooms": self.rooms,
+            "lessons": self.lessons,
+            "fixed": self.fixed,
+            "capacities": self.capacities,
+            "group_sizes": self.group_sizes,
+            "teacher_blocked": self.teacher_blocked,
+            "room_blocked": self.room_blocked,
+            "blocks": self.blocks,
+        }
+        fields.update(changes)
+        return Problem(**fields)
+
+    def slot_position(self, slot):
+        """Return ``(day, period_index)`` of a slot id, period index from 0."""
+        return divmod(self.slot_index[slot], self.periods_per_day)
+
+    def cells(self, placements):
+        """Yield ``(group, subject, teacher, slot, room)`` for fixed cells and placements."""
+        yield from self.fixed
+        lessons = self.lessons
+        for row, slot, room in placements:
+            yield lessons.group[row], lessons.subject[row], lessons.teacher[row], slot, room
+
+    def block_of(self, group, subject):
+        """``(length, per_day)`` of a mapping; ``(1, 0)`` for single periods."""
+        return self.blocks.get((group, subject), (1, 0))
+
+    def solver_options(self):
+        """Keyword arguments that make a solver capacity-, availability- and block-aware."""
+        options = {}
+        if self.capacities is not None:
+            options.update(capacities=self.capacities, sizes=self.group_sizes)
+        if self.teacher_blocked or self.room_blocked:
+            options.update(teacher_blocked=self.teacher_blocked, room_blocked=self.room_blocked)
+        if self.blocks:
+            options.update(blocks=self.blocks, periods_per_day=self.periods_per_day)
+        return options
@@ -0,0 +1,166 @@
+"""
+Seeded synthetic school data for demos and load tests.
+
+Teachers, rooms (with capacities), groups (with sizes), subjects and
+group–subject mappings are generated from a preset and a seed, then
+inserted with chunked bulk_create. ``tightness`` is the share of the
+slot × room supply that lesson demand should fill: 1.0 means every room is
+busy every period, so values near it make hard instances.
+
+Each teacher specialises in one course; a subject is a (course, teacher)
+pair shared by every group that teacher takes for that course, and
+teachers are loaded evenly so no one is booked past the week.
+"""
+import heapq
+import random
+
+from django.db import transaction
+
+from .models import Group, GroupSubject, Room, ScheduledPeriod, Subject, Teacher, TimetableSettings
+from .persistence import INSERT_BATCH_SIZE
+from .signals import deferred_timetable_bump
+from .viewmodel import DAY_NAMES
+
+PRESETS = {
+    "small-school": {"groups": 12, "teachers": 24, "rooms": 14, "subjects_per_group": 8, "periods": 6},
+    "college": {"groups": 50, "teachers": 80, "rooms": 55, "subjects_per_group": 8, "periods": 7},
+    "university": {"groups": 500, "teachers": 700, "rooms": 520, "subjects_per_group": 10, "periods": 8},
+}
+DEFAULT_PRESET = "small-school"
+DEFAULT_TIGHTNESS = 0.8
+
+COURSES = [
+    "Mathematics", "Physics", "Chemistry", "Biology", "English", "History", "Geography",
+    "Computer Science", "Economics", "Art", "Music", "Physical Education", "Philosophy",
+    "Literature", "Statistics", "French", "German", "Spanish", "Psychology", "Engineering",
+]
+GROUP_SIZES = (20, 25, 30, 35, 40, 60)
+ROOM_CAPACITIES = (30, 40, 60, 90)
+
+
+def _name(prefix, i, count):
+    return f"{prefix} {i + 1:0{len(str(count))}d}"
+
+
+def plan_sample_data(groups, teachers, rooms, subjects_per_group, periods, tightness=DEFAULT_TIGHTNESS, seed=None,
+                     departments=1):
+    """
+    Build unsaved model instances for a synthetic school.
+
+    With ``departments`` > 1 groups and teachers are dealt round-robin into
+    that many departments and groups are only taught by teachers of their
+    own, so departments share nothing but the rooms.
+
+    Returns ``(teachers, rooms, groups, subjects, mappings)`` where the
+    mappings are ``(group_index, subject_index, hours)`` triples.
+    """
+    rng = random.Random(seed)
+    slots = len(DAY_NAMES) * periods
+    subjects_per_group = max(1, min(subjects_per_group, slots))
+
+    teacher_objs = [Teacher(name=_name("Teacher", i, teachers)) for i in range(teachers)]
+    room_objs = [Room(name=_name("Room", i, rooms), capacity=rng.choice(ROOM_CAPACITIES)) for i in range(rooms)]
+    group_objs = [Group(name=_name("Group", i, groups), size=rng.choice(GROUP_SIZES)) for i in range(groups)]
+
+    # Weekly hours per group: its share of the demand, never more than the week.
+    demand = tightness * slots * rooms
+    group_hours = max(subjects_per_group, min(slots, round(demand / max(groups, 1))))
+
+    # Per-department, per-course heaps of (load, tie-break, teacher); entries go
+    # stale when a teacher is borrowed by another course and are corrected when popped.
+    departments = max(1, min(departments, teachers, groups))
+    staff = [range(d, teachers, departments) for d in range(departments)]
+    pools = {}
+    for t in range(teachers):
+        pools.setdefault((t % departments, COURSES[t // departments % len(COURSES)]), []).append((0, rng.random(), t))
+    load = [0] * teachers
+
+    def least_loaded(department, course):
+        heap = pools.get((department, course))
+        if not heap:
+            return min(staff[department], key=load.__getitem__)
+        while heap[0][0] != load[heap[0][2]]:
+            _, tie, t = heapq.heappop(heap)
+            heapq.heappush(heap, (load[t], tie, t))
+        return heap[0][2]
+
+    def add_load(t, hours):
+        load[t] += hours
+        heap = pools[t % departments, COURSES[t // departments % len(COURSES)]]
+        if heap[0][2] == t:
+            heapq.heapreplace(heap, (load[t], rng.random(), t))
+
+    subject_objs, subject_of, mappings = [], {}, []
+    for g in range(groups):
+        courses = rng.sample(COURSES, min(subjects_per_group, len(COURSES)))
+        base, extra = divmod(group_hours, len(courses))
+        department = g % departments
+        for k, course in enumerate(courses):
+            hours = base + (k < extra)
+            t = least_loaded(department, course)
+            if load[t] + hours > slots:
+                t = min(staff[department], key=load.__getitem__)
+            add_load(t, hours)
+            if (course, t) not in subject_of:
+                subject_of[course, t] = len(subject_objs)
+                subject_objs.append(Subject(name=f"{course} ({teacher_objs[t].name})", teacher=teacher_objs[t]))
+            mappings.append((g, subject_of[course, t], hours))
+
+    return teacher_objs, room_objs, group_objs, subject_objs, mappings
+
+
+@transaction.atomic
+def create_sample_data(preset=DEFAULT_PRESET, tightness=DEFAULT_TIGHTNESS, seed=None, flush=False, **overrides):
+    """
+    Insert a synthetic school for ``preset`` (fields can be overridden).
+
+    With ``flush`` existing teachers, rooms, groups, subjects and the saved
+    timetable are deleted first. Returns a dict of counts, the lesson
+    ``hours`` demanded, the slot × room ``supply`` and the ``tightness``
+    actually reached.
+    """
+    options = dict(PRESETS[preset], **{k: v for k, v in overrides.items() if v is not None})
+
+    if flush:
+        with deferred_timetable_bump():
+            ScheduledPeriod.objects.all().delete()
+            GroupSubject.objects.all().delete()
+            for model in (Subject, Group, Teacher, Room):
+                model.objects.all().delete()
+
+    settings = TimetableSettings.objects.first()
+    if settings is None:
+        settings = TimetableSettings.objects.create(periods_per_day=options["periods"])
+    elif settings.periods_per_day != options["periods"]:
+        settings.periods_per_day = options["periods"]
+        settings.save(update_fields=["periods_per_day"])
+
+    teachers, rooms, groups, subjects, mappings = plan_sample_data(
+        options["groups"], options["teachers"], options["rooms"], options["subjects_per_group"],
+        options["periods"], tightness=tightness, seed=seed, departments=options.get("departments") or 1,
+    )
+    Teacher.objects.bulk_create(teachers, batch_size=INSERT_BATCH_SIZE)
+    Room.objects.bulk_create(rooms, batch_size=INSERT_BATCH_SIZE)
+    Group.objects.bulk_create(groups, batch_size=INSERT_BATCH_SIZE)
+    Subject.objects.bulk_create(subjects, batch_size=INSERT_BATCH_SIZE)
+    GroupSubject.objects.bulk_create(
+        (
+            GroupSubject(group_id=groups[g].pk, subject_id=subjects[s].pk, hours_per_week=hours)
+            for g, s, hours in mappings
+        ),
+        batch_size=INSERT_BATCH_SIZE,
+    )
+    TimetableSettings.bump_data_version()
+
+    hours = sum(h for _, _, h in mappings)
+    supply = len(DAY_NAMES) * options["periods"] * len(rooms)
+    return {
+        "teachers": len(teachers),
+        "rooms": len(rooms),
+        "groups": len(groups),
+        "subjects": len(subjects),
+        "mappings": len(mappings),
+        "hours": hours,
+        "supply": supply,
+        "tightness": hours / supply if supply else 0,
+    }
@@ -0,0 +1,53 @@
+"""
+Soft-constraint scoring of a timetable.
+
+Hard constraints (no group, teacher or room double-booked) are guaranteed
+by the solvers; these penalties rank otherwise valid timetables. Lower is
+better.
+"""
+from collections import Counter, defaultdict
+
+SOFT_WEIGHTS = {
+    'teacher_gaps': 1,      # idle periods between a teacher's first and last lesson of a day
+    'subject_repeats': 2,   # extra lessons (a block counts once) of the same subject for a group on one day
+    'room_changes': 1,      # a group moving room between back-to-back periods
+}
+
+
+def soft_penalty(problem, placements):
+    """
+    Score the fixed cells of ``problem`` plus ``placements``.
+
+    Returns a dict with the raw count for each SOFT_WEIGHTS entry and the
+    weighted ``total``.
+    """
+    teacher_periods = defaultdict(list)
+    group_rooms = defaultdict(dict)
+    subject_days = Counter()
+
+    for group, subject, teacher, slot, room in problem.cells(placements):
+        day, period = problem.slot_position(slot)
+        teacher_periods[teacher, day].append(period)
+        group_rooms[group, day][period] = room
+        subject_days[group, subject, day] += 1
+
+    for (group, subject, day), hours in subject_days.items():
+        length = problem.block_of(group, subject)[0]
+        if length > 1:
+            subject_days[group, subject, day] = -(-hours // length)
+
+    counts = {
+        'teacher_gaps': sum(
+            max(periods) - min(periods) + 1 - len(periods)
+            for periods in teacher_periods.values()
+        ),
+        'subject_repeats': sum(n - 1 for n in subject_days.values() if n > 1),
+        'room_changes': sum(
+            1
+            for rooms in group_rooms.values()
+            for period, room in rooms.items()
+            if period + 1 in rooms and rooms[period + 1] != room
+        ),
+    }
+    counts['total'] = sum(SOFT_WEIGHTS[name] * value for name, value in counts.items())
+    return counts
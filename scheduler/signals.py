@@ -0,0 +1,49 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import post_delete, post_save
+
+from .models import (
+    Group, GroupSubject, Room, RoomUnavailability, Subject, Teacher, TeacherUnavailability, TimeSlot,
+    TimetableSettings,
+)
+from .timeslots import clear_timeslot_cache
+
+# Slots edited outside ensure_timeslot_grid (admin, shell) invalidate the cached grid.
+post_save.connect(clear_timeslot_cache, sender=TimeSlot, dispatch_uid="timeslot_saved")
+post_delete.connect(clear_timeslot_cache, sender=TimeSlot, dispatch_uid="timeslot_deleted")
+
+
+_deferred = threading.local()
+
+
+def bump_timetable_data(**kwargs):
+    if getattr(_deferred, "depth", 0):
+        _deferred.pending = True
+        return
+    TimetableSettings.bump_data_version()
+
+
+@contextmanager
+def deferred_timetable_bump():
+    """Collapse the per-row bumps of a bulk edit into one, made when the block exits."""
+    _deferred.depth = getattr(_deferred, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _deferred.depth -= 1
+        if not _deferred.depth and getattr(_deferred, "pending", False):
+            _deferred.pending = False
+            TimetableSettings.bump_data_version()
+
+
+# Everything the generator reads (and the names and period layout shown in
+# the cached timetable view) bumps the counters. Scheduled periods are not
+# hooked here: the generator bumps the generation itself, and a delete
+# receiver would stop Django from fast-deleting them in bulk.
+for model in (
+    Group, GroupSubject, Room, RoomUnavailability, Subject, Teacher, TeacherUnavailability, TimeSlot,
+    TimetableSettings,
+):
+    post_save.connect(bump_timetable_data, sender=model, dispatch_uid=f"{model.__name__}_saved")
+    post_delete.connect(bump_timetable_data, sender=model, dispatch_uid=f"{model.__name__}_deleted")
@@ -0,0 +1,148 @@
+"""
+Load the generator's input as one immutable Problem snapshot.
+
+Settings, the timeslot grid, lesson demand (with block lengths), rooms,
+group sizes and teacher and room availability are read with a handful of ``values_list`` queries
+into plain ids and arrays; availability windows are compiled here, once,
+into one slot bitmask per teacher and room. The
+snapshot is cached in Django's cache framework under a fingerprint of the
+input data, ``TimetableSettings.data_version`` plus the grid shape, which
+scheduler.signals bumps on every change to a model the generator reads.
+A cache hit costs the single settings query.
+"""
+from django.core.cache import cache
+
+from .lessons import LessonTable
+from .models import Group, GroupSubject, Room, RoomUnavailability, TeacherUnavailability, TimetableSettings
+from .problem import Problem, ProblemError
+from .timeslots import ensure_timeslot_grid
+from .viewmodel import CACHE_TIMEOUT
+
+DEFAULT_PERIODS = 6
+
+
+def problem_fingerprint(settings, days, periods_per_day):
+    """Key that changes whenever the data a snapshot was built from changes."""
+    if settings is None:
+        return None
+    return f"{settings.pk}:{settings.data_version}:{days}x{periods_per_day}"
+
+
+def load_problem(days=5, periods_per_day=None, use_cache=True):
+    """
+    Return the Problem for the stored data, from the cache when it is current.
+
+    ``periods_per_day`` is only used when no TimetableSettings row exists.
+    Raises ProblemError when the data cannot be scheduled at all.
+    """
+    settings = TimetableSettings.objects.first()
+    if settings:
+        periods_per_day = settings.periods_per_day
+    periods_per_day = periods_per_day or DEFAULT_PERIODS
+
+    fingerprint = problem_fingerprint(settings, days, periods_per_day)
+    key = f"scheduler:problem:{fingerprint}"
+    if use_cache and fingerprint:
+        problem = cache.get(key)
+        if problem is not None:
+            return problem
+
+    problem = build_problem(days, periods_per_day, settings.data_version if settings else None)
+    if use_cache and fingerprint:
+        cache.set(key, problem, CACHE_TIMEOUT)
+    return problem
+
+
+def describe_untaught(limit=5):
+    """Name the mapped subjects that have no teacher, with the groups taking them."""
+    rows = (
+        GroupSubject.objects.filter(subject__teacher__isnull=True)
+        .order_by('subject__name', 'group__name')
+        .values_list('subject__name', 'group__name')
+    )
+    groups_of = {}
+    for subject, group in rows:
+        groups_of.setdefault(subject, []).append(group)
+    details = [
+        f"'{subject}' ({', '.join(groups[:3])}{', ...' if len(groups) > 3 else ''})"
+        for subject, groups in list(groups_of.items())[:limit]
+    ]
+    if len(groups_of) > limit:
+        details.append(f"... and {len(groups_of) - limit} more")
+    return f"{len(groups_of)} subject(s) have no teacher assigned: " + "; ".join(details) + "."
+
+
+def describe_uneven_blocks(pairs, limit=5):
+    """Name the mappings whose weekly hours do not split into whole blocks."""
+    rows = GroupSubject.objects.filter(
+        group_id__in=[g for g, _ in pairs[:limit]], subject_id__in=[s for _, s in pairs[:limit]]
+    ).values_list('group_id', 'subject_id', 'group__name', 'subject__name', 'hours_per_week', 'block_length')
+    wanted = set(pairs[:limit])
+    details = [
+        f"'{subject}' for '{group}' ({hours}h in blocks of {length})"
+        for g, s, group, subject, hours, length in rows if (g, s) in wanted
+    ]
+    if len(pairs) > limit:
+        details.append(f"... and {len(pairs) - limit} more")
+    return (
+        f"{len(pairs)} mapping(s) have hours that are not a multiple of their block length: "
+        + "; ".join(details) + "."
+    )
+
+
+def blocked_masks(model, field, days, periods_per_day):
+    """Compile the unavailability rows of ``model`` into ``{<field> id: slot-index bitmask}``."""
+    masks = {}
+    windows = model.objects.filter(day__lt=days, first_period__lte=periods_per_day).values_list(
+        f'{field}_id', 'day', 'first_period', 'last_period'
+    )
+    for pk, day, first, last in windows:
+        first, last = max(first, 1), min(last or periods_per_day, periods_per_day)
+        if last >= first:
+            run = (1 << (last - first + 1)) - 1
+            masks[pk] = masks.get(pk, 0) | run << (day * periods_per_day + first - 1)
+    return masks
+
+
+def build_problem(days, periods_per_day, data_version=None):
+    """Read the database into a fresh Problem with no fixed cells (``data_version`` as loaded, if known)."""
+    slot_ids = ensure_timeslot_grid(days, periods_per_day, data_version)
+    if not slot_ids:
+        raise ProblemError("No timeslots available.")
+
+    lessons = LessonTable()
+    blocks = {}
+    untaught = False
+    uneven = []
+    mappings = GroupSubject.objects.values_list(
+        'group_id', 'subject_id', 'subject__teacher_id', 'hours_per_week', 'block_length', 'blocks_per_day'
+    )
+    for group_id, subject_id, teacher_id, hours, length, per_day in mappings:
+        length = length or 1
+        if teacher_id is None:
+            untaught = True
+        elif hours % length:
+            uneven.append((group_id, subject_id))
+        elif hours:
+            lessons.add(group_id, subject_id, teacher_id, hours)
+            if length > 1 or per_day:
+                blocks[group_id, subject_id] = (length, per_day or 0)
+    if untaught:
+        raise ProblemError(describe_untaught())
+    if uneven:
+        raise ProblemError(describe_uneven_blocks(uneven))
+    if not lessons:
+        raise ProblemError("No group-subject mappings found. Add subjects and groups first.")
+
+    room_capacity = dict(Room.objects.values_list('id', 'capacity'))
+    if not room_capacity:
+        raise ProblemError("No rooms found. Please add at least one room.")
+
+    return Problem(
+        days, periods_per_day, slot_ids, list(room_capacity), lessons,
+        capacities=list(room_capacity.values()),
+        group_sizes=dict(Group.objects.values_list('id', 'size')),
+        teacher_blocked=blocked_masks(TeacherUnavailability, 'teacher', days, periods_per_day),
+        room_blocked=blocked_masks(RoomUnavailability, 'room', days, periods_per_day),
+        blocks=blocks,
+    )
@@ -0,0 +1,628 @@
+"""
+Solver engines for timetable placement.
+
+The generator hands a solver a LessonTable (one row per group-subject
+mapping, with its hours per week), the list of slot keys and the list of
+room keys, plus optional ``fixed`` cells already taken by pinned lessons. A
+solver decides which slot and room every lesson hour gets and returns a
+SolveResult. Engines are pluggable through SOLVERS.
+
+With room ``capacities`` (parallel to the room keys) and group ``sizes``
+(group key → size) a group is only ever given a room that seats it, and
+the smallest such room free in the slot (best fit).
+
+``teacher_blocked`` and ``room_blocked`` (key → bitmask of slot indices)
+take a teacher's or room's unavailable slots out of every candidate set
+before the search starts.
+
+``blocks`` (``(group key, subject key)`` → ``(length, per_day)``, with
+``periods_per_day``) makes a row's hours ``length``-period blocks, each
+placed as one unit: in consecutive slots of one day, in one room, and at
+most ``per_day`` blocks of the row a day (0 = no limit). A row's hours
+must be a multiple of its block length.
+
+Engines also take ``hints`` (``(group key, subject key)`` → ``{slot key:
+room key}``): positions to keep where possible. A row tries the slots it
+held there before any other (for a block row, the starts whose whole block
+it held), and in such a slot the room it had if that room is free. Warm
+starts hint every lesson hour back to where the saved timetable had it.
+
+Engines accept an optional ``progress(placed, total)`` callback, called every
+PROGRESS_EVERY placements with the number of lesson hours placed so far,
+and an optional ``deadline`` (a ``time.monotonic()`` value): the
+backtracking search stops there and fills in what it can greedily, so it
+returns shortly after with ``timed_out`` set in its stats. The greedy
+engine makes a single pass and ignores it.
+"""
+import heapq
+import random
+import time
+from collections import Counter
+from itertools import chain
+
+from .lessons import AssignmentTable
+from .occupancy import OccupancyIndex, block_starts, capacity_classes, dense_index, iter_bits, lowest_bit
+
+PROGRESS_EVERY = 256
+
+
+class SolveResult:
+    """Outcome of a solver run.
+
+    ``placements`` is an AssignmentTable of ``(row, slot_key, room_key)``
+    holding the newly placed hours only (fixed cells are not repeated).
+    ``unplaced`` is a list of ``(row, hours, reason)`` for every lesson row
+    with hours the solver could not place; it is empty when ``complete``.
+    """
+
+    def __init__(self, placements, unplaced, stats=None):
+        self.placements = placements
+        self.unplaced = unplaced
+        self.stats = stats or {}
+        # Filled in by scheduler.multistart.run_attempt.
+        self.seed = None
+        self.penalty = None
+
+    @property
+    def complete(self):
+        return not self.unplaced
+
+
+def _build_index(table, slots, rooms, fixed, capacities=None, sizes=None,
+                 teacher_blocked=None, room_blocked=None):
+    """Densify ids and build an OccupancyIndex with the fixed cells taken.
+
+    ``fixed`` is an iterable of ``(group_key, subject_key, teacher_key,
+    slot_key, room_key)`` cells that must already be conflict-free.
+    Returns ``(index, row_group, row_teacher, row_class, rooms)``: the room
+    keys come back in index order, sorted by capacity when one is given,
+    and ``row_class`` is each row's capacity class. Blocked slots are
+    marked busy before the fixed cells are placed.
+    """
+    fixed = list(fixed)
+    groups = dense_index(chain(table.group, (f[0] for f in fixed)))
+    teachers = dense_index(chain(table.teacher, (f[2] for f in fixed)))
+    if capacities is None:
+        rooms = list(rooms)
+        floors, group_class = [0], [0] * len(groups)
+    else:
+        pairs = sorted(zip(capacities, rooms), key=lambda pair: pair[0])
+        rooms = [room for _, room in pairs]
+        floors, group_class = capacity_classes([c for c, _ in pairs], [sizes.get(g, 0) for g in groups])
+    index = OccupancyIndex(len(groups), len(teachers), len(rooms), len(slots), floors)
+    slot_index = {key: i for i, key in enumerate(slots)}
+    room_index = {key: i for i, key in enumerate(rooms)}
+    for key, mask in (teacher_blocked or {}).items():
+        if key in teachers:
+            index.block_teacher(teachers[key], mask)
+    for key, mask in (room_blocked or {}).items():
+        if key in room_index:
+            index.block_room(room_index[key], mask)
+    for group, _, teacher, slot, room in fixed:
+        index.place(groups[group], teachers[teacher], room_index[room], slot_index[slot])
+    row_group = [groups[g] for g in table.group]
+    return (
+        index,
+        row_group,
+        [teachers[t] for t in table.teacher],
+        [group_class[g] for g in row_group],
+        rooms,
+    )
+
+
+def _preferences(table, slots, rooms, hints, length):
+    """
+    Per row, the mask of slots ``hints`` puts it in (block starts, for a
+    block row) and ``{(row, slot index): room index}`` of the hinted rooms.
+    """
+    slot_index = {key: i for i, key in enumerate(slots)}
+    room_index = {key: i for i, key in enumerate(rooms)}
+    preferred, preferred_room = [0] * len(table), {}
+    for row, key in enumerate(zip(table.group, table.subject)):
+        held = 0
+        for slot, room in hints.get(key, {}).items():
+            if slot in slot_index:
+                s = slot_index[slot]
+                held |= 1 << s
+                if room in room_index:
+                    preferred_room[row, s] = room_index[room]
+        starts = held
+        for i in range(1, length[row]):
+            starts &= held >> i
+        preferred[row] = starts
+    return preferred, preferred_room
+
+
+class _BlockRules:
+    """
+    Block length and per-day limit of every lesson row, and the days a row
+    has used up.
+
+    Candidate starts for each block length are precomputed from the period
+    grid once; ``closed[row]`` masks the days where the row already has its
+    ``per_day`` blocks (counting fixed cells), so they drop out of its
+    candidates like busy slots do.
+    """
+
+    def __init__(self, index, table, blocks, slots, periods_per_day, fixed=()):
+        n_slots = len(slots)
+        self.periods = periods_per_day or n_slots
+        day = (1 << self.periods) - 1
+        self.day_masks = [day << start for start in range(0, n_slots, self.periods)]
+        rules = [blocks.get(key, (1, 0)) for key in zip(table.group, table.subject)]
+        self.length = [length for length, _ in rules]
+        self.per_day = [per_day for _, per_day in rules]
+        starts = {length: block_starts(n_slots, self.periods, length) for length in set(self.length)}
+        self.starts = [starts[length] for length in self.length]
+        for length in starts:
+            if length > 1:
+                index.track_blocks(length)
+        self.day_count = [[0] * len(self.day_masks) for _ in rules]
+        self.closed = [0] * len(rules)
+
+        limited = {key: row for row, key in enumerate(zip(table.group, table.subject)) if self.per_day[row]}
+        if limited:
+            slot_index = {key: i for i, key in enumerate(slots)}
+            hours = Counter()
+            for group, subject, _, slot, _ in fixed:
+                if (group, subject) in limited:
+                    hours[limited[group, subject], slot_index[slot] // self.periods] += 1
+            for (row, day), n in hours.items():
+                self.count(row, day * self.periods, -(-n // self.length[row]))
+
+    def count(self, row, slot, delta):
+        """Add ``delta`` blocks of ``row`` on the day of ``slot``."""
+        if not self.per_day[row]:
+            return
+        day = slot // self.periods
+        self.day_count[row][day] += delta
+        if self.day_count[row][day] >= self.per_day[row]:
+            self.closed[row] |= self.day_masks[day]
+        else:
+            self.closed[row] &= ~self.day_masks[day]
+
+    def free_starts(self, index, row, free, capacity_class):
+        """Slots the next block of ``row`` can start in; ``free`` is its ``free_slots`` mask."""
+        free &= ~self.closed[row]
+        if self.length[row] == 1:
+            return free
+        return index.free_starts(free, self.length[row], capacity_class, self.starts[row])
+
+
+# ---------------- GREEDY (legacy) ----------------
+class GreedySolver:
+    """The original random first-fit loop, kept for comparison."""
+
+    def __init__(self, seed=None, progress=None, hints=None, **options):
+        self.rng = random.Random(seed)
+        self.progress = progress
+        self.hints = hints
+
+    def solve(self, table, slots, rooms, fixed=(), capacities=None, sizes=None,
+              teacher_blocked=None, room_blocked=None, blocks=None, periods_per_day=None):
+        fixed = list(fixed)
+        index, row_group, row_teacher, row_class, rooms = _build_index(
+            table, slots, rooms, fixed, capacities, sizes, teacher_blocked, room_blocked
+        )
+        rules = _BlockRules(index, table, blocks, slots, periods_per_day, fixed) if blocks else None
+        if rules:
+            order = [row for row, hours in enumerate(table.hours) for _ in range(hours // rules.length[row])]
+        else:
+            order = list(table.units())
+        self.rng.shuffle(order)
+        preferred, preferred_room = [0] * len(table), {}
+        if self.hints:
+            lengths = rules.length if rules else [1] * len(table)
+            preferred, preferred_room = _preferences(table, slots, rooms, self.hints, lengths)
+        total = table.total_hours()
+
+        placements = AssignmentTable()
+        missing = {}
+        for row in order:
+            group, teacher, cls = row_group[row], row_teacher[row], row_class[row]
+            length = rules.length[row] if rules else 1
+            free = index.free_slots(group, teacher, cls)
+            if rules:
+                free = rules.free_starts(index, row, free, cls)
+            if not free:
+                missing[row] = missing.get(row, 0) + length
+                continue
+            s = self.rng.choice(list(iter_bits(free & preferred[row] or free)))
+            free_rooms = index.block_rooms(s, length, cls)
+            r = preferred_room.get((row, s), -1)
+            if r < 0 or not free_rooms >> r & 1:
+                r = self.rng.choice(list(iter_bits(free_rooms)))
+            for i in range(length):
+                index.place(group, teacher, r, s + i)
+                placements.append(row, slots[s + i], rooms[r])
+            if rules:
+                rules.count(row, s, 1)
+            if self.progress and len(placements) % PROGRESS_EVERY < length:
+                self.progress(len(placements), total)
+
+        unplaced = [
+            (row, hours, "no room seats the group" if index.floors[row_class[row]] >= index.n_rooms
+             else "no conflict-free slot found by the greedy pass")
+            for row, hours in sorted(missing.items())
+        ]
+        return SolveResult(placements, unplaced, {"checks": len(order)})
+
+
+# ---------------- BACKTRACKING (CSP) ----------------
+class BacktrackingSolver:
+    """
+    Constraint-propagation search over per-lesson slot domains.
+
+    Each lesson row is one variable that needs ``hours`` distinct slots (or,
+    for a block row, that many hours divided into blocks, one decision per
+    block). Its domain is the set of slots where its group and teacher are
+    free and a room is left (for a block, the starts where that holds for
+    the whole block in one room), read straight off the OccupancyIndex. After each placement
+    the rows sharing its group or teacher (or every row, once the slot runs
+    out of rooms) are forward-checked, and a row left with fewer slots than
+    hours triggers an immediate backtrack. Rows are picked
+    most-constrained-first. Once ``max_backtracks`` is spent the search
+    finishes greedily and reports the hours it could not place.
+    """
+
+    def __init__(self, seed=None, max_backtracks=2000, progress=None, deadline=None, hints=None, **options):
+        self.rng = random.Random(seed)
+        self.max_backtracks = max_backtracks
+        self.progress = progress
+        self.deadline = deadline
+        self.hints = hints
+        self.timed_out = False
+
+    def solve(self, table, slots, rooms, fixed=(), capacities=None, sizes=None,
+              teacher_blocked=None, room_blocked=None, blocks=None, periods_per_day=None):
+        rooms = self._setup(
+            table, slots, rooms, fixed, capacities, sizes, teacher_blocked, room_blocked, blocks, periods_per_day
+        )
+        # More hours than free slot x room cells can never fit; skip
+        # straight to the greedy pass so the report says what is left over.
+        if sum(self.group_left) > self.index.free_cells() or not self._search():
+            self._complete_greedily()
+
+        placements = AssignmentTable()
+        for unit, s in enumerate(self.slot_of):
+            if s >= 0:
+                row = self.unit_row[unit]
+                for i in range(self.length[row]):
+                    placements.append(row, slots[s + i], rooms[self.room_of[unit]])
+        unplaced = [
+            (row, left * self.length[row], self._explain(row))
+            for row, left in enumerate(self.left) if left
+        ]
+        stats = {
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "checks": self.checks,
+            "timed_out": int(self.timed_out),
+        }
+        return SolveResult(placements, unplaced, stats)
+
+    # --- state ---
+    def _setup(self, table, slots, rooms, fixed, capacities, sizes, teacher_blocked, room_blocked,
+               blocks, periods_per_day):
+        fixed = list(fixed)
+        self.index, self.row_group, self.row_teacher, self.row_class, rooms = _build_index(
+            table, slots, rooms, fixed, capacities, sizes, teacher_blocked, room_blocked
+        )
+        n = len(table)
+        n_groups = len(self.index.group_busy)
+        n_teachers = len(self.index.teacher_busy)
+        self.rules = _BlockRules(self.index, table, blocks, slots, periods_per_day, fixed) if blocks else None
+        self.length = self.rules.length if self.rules else [1] * n
+        self.preferred, self.preferred_room = [0] * n, {}
+        if self.hints:
+            self.preferred, self.preferred_room = _preferences(table, slots, rooms, self.hints, self.length)
+
+        # Lesson units (single hours, or blocks) of row r are offset[r] .. offset[r] + hours - 1.
+        self.hours = [hours // length for hours, length in zip(table.hours, self.length)]
+        self.left = list(self.hours)
+        self.offset = []
+        self.unit_row = []
+        for row, hours in enumerate(self.hours):
+            self.offset.append(len(self.unit_row))
+            self.unit_row.extend([row] * hours)
+        self.slot_of = [-1] * len(self.unit_row)
+        self.room_of = [-1] * len(self.unit_row)
+        self.skipped = [False] * n
+
+        self.by_group = [[] for _ in range(n_groups)]
+        self.by_teacher = [[] for _ in range(n_teachers)]
+        self.by_class = [[] for _ in self.index.floors]
+        self.blocks_by_class = [[] for _ in self.index.floors]
+        self.class_groups = [set() for _ in self.index.floors]
+        self.group_class = [0] * n_groups
+        self.group_left = [0] * n_groups
+        self.teacher_left = [0] * n_teachers
+        for row in range(n):
+            group, teacher = self.row_group[row], self.row_teacher[row]
+            self.by_group[group].append(row)
+            self.by_teacher[teacher].append(row)
+            self.by_class[self.row_class[row]].append(row)
+            if self.length[row] > 1:
+                self.blocks_by_class[self.row_class[row]].append(row)
+            self.class_groups[self.row_class[row]].add(group)
+            self.group_class[group] = self.row_class[row]
+            # Rows of a group no room seats can never be placed; set them
+            # aside up front so they do not wreck the search for the rest.
+            if self.index.floors[self.row_class[row]] >= self.index.n_rooms:
+                self.skipped[row] = True
+                continue
+            self.group_left[group] += table.hours[row]
+            self.teacher_left[teacher] += table.hours[row]
+        self.degree = [
+            len(self.by_group[self.row_group[row]]) + len(self.by_teacher[self.row_teacher[row]])
+            for row in range(n)
+        ]
+
+        self.trail = []
+        self.heap = []
+        for row in range(n):
+            self._push(row)
+
+        self.nodes = 0
+        self.backtracks = 0
+        self.checks = 0
+        return rooms
+
+    def _domain(self, row):
+        free = self.index.free_slots(self.row_group[row], self.row_teacher[row], self.row_class[row])
+        if self.rules is None:
+            return free
+        return self.rules.free_starts(self.index, row, free, self.row_class[row])
+
+    def _live(self, row):
+        return self.left[row] > 0 and not self.skipped[row]
+
+    def _push(self, row):
+        # Slack (free slots minus hours still needed) orders rows by how
+        # close they are to a wipeout.
+        size = self._domain(row).bit_count()
+        heapq.heappush(self.heap, (size - self.left[row], size, -self.degree[row], row))
+
+    def _select(self):
+        """Pop the unfinished row with the least slack."""
+        heap = self.heap
+        while heap:
+            slack, size, _, row = heapq.heappop(heap)
+            if not self._live(row) or size != self._domain(row).bit_count() or slack != size - self.left[row]:
+                continue
+            return row
+        return None
+
+    def _order(self, row):
+        candidates = list(iter_bits(self._domain(row)))
+        self.rng.shuffle(candidates)
+        preferred = self.preferred[row]
+        if preferred:
+            # Hinted slots first (a stable sort keeps the shuffle within each part).
+            candidates.sort(key=lambda s: not preferred >> s & 1)
+        return candidates
+
+    def _neighbours(self, row, s, r):
+        """Rows whose domain placing (or removing) a unit of ``row`` in room r from slot s changes."""
+        filled = set()
+        for i in range(self.length[row]):
+            filled.update(self.index.filled_classes(r, s + i))
+        if 0 in filled:
+            return range(len(self.left))
+        rows = self.by_group[self.row_group[row]] + self.by_teacher[self.row_teacher[row]]
+        for c in filled:
+            rows += self.by_class[c]
+        return rows
+
+    def _run_changes(self, runs):
+        """Block rows of the classes whose block-start room masks differ from ``runs``."""
+        rows = []
+        if runs is not None:
+            for (c, length), mask in self.index.runs.items():
+                if mask != runs[c, length]:
+                    rows += self.blocks_by_class[c]
+        return rows
+
+    def _counts_fit(self, group, teacher, s, r):
+        """Check that every touched group and teacher still has enough free slots.
+
+        Hours of one group (or one teacher) need distinct slots, so the
+        number still to place can never exceed the slots left to them.
+        """
+        index = self.index
+        filled = index.filled_classes(r, s)
+        if 0 in filled:
+            groups = range(len(self.group_left))
+            teachers = range(len(self.teacher_left))
+        else:
+            groups = {group}.union(*(self.class_groups[c] for c in filled))
+            teachers = (teacher,)
+        for g in groups:
+            open_slots = index.all_slots & ~index.full[self.group_class[g]]
+            if self.group_left[g] > (open_slots & ~index.group_busy[g]).bit_count():
+                return False
+        open_slots = index.all_slots & ~index.rooms_full
+        for t in teachers:
+            if self.teacher_left[t] > (open_slots & ~index.teacher_busy[t]).bit_count():
+                return False
+        return True
+
+    def _assign(self, row, s):
+        """Place the next unit of ``row`` from slot s and forward-check."""
+        self.nodes += 1
+        group, teacher, length = self.row_group[row], self.row_teacher[row], self.length[row]
+        runs = dict(self.index.runs) if self.rules else None
+        r = self._place(row, s)
+        if self.progress and self.nodes % PROGRESS_EVERY == 0:
+            self.progress(len(self.trail), len(self.unit_row))
+
+        ok = all(self._counts_fit(group, teacher, s + i, r) for i in range(length))
+        for j in chain(self._neighbours(row, s, r), self._run_changes(runs)):
+            if not self._live(j):
+                continue
+            self.checks += 1
+            self._push(j)
+            if self._domain(j).bit_count() < self.left[j]:
+                ok = False
+        return ok
+
+    def _place(self, row, s):
+        """Record the next unit of ``row`` at slot s, without forward checks; returns its room."""
+        group, teacher, length = self.row_group[row], self.row_teacher[row], self.length[row]
+        unit = self.offset[row] + self.hours[row] - self.left[row]
+        # The hinted room if it is free, else best fit: the smallest room
+        # that seats the group and is free for the whole unit.
+        free_rooms = self.index.block_rooms(s, length, self.row_class[row])
+        r = self.preferred_room.get((row, s), -1)
+        if r < 0 or not free_rooms >> r & 1:
+            r = lowest_bit(free_rooms)
+        for i in range(length):
+            self.index.place(group, teacher, r, s + i)
+        self.slot_of[unit] = s
+        self.room_of[unit] = r
+        self.left[row] -= 1
+        self.group_left[group] -= length
+        self.teacher_left[teacher] -= length
+        if self.rules:
+            self.rules.count(row, s, 1)
+        self.trail.append(unit)
+        return r
+
+    def _undo(self, mark):
+        trail = self.trail
+        while len(trail) > mark:
+            unit = trail.pop()
+            row = self.unit_row[unit]
+            s = self.slot_of[unit]
+            neighbours = self._neighbours(row, s, self.room_of[unit])
+            group, teacher, length = self.row_group[row], self.row_teacher[row], self.length[row]
+            runs = dict(self.index.runs) if self.rules else None
+            for i in range(length):
+                self.index.release(group, teacher, self.room_of[unit], s + i)
+            self.slot_of[unit] = -1
+            self.room_of[unit] = -1
+            self.left[row] += 1
+            self.group_left[group] += length
+            self.teacher_left[teacher] += length
+            if self.rules:
+                self.rules.count(row, s, -1)
+            for j in chain(neighbours, self._run_changes(runs)):
+                if self._live(j):
+                    self._push(j)
+
+    # --- search ---
+    def _out_of_time(self):
+        if self.deadline is not None and not self.timed_out and time.monotonic() >= self.deadline:
+            self.timed_out = True
+        return self.timed_out
+
+    def _search(self):
+        """Depth-first search with chronological backtracking.
+
+        Returns True once every hour is placed and False when the backtrack
+        budget or the time runs out or the problem is proven infeasible.
+        """
+        stack = []
+        while True:
+            if self._out_of_time():
+                return False
+            row = self._select()
+            if row is None:
+                return True
+            stack.append([row, self._order(row), 0, len(self.trail)])
+
+            while stack:
+                frame = stack[-1]
+                row, candidates, pos, mark = frame
+                placed = False
+                while pos < len(candidates):
+                    s = candidates[pos]
+                    pos += 1
+                    if self._assign(row, s):
+                        placed = True
+                        break
+                    self._undo(mark)
+                frame[2] = pos
+                if placed:
+                    break
+
+                stack.pop()
+                self.backtracks += 1
+                if self.backtracks > self.max_backtracks or not stack or self._out_of_time():
+                    return False
+                self._undo(stack[-1][3])
+            else:
+                return False
+
+    def _complete_greedily(self):
+        """Place what is still placeable without any further backtracking."""
+        while True:
+            if self._out_of_time():
+                self._first_fit()
+                return
+            row = self._select()
+            if row is None:
+                return
+            candidates = self._order(row)
+            if not candidates:
+                # Nothing left for this row; keep its missing hours out of
+                # the group/teacher counts so the rest is judged fairly.
+                self.skipped[row] = True
+                self.group_left[self.row_group[row]] -= self.left[row] * self.length[row]
+                self.teacher_left[self.row_teacher[row]] -= self.left[row] * self.length[row]
+                continue
+            for s in candidates:
+                mark = len(self.trail)
+                if self._assign(row, s):
+                    break
+                self._undo(mark)
+            else:
+                # Every slot starves a neighbour; take one anyway so this
+                # hour is not lost, and let the starved ones be reported.
+                self._assign(row, candidates[0])
+
+    def _first_fit(self):
+        """Out of time: put every remaining unit in its earliest free slot, with no look-ahead."""
+        for row in range(len(self.left)):
+            while self._live(row):
+                domain = self._domain(row)
+                if not domain:
+                    break
+                self._place(row, lowest_bit(domain & self.preferred[row] or domain))
+
+    def _explain(self, row):
+        group, teacher, cls = self.row_group[row], self.row_teacher[row], self.row_class[row]
+        index = self.index
+        if index.floors[cls] >= index.n_rooms:
+            return "no room seats the group"
+        n = index.n_slots
+        if self.length[row] > 1:
+            return (
+                f"no run of {self.length[row]} periods in one day with group, teacher and one fitting room "
+                f"all free (group busy {index.group_busy[group].bit_count()}/{n}, "
+                f"teacher busy {index.teacher_busy[teacher].bit_count()}/{n})"
+            )
+        return (
+            f"no slot with group, teacher and a fitting room all free "
+            f"(group busy {index.group_busy[group].bit_count()}/{n}, "
+            f"teacher busy {index.teacher_busy[teacher].bit_count()}/{n}, "
+            f"fitting rooms full {index.full[cls].bit_count()}/{n})"
+        )
+
+
+SOLVERS = {
+    "backtracking": BacktrackingSolver,
+    "greedy": GreedySolver,
+}
+
+DEFAULT_SOLVER = "backtracking"
+
+
+def get_solver(name=None, **options):
+    """Instantiate a solver engine by name."""
+    name = name or DEFAULT_SOLVER
+    try:
+        engine = SOLVERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown solver '{name}'. Choose from: {', '.join(sorted(SOLVERS))}.")
+    return engine(**options)
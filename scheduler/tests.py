@@ -1,3 +1,668 @@
+import io
+import time
+import zipfile
+from collections import Counter
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Sum
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .benchmark import compare, run_benchmark
+from .decompose import components, split_rooms
+from . import export
+from .feasibility import check_feasibility
+from .forms import TimetableSettingsForm
+from .generator import generate_timetable, save_diff
+from .importer import import_data
+from .jobs import STALE_AFTER, claim_generation_job, start_generation_job
+from .lessons import AssignmentTable, LessonTable
+from .multistart import rank, run_attempt, solve_multistart, solve_until
+from .models import (
+    GenerationJob, GenerationRun, Group, GroupSubject, Room, RoomUnavailability, ScheduledPeriod, Subject, Teacher,
+    TeacherUnavailability, TimeSlot, TimetableSettings,
+)
+from .occupancy import OccupancyIndex
+from .optimizer import improve
+from .problem import Problem
+from .snapshot import build_problem, load_problem
+from .solver import BacktrackingSolver
+from . import timeslots
+from .timeslots import clear_timeslot_cache, ensure_timeslot_grid
+from .viewmodel import CACHE_TIMEOUT
+from .warmstart import fixed_cells, repair, saved_positions
+
+
+
+class SolverTests(TestCase):
+    def test_backtracking_fills_a_tight_week_without_clashes(self):
+        # Twelve hours for twelve slot x room cells: every cell gets used.
+        lessons = LessonTable()
+        for group, teacher in [(1, 10), (1, 11), (2, 10), (2, 12), (3, 11), (3, 12)]:
+            lessons.add(group, len(lessons), teacher, 2)
+        for seed in range(5):
+            result = BacktrackingSolver(seed=seed).solve(lessons, range(6), [1, 2])
+            self.assertTrue(result.complete)
+            cells = set()
+            for row, slot, room in result.placements:
+                for cell in (("g", slot, lessons.group[row]), ("t", slot, lessons.teacher[row]), ("r", slot, room)):
+                    self.assertNotIn(cell, cells)
+                    cells.add(cell)
+            hours = Counter(row for row, _, _ in result.placements)
+            self.assertEqual([hours[row] for row in range(len(lessons))], list(lessons.hours))
+
+
+class OccupancyTests(TestCase):
+    def test_place_and_release_keep_masks_and_free_sets_consistent(self):
+        # Rooms 0-2 in capacity order; class 1 needs room 2, class 2 fits no room.
+        index = OccupancyIndex(2, 2, 3, 2, floors=(0, 2, 3))
+        self.assertEqual(index.full, [0, 0, 0b11])
+
+        index.place(0, 0, 2, 0)
+        self.assertEqual((index.group_busy, index.teacher_busy, index.room_busy), ([1, 0], [1, 0], [0, 0, 1]))
+        self.assertEqual(index.slot_rooms, [0b100, 0])
+        self.assertEqual(index.full, [0, 0b01, 0b11])
+        self.assertEqual(index.free_rooms(0), 0b011)
+        self.assertEqual(index.free_rooms(0, 1), 0)
+        self.assertEqual(index.free_slots(1, 1, 1), 0b10)
+        self.assertEqual(index.free_slots(0, 1), 0b10)
+        self.assertFalse(index.is_free(1, 1, 2, 0))
+
+        index.place(1, 1, 0, 0)
+        self.assertEqual(index.free_rooms(0), 0b010)
+        self.assertEqual(index.full[0], 0)
+        index.place(1, 0, 1, 1)
+        self.assertEqual(index.teacher_busy, [0b11, 0b01])
+        self.assertEqual(index.free_cells(), 3)
+
+        index.release(0, 0, 2, 0)
+        self.assertEqual(index.full, [0, 0, 0b11])
+        self.assertEqual(index.free_rooms(0, 1), 0b100)
+        index.release(1, 1, 0, 0)
+        index.release(1, 0, 1, 1)
+        fresh = OccupancyIndex(2, 2, 3, 2, floors=(0, 2, 3))
+        for mask in ("group_busy", "teacher_busy", "room_busy", "slot_rooms", "full"):
+            self.assertEqual(getattr(index, mask), getattr(fresh, mask), mask)
+
+class BenchmarkTests(TestCase):
+    """
+    Benchmark cases on the small-school dataset.
+
+    Timings are machine-dependent and only reported by the
+    ``benchmark_timetable`` command; these cases pin what must not regress
+    on any machine: every lesson placed and a bounded number of queries.
+    """
+
+    def setUp(self):
+        # Slot ids and snapshots cached by an earlier test point at rolled-back rows.
+        clear_timeslot_cache()
+        cache.clear()
+
+    def run_stages(self, *stages):
+        return {r["stage"]: r for r in run_benchmark(["small-school"], stages=stages, seed=0, repeat=1)}
+
+    def test_generate_places_every_lesson(self):
+        result = self.run_stages("generate")["generate"]
+        self.assertEqual(result["placement_rate"], 1.0)
+        self.assertLessEqual(result["queries"], 12)
+
+    def test_persist_is_bulk(self):
+        result = self.run_stages("persist")["persist"]
+        self.assertLessEqual(result["queries"], 8)
+
+    def test_home_and_pdf_queries_are_constant(self):
+        results = self.run_stages("home", "pdf")
+        self.assertLessEqual(results["home"]["queries"], 5)
+        self.assertLessEqual(results["pdf"]["queries"], 3)
+
+    def test_compare_flags_regressions(self):
+        baseline = [{"dataset": "d", "stage": "generate", "wall_s": 1.0, "peak_kib": 100,
+                     "queries": 10, "placement_rate": 1.0}]
+        same = [dict(baseline[0], wall_s=1.1)]
+        worse = [dict(baseline[0], wall_s=2.0, queries=11, placement_rate=0.9)]
+        self.assertEqual(compare(baseline, same), [])
+        self.assertEqual(len(compare(baseline, worse)), 3)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        clear_timeslot_cache()
+        cache.clear()
+        run_benchmark(["small-school"], stages=["persist"], seed=0, repeat=1)
+        self.settings = TimetableSettings.objects.get()
+        self.teachers = set(ScheduledPeriod.objects.active().values_list("teacher__name", flat=True))
+
+    def download(self, **params):
+        response = self.client.get(reverse("download_timetable_pdf"), {"by": "teacher", **params})
+        self.assertEqual(response.status_code, 200)
+        if not response.streaming:
+            return response.content
+        self.assertEqual(response["Content-Type"], "application/zip")
+        with zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content))) as archive:
+            return {name: archive.read(name) for name in archive.namelist()}
+
+    def test_zip_reuses_cached_pdfs_until_the_next_generation(self):
+        members = self.download(format="zip")
+        self.assertEqual(set(members), {f"teacher/{export._safe_filename(name)}.pdf" for name in self.teachers})
+        self.assertTrue(all(pdf.startswith(b"%PDF") for pdf in members.values()))
+
+        name = min(self.teachers)
+        member = f"teacher/{export._safe_filename(name)}.pdf"
+        cache.set(export._cache_key(self.settings, "teacher", name), b"cached", CACHE_TIMEOUT)
+        self.assertEqual(self.download(format="zip")[member], b"cached")
+
+        TimetableSettings.bump_data_version()
+        self.assertTrue(self.download(format="zip")[member].startswith(b"%PDF"))
+
+    def test_combined_pdf_is_cached_per_generation(self):
+        self.assertTrue(self.download().startswith(b"%PDF"))
+        cache.set(export._cache_key(self.settings, "teacher"), b"cached", CACHE_TIMEOUT)
+        self.assertEqual(self.download(), b"cached")
+        TimetableSettings.bump_data_version()
+        self.assertTrue(self.download().startswith(b"%PDF"))
+
+
+
+class RunReportTests(TestCase):
+    def setUp(self):
+        clear_timeslot_cache()
+        cache.clear()
+        run_benchmark(["small-school"], stages=["persist"], seed=0, repeat=1)
+
+    def test_recorded_runs_keep_their_step_profile(self):
+        demand = GroupSubject.objects.aggregate(hours=Sum("hours_per_week"))["hours"]
+        self.assertTrue(generate_timetable(seed=1, record=True)[0])
+        self.assertTrue(generate_timetable(seed=1, incremental=True, record=True)[0])
+
+        incremental, full = GenerationRun.objects.order_by("-pk")
+        for run, steps in ((full, ["load", "check", "solve", "save", "report"]),
+                           (incremental, ["load", "pin", "check", "solve", "save", "report"])):
+            self.assertEqual([step["name"] for step in run.steps], steps)
+            self.assertEqual((run.success, run.placed, run.total, run.seed), (True, demand, demand, 1))
+            self.assertEqual(run.queries, sum(step["queries"] for step in run.steps))
+            self.assertGreater(run.queries, 0)
+            self.assertGreaterEqual(run.duration, sum(step["seconds"] for step in run.steps) - 0.01)
+            self.assertEqual(run.report["placed"], run.placed)
+        self.assertEqual((full.incremental, incremental.incremental), (False, True))
+        self.assertGreater(full.checks, 0)
+
+class ApiTests(TestCase):
+    def setUp(self):
+        clear_timeslot_cache()
+        cache.clear()
+        run_benchmark(["small-school"], stages=["persist"], seed=0, repeat=1)
+
+    def test_teacher_timetable_revalidates_with_generation(self):
+        teacher = ScheduledPeriod.objects.active().values_list("teacher_id", flat=True).first()
+        url = reverse("teacher_timetable_api", args=[teacher])
+        response = self.client.get(url, {"day": "monday"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(p["day"] == "Monday" for p in response.json()["periods"]))
+
+        cached = self.client.get(url, {"day": "monday"}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+        TimetableSettings.bump_generation()
+        fresh = self.client.get(url, {"day": "monday"}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(fresh.status_code, 200)
+
+    def test_free_rooms_exclude_booked_rooms(self):
+        period = ScheduledPeriod.objects.active().exclude(room=None).select_related("timeslot").first()
+        response = self.client.get(reverse("free_rooms_api"), {"day": period.timeslot.day, "period": period.timeslot.period})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(period.room_id, [room["id"] for room in response.json()["rooms"]])
+        self.assertEqual(self.client.get(reverse("free_rooms_api"), {"day": "monday"}).status_code, 400)
+
+    def test_free_rooms_exclude_closed_rooms(self):
+        spare = Room.objects.create(name="Spare", capacity=500)  # never booked
+        RoomUnavailability.objects.create(room=spare, day=1, first_period=2, last_period=3)
+
+        def free(period):
+            response = self.client.get(reverse("free_rooms_api"), {"day": "tuesday", "period": period})
+            return [room["id"] for room in response.json()["rooms"]]
+
+        self.assertIn(spare.pk, free(1))
+        self.assertNotIn(spare.pk, free(2))
+        self.assertNotIn(spare.pk, free(3))
+        self.assertIn(spare.pk, free(4))
+
+
+class TimeslotTests(TestCase):
+    def test_grid_rebuilt_by_another_process_is_read_again(self):
+        TimetableSettings.objects.create(periods_per_day=3)
+        clear_timeslot_cache()
+        ids = ensure_timeslot_grid(1, 3)
+        stale = dict(timeslots._grid_cache)
+        ensure_timeslot_grid(1, 2)  # another process shrinks the grid
+        ensure_timeslot_grid(1, 3)  # and grows it back: period 3 gets a new id
+        timeslots._grid_cache.update(stale)  # this process never saw those signals
+
+        fresh = ensure_timeslot_grid(1, 3)
+        self.assertNotEqual(fresh[2], ids[2])
+        self.assertEqual(fresh, list(TimeSlot.objects.order_by("day", "period").values_list("id", flat=True)))
+
+
+class SettingsTests(TestCase):
+    def setUp(self):
+        clear_timeslot_cache()
+        cache.clear()
+        run_benchmark(["small-school"], stages=["persist"], seed=0, repeat=1)
+
+    def test_stale_settings_save_keeps_the_active_timetable(self):
+        stale = TimetableSettings.objects.get()  # loaded by a request before a generation finishes
+        self.assertTrue(generate_timetable(seed=1)[0])
+        current = TimetableSettings.objects.get()
+        self.assertGreater(current.active_version, stale.active_version)
+        rows = ScheduledPeriod.objects.active().count()
+
+        form = TimetableSettingsForm({"periods_per_day": stale.periods_per_day, "lunch_start": "12:00"}, instance=stale)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        stale.save()
+
+        saved = TimetableSettings.objects.get()
+        self.assertEqual(str(saved.lunch_start), "12:00:00")
+        self.assertEqual(saved.active_version, current.active_version)
+        # Saving settings may bump the cache counters (signals) but never winds them back.
+        self.assertGreaterEqual(saved.generation, current.generation)
+        self.assertGreaterEqual(saved.data_version, current.data_version)
+        self.assertEqual(ScheduledPeriod.objects.active().count(), rows)
+
+
+class IncrementalTests(TestCase):
+    def setUp(self):
+        clear_timeslot_cache()
+        cache.clear()
+        run_benchmark(["small-school"], stages=["persist"], seed=0, repeat=1)
+
+    def saved(self):
+        rows = ScheduledPeriod.objects.active().values_list(
+            "id", "group_id", "subject_id", "timeslot_id", "teacher_id", "room_id"
+        )
+        return {row[0]: row for row in rows}
+
+    def test_valid_rows_keep_ids_and_invalidated_ones_are_moved(self):
+        before = self.saved()
+        monday = set(TimeSlot.objects.filter(day=0).values_list("id", flat=True))
+        teacher = min(
+            {row[4] for row in before.values() if row[3] in monday},
+            key=lambda t: sum(row[4] == t for row in before.values()),
+        )
+        TeacherUnavailability.objects.create(teacher_id=teacher, day=0)
+
+        success, message = generate_timetable(seed=1, incremental=True)
+        self.assertTrue(success, message)
+        after = self.saved()
+        hit = {pk for pk, row in before.items() if row[4] == teacher and row[3] in monday}
+        self.assertTrue(hit)
+        for pk, row in before.items():
+            if pk not in hit:
+                self.assertEqual(after[pk], row)
+        moved = hit & after.keys()
+        self.assertIn(f"moved {len(moved)},", message)
+        self.assertTrue(moved)
+        for pk in moved:
+            self.assertEqual(after[pk][1:3], before[pk][1:3])
+            self.assertNotIn(after[pk][3], monday)
+        self.assertEqual(len(after), len(before))
+
+    def test_diff_never_collides_halfway(self):
+        rows = list(self.saved().values())
+        busy = {(row[3], row[4]) for row in rows}  # (slot, teacher)
+        # Two lessons of one group whose teachers are each free in the other's slot.
+        a, b = next(
+            (a, b) for a in rows for b in rows
+            if a[1] == b[1] and a[2] != b[2] and a[4] != b[4]
+            and (b[3], a[4]) not in busy and (a[3], b[4]) not in busy
+        )
+        demand = LessonTable()
+        demand.add(a[1], a[2], a[4], 1)
+        demand.add(b[1], b[2], b[4], 1)
+
+        def slots(mapping):
+            return sorted(row[3] for row in self.saved().values() if row[1:3] == mapping)
+
+        # Swap them: updating either row first would hit the other's group and room cells.
+        expected_a = sorted(set(slots(a[1:3])) - {a[3]} | {b[3]})
+        expected_b = sorted(set(slots(b[1:3])) - {b[3]} | {a[3]})
+        swapped = AssignmentTable()
+        swapped.append(0, b[3], b[5])
+        swapped.append(1, a[3], a[5])
+        with transaction.atomic():
+            changes = save_diff(demand, swapped, [a, b])
+        self.assertEqual(changes["unchanged"], 0)
+        self.assertEqual((slots(a[1:3]), slots(b[1:3])), (expected_a, expected_b))
+
+        # A lesson moved into a slot freed by a dropped lesson is updated in place.
+        rows = list(self.saved().values())
+        busy = {(row[3], row[4]) for row in rows}
+        moved, dropped = next(
+            (m, d) for m in rows for d in rows
+            if m[1] == d[1] and m[4] != d[4] and (d[3], m[4]) not in busy
+        )
+        ScheduledPeriod.objects.filter(pk=dropped[0]).delete()
+        moves = AssignmentTable()
+        moves.append(0, dropped[3], dropped[5])
+        demand = LessonTable()
+        demand.add(moved[1], moved[2], moved[4], 1)
+        changes = save_diff(demand, moves, [moved])
+        self.assertEqual((changes["updated"], changes["inserted"], changes["deleted"]), (1, 0, 0))
+        self.assertEqual(self.saved()[moved[0]][3:], dropped[3:4] + moved[4:5] + dropped[5:])
+
+
+class JobTests(TestCase):
+    def test_one_active_job_at_a_time(self):
+        job, created = claim_generation_job()
+        self.assertTrue(created)
+        again = start_generation_job(incremental=True)
+        self.assertEqual((again.pk, again.created), (job.pk, False))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            GenerationJob.objects.create(status=GenerationJob.RUNNING)  # another process skipping the guard
+
+        with self.assertRaisesMessage(CommandError, f"already queued (job #{job.pk})"):
+            call_command("generate_timetable", stdout=io.StringIO())
+
+        # A long run is only abandoned once its heartbeat stops, not by its age.
+        GenerationJob.objects.filter(pk=job.pk).update(created_at=timezone.now() - STALE_AFTER * 4)
+        self.assertEqual(claim_generation_job(), (job, False))
+        GenerationJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - STALE_AFTER * 2)
+        fresh, created = claim_generation_job()
+        self.assertTrue(created)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.success), (GenerationJob.FAILED, False))
+
+    def test_command_runs_as_a_job(self):
+        clear_timeslot_cache()
+        cache.clear()
+        run_benchmark(["small-school"], stages=["persist"], seed=0, repeat=1)
+        call_command("generate_timetable", "--seed", "1", stdout=io.StringIO())
+        job = GenerationJob.objects.get()
+        self.assertEqual((job.status, job.success), (GenerationJob.DONE, True))
+        self.assertEqual(job.placed, job.total)
+        self.assertGreaterEqual(job.heartbeat_at, job.started_at)  # beat with the final progress write
+
+        response = self.client.get(reverse("generation_job_status", args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], GenerationJob.DONE)
+        self.assertEqual(self.client.get(reverse("generation_job_status", args=[job.pk + 1])).status_code, 404)
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        clear_timeslot_cache()
+        cache.clear()
+        run_benchmark(["small-school"], stages=["persist"], seed=0, repeat=1)
+
+    def assert_rebuilt_after(self, edit):
+        version = TimetableSettings.objects.get().data_version
+        edit()
+        self.assertGreater(TimetableSettings.objects.get().data_version, version)
+        with CaptureQueriesContext(connection) as queries:
+            problem = load_problem()
+        self.assertGreater(len(queries), 1)  # a cache hit reads only the settings row
+        return problem
+
+    def test_edits_bump_data_version_and_rebuild_the_snapshot(self):
+        load_problem()
+        with self.assertNumQueries(1):
+            load_problem()
+
+        mapping = GroupSubject.objects.select_related("subject__teacher").first()
+        self.assert_rebuilt_after(mapping.subject.teacher.save)
+
+        mapping.hours_per_week = 1
+        problem = self.assert_rebuilt_after(mapping.save)
+        row = next(
+            row for row in range(len(problem.lessons))
+            if (problem.lessons.group[row], problem.lessons.subject[row]) == (mapping.group_id, mapping.subject_id)
+        )
+        self.assertEqual(problem.lessons.hours[row], 1)
+
+        room = Room.objects.first()
+        room.capacity = 999
+        problem = self.assert_rebuilt_after(room.save)
+        self.assertEqual(problem.capacities[problem.rooms.index(room.pk)], 999)
+
+
+class ConstraintTests(TestCase):
+    def test_database_rejects_double_bookings(self):
+        slot = TimeSlot.objects.create(day=0, period=1)
+        t1, t2 = Teacher.objects.create(name="T1"), Teacher.objects.create(name="T2")
+        g1, g2 = Group.objects.create(name="G1"), Group.objects.create(name="G2")
+        r1, r2 = Room.objects.create(name="R1"), Room.objects.create(name="R2")
+        subject = Subject.objects.create(name="S1")
+        ScheduledPeriod.objects.create(timeslot=slot, group=g1, subject=subject, teacher=t1, room=r1)
+
+        for clash in (
+            {"group": g1, "teacher": t2, "room": r2},
+            {"group": g2, "teacher": t1, "room": r2},
+            {"group": g2, "teacher": t2, "room": r1},
+        ):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                ScheduledPeriod.objects.create(timeslot=slot, subject=subject, **clash)
+
+        # A period without a room has no room to clash on, and other versions are separate timetables.
+        ScheduledPeriod.objects.create(timeslot=slot, group=g2, subject=subject, teacher=t2, room=None)
+        ScheduledPeriod.objects.create(timeslot=slot, group=g1, subject=subject, teacher=t1, room=r1, version=1)
+        self.assertEqual(ScheduledPeriod.objects.count(), 3)
+
+
+class ImportTests(TestCase):
+    def test_import_upserts_by_name_and_reports_bad_rows(self):
+        files = {
+            "teachers": (io.BytesIO(b"name\nAda\nGrace\n"), "teachers.csv"),
+            "groups": (io.BytesIO(b'{"name": "G1", "size": 25}\n{"name": "G2", "size": 0}\n'), "groups.jsonl"),
+            "subjects": (io.BytesIO(b"name,teacher\nMaths,Ada\nArt,Nobody\n"), "subjects.csv"),
+            "mappings": (io.BytesIO(b"group,subject,hours_per_week\nG1,Maths,4\nG1,Maths,5\n"), "mappings.csv"),
+        }
+        report = import_data(files)
+        self.assertEqual(report.counts["mappings"]["imported"], 1)
+        self.assertEqual([(e["kind"], e["line"]) for e in report.errors], [("groups", 2), ("subjects", 3)])
+        self.assertEqual(GroupSubject.objects.get().hours_per_week, 5)
+
+        import_data({"groups": (io.BytesIO(b"name,size\nG1,32\n"), "groups.csv")})
+        self.assertEqual(Group.objects.get(name="G1").size, 32)
+
+    def test_truncated_json_array_is_rejected_as_a_file(self):
+        report = import_data({"rooms": (io.BytesIO(b'[{"name": "R1", "capacity": 30},\n{"name": "R2"'), "rooms.json")})
+        self.assertEqual(report.imported, 0)
+        self.assertEqual(len(report.errors), 1)
+        self.assertIsNone(report.errors[0]["line"])
+        self.assertTrue(report.errors[0]["error"].startswith("Unreadable file rooms.json: Invalid JSON"))
+        self.assertFalse(Room.objects.exists())
+
+
+class FeasibilityTests(TestCase):
+    def problem(self, rows, capacities, sizes, days=1, periods=4):
+        lessons = LessonTable()
+        for row in rows:
+            lessons.add(*row)
+        slots = range(days * periods)
+        return Problem(days, periods, slots, range(len(capacities)), lessons, capacities=capacities, group_sizes=sizes)
+
+    def test_reports_each_violated_condition(self):
+        # group, subject, teacher, hours over 4 periods and two rooms seating 30 and 60.
+        problem = self.problem([(1, 1, 1, 3), (1, 2, 1, 2), (2, 3, 2, 3), (3, 4, 3, 1)], [30, 60], {1: 50, 2: 40, 3: 90})
+        checks = [(i["check"], i["id"]) for i in check_feasibility(problem)]
+        self.assertEqual(checks, [
+            ("peak", None), ("group_room", 3), ("capacity", None), ("capacity", None),
+            ("teacher_load", 1), ("group_load", 1),
+        ])
+
+    def test_feasible_instance_passes(self):
+        problem = self.problem([(1, 1, 1, 2), (2, 2, 2, 4)], [30, 60], {1: 50, 2: 20})
+        self.assertEqual(check_feasibility(problem), [])
+
+
+class DecomposeTests(TestCase):
+    def test_components_and_room_split(self):
+        lessons = LessonTable()
+        # Groups 1 and 2 share teacher 10; group 3 only has teacher 20.
+        for group, subject, teacher, hours in [(1, 1, 10, 2), (2, 2, 10, 2), (2, 3, 11, 1), (3, 4, 20, 4)]:
+            lessons.add(group, subject, teacher, hours)
+        self.assertEqual(components(lessons), [[0, 1, 2], [3]])
+
+        problem = Problem(1, 4, range(4), [1, 2, 3], lessons, capacities=[30, 30, 90], group_sizes={1: 20, 2: 20, 3: 80})
+        rooms = split_rooms(problem, components(lessons))
+        # Only the 90-seat room (position 2) seats group 3.
+        self.assertEqual(sorted(rooms[1]), [2])
+        self.assertEqual(sorted(rooms[0]), [0, 1])
+
+
+class CapacityTests(TestCase):
+    def test_group_never_gets_a_room_too_small(self):
+        lessons = LessonTable()
+        lessons.add(1, 1, 10, 2)  # 30 students
+        # Slot 0's big room is taken, so only the 10-seat room is free there.
+        fixed = [(2, 2, 11, 0, 2)]
+        problem = Problem(
+            1, 2, range(2), [1, 2], lessons, fixed=fixed, capacities=[10, 40], group_sizes={1: 30, 2: 30},
+        )
+        for solver in ("backtracking", "greedy"):
+            result = run_attempt(problem, solver, seed=1)
+            self.assertEqual([(slot, room) for _, slot, room in result.placements], [(1, 2)])
+            self.assertEqual([(row, hours) for row, hours, _ in result.unplaced], [(0, 1)])
+
+
+class AvailabilityTests(TestCase):
+    def test_unavailable_slots_are_never_used(self):
+        teacher = Teacher.objects.create(name="Part-timer")
+        Room.objects.create(name="R1")
+        closed = Room.objects.create(name="R2")
+        group = Group.objects.create(name="G1")
+        GroupSubject.objects.create(group=group, subject=Subject.objects.create(name="S1", teacher=teacher), hours_per_week=4)
+        TeacherUnavailability.objects.create(teacher=teacher, day=0)
+        RoomUnavailability.objects.create(room=closed, day=1, first_period=3)
+
+        # Two days of four periods: the teacher is off Monday, R2 closed Tuesday from period 3.
+        problem = build_problem(2, 4)
+        self.assertEqual(problem.teacher_blocked, {teacher.pk: 0b00001111})
+        self.assertEqual(problem.room_blocked, {closed.pk: 0b11000000})
+
+        result = run_attempt(problem, seed=1)
+        self.assertTrue(result.complete)
+        for _, slot, room_id in result.placements:
+            position = problem.slot_index[slot]
+            self.assertGreaterEqual(position, 4)
+            self.assertFalse(room_id == closed.pk and position >= 6)
+
+        problem = problem.replace(teacher_blocked={teacher.pk: 0b01111111})
+        self.assertEqual([i["check"] for i in check_feasibility(problem)], ["teacher_load"])
+
+
+class BlockTests(TestCase):
+    def test_blocks_are_consecutive_in_one_room_and_spread(self):
+        lessons = LessonTable()
+        lessons.add(1, 1, 10, 4)  # two 2-period labs, at most one a day
+        lessons.add(1, 2, 11, 3)
+        lessons.add(2, 3, 10, 2)
+        problem = Problem(
+            2, 4, range(8), [1, 2], lessons, capacities=[30, 30], group_sizes={1: 20, 2: 20}, blocks={(1, 1): (2, 1)},
+        )
+        result = run_attempt(problem, seed=3)
+        self.assertTrue(result.complete)
+
+        labs = sorted((slot, room) for row, slot, room in result.placements if row == 0)
+        self.assertEqual(len(labs), 4)
+        for (first, room), (second, other) in (labs[:2], labs[2:]):
+            self.assertEqual((second, other), (first + 1, room))
+        self.assertNotEqual(labs[0][0] // 4, labs[2][0] // 4)
+
+
+class MultistartTests(TestCase):
+    def test_best_attempt_is_kept(self):
+        lessons = LessonTable()
+        lessons.add(1, 1, 10, 3)
+        lessons.add(1, 2, 11, 2)
+        lessons.add(2, 3, 10, 2)
+        problem = Problem(1, 5, range(5), [1, 2], lessons)
+
+        best = solve_multistart(problem, seed=7, attempts=4, workers=1)
+        attempts = [run_attempt(problem, seed=seed) for seed in range(7, 11)]
+        self.assertEqual(best.stats["attempts"], 4)
+        self.assertEqual(rank(best), min(rank(result) for result in attempts))
+        self.assertEqual(best.seed, min(attempts, key=rank).seed)
+
+    def test_command_rejects_fewer_than_one_attempt(self):
+        for attempts in ("0", "-2"):
+            with self.assertRaisesMessage(CommandError, "--attempts must be at least 1."):
+                call_command("generate_timetable", "--attempts", attempts, stdout=io.StringIO())
+
+
+class OptimizerTests(TestCase):
+    def test_annealing_keeps_hard_constraints_and_never_worsens(self):
+        lessons = LessonTable()
+        for row, (group, teacher, hours) in enumerate([(1, 10, 3), (1, 11, 3), (2, 10, 2), (2, 12, 4), (3, 11, 4)]):
+            lessons.add(group, row, teacher, hours)
+        problem = Problem(
+            2, 5, range(10), [1, 2, 3], lessons, capacities=[20, 30, 40], group_sizes={1: 30, 2: 20, 3: 35},
+            teacher_blocked={12: 0b11111},
+        )
+        result = run_attempt(problem, seed=2)
+        self.assertTrue(result.complete)
+
+        placements, before, after = improve(problem, result.placements, 0.3, seed=2)
+        self.assertLessEqual(after["total"], before["total"])
+        self.assertEqual(len(placements), len(result.placements))
+        capacity = dict(zip(problem.rooms, problem.capacities))
+        cells = set()
+        for row, slot, room in placements:
+            group, teacher = lessons.group[row], lessons.teacher[row]
+            for cell in (("g", slot, group), ("t", slot, teacher), ("r", slot, room)):
+                self.assertNotIn(cell, cells)
+                cells.add(cell)
+            self.assertGreaterEqual(capacity[room], problem.group_sizes[group])
+            self.assertFalse(problem.teacher_blocked.get(teacher, 0) >> problem.slot_index[slot] & 1)
+        hours = Counter(row for row, _, _ in placements)
+        self.assertEqual([hours[row] for row in range(len(lessons))], list(lessons.hours))
+
+
+class TimeBudgetTests(TestCase):
+    def test_returns_best_so_far_when_the_deadline_passes(self):
+        lessons = LessonTable()
+        lessons.add(1, 1, 10, 3)
+        lessons.add(1, 2, 11, 3)  # six hours for one group in four slots: never complete
+        problem = Problem(1, 4, range(4), [1], lessons)
+
+        started = time.monotonic()
+        result = solve_until(problem, started + 0.2, seed=1)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(result.stats["timed_out"], 1)
+        self.assertGreater(result.stats["attempts"], 1)
+        self.assertEqual(len(result.placements), 4)
+
+        # A deadline already past still yields a (greedily filled) assignment.
+        easy = LessonTable()
+        easy.add(1, 1, 10, 2)
+        easy.add(2, 2, 11, 2)
+        result = run_attempt(problem.replace(lessons=easy, rooms=[1, 2]), seed=1, deadline=started)
+        self.assertEqual(result.stats["timed_out"], 1)
+        self.assertTrue(result.complete)
+
+
+class WarmStartTests(TestCase):
+    def test_hinted_slots_and_rooms_are_tried_first(self):
+        lessons = LessonTable()
+        lessons.add(1, 1, 10, 2)
+        problem = Problem(1, 4, range(4), [1, 2], lessons)
+        for solver in ("backtracking", "greedy"):
+            result = run_attempt(problem, solver, seed=1, hints={(1, 1): {1: 2, 3: 2}})
+            self.assertEqual(sorted((slot, room) for _, slot, room in result.placements), [(1, 2), (3, 2)])
+
+    def test_repair_releases_only_what_blocks_new_lessons(self):
+        lessons = LessonTable()
+        lessons.add(1, 2, 11, 1)  # new lesson; its teacher is only free in the first slot
+        pinned = [(100, 1, 1, 0, 10, 1), (101, 2, 3, 1, 12, 1)]  # (id, group, subject, slot, teacher, room)
+        problem = Problem(1, 2, range(2), [1, 2], lessons, fixed=fixed_cells(pinned), teacher_blocked={11: 0b10})
+        result = run_attempt(problem, seed=1)
+        self.assertFalse(result.complete)
 
-# Create your tests here.
+        problem, result, released = repair(problem, result, pinned, seed=1, hints=saved_positions(pinned))
+        self.assertTrue(result.complete)
+        self.assertEqual(released, [pinned[0]])
+        self.assertEqual(problem.fixed, tuple(fixed_cells(pinned[1:])))
+        placed = sorted((problem.lessons.subject[row], slot) for row, slot, _ in result.placements)
+        self.assertEqual(placed, [(1, 1), (2, 0)])
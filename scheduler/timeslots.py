@@ -0,0 +1,64 @@
+"""
+Day × period TimeSlot grid.
+
+The grid is read once, missing slots are bulk-inserted, slots past the
+current period count are pruned, and the resulting ids are cached in the
+process under ``TimetableSettings.data_version`` and the grid shape. A
+process that prunes slots bumps ``data_version``, so every other process
+(web workers, the CLI) misses its cached ids on the next call instead of
+handing out ids of deleted slots; inserting slots leaves cached ids valid. TimeSlots saved or
+deleted in this process also clear the cache (see scheduler.signals).
+"""
+from .models import TimeSlot, TimetableSettings
+
+_grid_cache = {}
+
+
+def data_version():
+    return TimetableSettings.objects.order_by('pk').values_list('data_version', flat=True).first() or 0
+
+
+def ensure_timeslot_grid(days=5, periods=6, version=None):
+    """
+    Make sure a TimeSlot exists for every day/period and return their ids.
+
+    Ids come back in day-major order, i.e. slot ``day * periods + period - 1``.
+    Slots with a period above ``periods`` are deleted (with their scheduled
+    periods). ``version`` is the current ``data_version`` when the caller
+    has already read it; a cache hit then costs no queries, otherwise one.
+    """
+    if version is None:
+        version = data_version()
+    key = (version, days, periods)
+    if key in _grid_cache:
+        return _grid_cache[key]
+
+    existing = {(day, period): pk for pk, day, period in TimeSlot.objects.values_list('id', 'day', 'period')}
+    missing = [
+        TimeSlot(day=day, period=period)
+        for day in range(days)
+        for period in range(1, periods + 1)
+        if (day, period) not in existing
+    ]
+    if missing:
+        # Another process may be filling the grid too; let the unique
+        # (day, period) constraint drop duplicates and read the ids back.
+        TimeSlot.objects.bulk_create(missing, ignore_conflicts=True)
+        existing = {(day, period): pk for pk, day, period in TimeSlot.objects.values_list('id', 'day', 'period')}
+
+    if any(period > periods for _, period in existing):
+        TimeSlot.objects.filter(period__gt=periods).delete()
+        # Tell every other process its cached grid (and snapshots) are gone;
+        # this process's ids are current as of the bump, whoever bumps next.
+        TimetableSettings.bump_data_version()
+        key = (version + 1, days, periods)
+
+    ids = [existing[day, period] for day in range(days) for period in range(1, periods + 1)]
+    _grid_cache.clear()
+    _grid_cache[key] = ids
+    return ids
+
+
+def clear_timeslot_cache(**kwargs):
+    """Forget the cached grid; usable directly as a signal receiver."""
+    _grid_cache.clear()
@@ -5,5 +5,11 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('regenerate/', views.regenerate_timetable, name='regenerate_timetable'),
+    path("import/", views.import_timetable_data, name="import_timetable_data"),
     path("download-pdf/", views.download_timetable_pdf, name="download_timetable_pdf"),
+    path("jobs/<int:job_id>/", views.generation_job_status, name="generation_job_status"),
+    path("api/groups/<int:group_id>/", views.group_timetable_api, name="group_timetable_api"),
+    path("api/teachers/<int:teacher_id>/", views.teacher_timetable_api, name="teacher_timetable_api"),
+    path("api/rooms/free/", views.free_rooms_api, name="free_rooms_api"),
+    path("api/rooms/<int:room_id>/", views.room_timetable_api, name="room_timetable_api"),
 ]
@@ -0,0 +1,105 @@
+"""
+Precomputed timetable view shared by the home page and the PDF export.
+
+The group → day → period grid and the period/break layout are built once
+per timetable generation and kept in Django's cache framework, keyed by
+``TimetableSettings.generation``. Anything that changes the timetable or
+what it shows bumps that counter (the generator, and scheduler.signals for
+edits made elsewhere), so stale entries are simply never read again.
+"""
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+
+from .models import ScheduledPeriod
+
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+# Lifetime of every cache entry the app writes (timetable views, PDFs,
+# problem snapshots); entries are keyed by counters and go stale by key first.
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+class PeriodCell:
+    """What one group has in one period, as plain names."""
+
+    __slots__ = ("subject", "teacher", "room")
+
+    def __init__(self, subject, teacher, room):
+        self.subject = subject
+        self.teacher = teacher
+        self.room = room
+
+    def __getstate__(self):
+        return (self.subject, self.teacher, self.room)
+
+    def __setstate__(self, state):
+        self.subject, self.teacher, self.room = state
+
+
+class TimetableView:
+    """``groups[group][day][period]`` cells plus the period/break layout."""
+
+    def __init__(self, generation, groups, layout):
+        self.generation = generation
+        self.groups = groups
+        self.layout = layout
+
+
+def build_period_layout(settings):
+    """Periods with their times, with short/lunch breaks slotted in after the period they follow."""
+    layout = []
+    period_times = settings.period_times or {}
+    lunch_start, lunch_end = settings.lunch_start, settings.lunch_end
+    short_start, short_end = settings.short_break_start, settings.short_break_end
+
+    default_start = datetime.combine(datetime.today(), time(9, 30))
+    for i in range(1, settings.periods_per_day + 1):
+        key = f"P{i}"
+        if key in period_times and isinstance(period_times[key], (list, tuple)):
+            start_str, end_str = period_times[key]
+        else:
+            start_dt = default_start + timedelta(hours=(i - 1))
+            end_dt = start_dt + timedelta(hours=1)
+            start_str, end_str = start_dt.strftime("%H:%M"), end_dt.strftime("%H:%M")
+
+        layout.append({"type": "period", "number": i, "time": f"{start_str} - {end_str}"})
+
+        if short_start and end_str == short_start.strftime("%H:%M"):
+            layout.append({
+                "type": "break",
+                "emoji": "☕",
+                "name": "Short Break",
+                "time": f"{short_start.strftime('%H:%M')} - {short_end.strftime('%H:%M')}",
+            })
+
+        if lunch_start and end_str == lunch_start.strftime("%H:%M"):
+            layout.append({
+                "type": "break",
+                "emoji": "🍱",
+                "name": "Lunch Break",
+                "time": f"{lunch_start.strftime('%H:%M')} - {lunch_end.strftime('%H:%M')}",
+            })
+    return layout
+
+
+def build_timetable_view(settings):
+    groups = {}
+    scheduled = ScheduledPeriod.objects.active().values_list(
+        "group__name", "timeslot__day", "timeslot__period", "subject__name", "teacher__name", "room__name",
+    ).order_by("group__name", "timeslot__day", "timeslot__period")
+    for group, day, period, subject, teacher, room in scheduled:
+        if group not in groups:
+            groups[group] = {d: {} for d in DAY_NAMES}
+        groups[group][DAY_NAMES[day]][period] = PeriodCell(subject, teacher, room)
+    return TimetableView(settings.generation, groups, build_period_layout(settings))
+
+
+def get_timetable_view(settings):
+    """Return the TimetableView for the current generation, building it on a cache miss."""
+    key = f"scheduler:timetable-view:{settings.pk}:{settings.generation}"
+    view = cache.get(key)
+    if view is None:
+        view = build_timetable_view(settings)
+        cache.set(key, view, CACHE_TIMEOUT)
+    return view
@@ -1,28 +1,19 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.http import HttpResponse
-from datetime import datetime, timedelta, time
-from django.db import IntegrityError
-from reportlab.lib.pagesizes import landscape, A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
 
 from .forms import (
     TeacherForm, SubjectForm, GroupForm, GroupSubjectForm,
     RoomForm, TimetableSettingsForm
 )
-from .models import Teacher, Subject, Group, GroupSubject, Room, ScheduledPeriod, TimeSlot, TimetableSettings
-from .generator import generate_timetable
-
-DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-
-
-# ---------------- ENSURE TIMESLOTS ----------------
-def ensure_timeslots(days=5, periods=6):
-    for d in range(days):
-        for p in range(1, periods + 1):
-            TimeSlot.objects.get_or_create(day=d, period=p)
+from .models import GroupSubject, TimetableSettings, GenerationJob, GenerationRun
+from . import api
+from .export import EXPORT_KINDS, combined_pdf, stream_zip
+from .importer import IMPORT_KINDS, import_data
+from .jobs import start_generation_job
+from .viewmodel import DAY_NAMES, get_timetable_view
 
 
 # ---------------- HOME VIEW ----------------
@@ -89,6 +80,8 @@ def home(request):
             group = mapping_form.cleaned_data.get("group") or new_group
             subject = mapping_form.cleaned_data.get("subject") or new_subject
             hours = mapping_form.cleaned_data.get("hours_per_week")
+            block_length = mapping_form.cleaned_data.get("block_length") or 1
+            blocks_per_day = mapping_form.cleaned_data.get("blocks_per_day")
 
             if group and subject:
                 teacher = getattr(subject, "teacher", None)
@@ -96,7 +89,8 @@ def home(request):
                     subject.teacher = new_teacher
                     subject.save()
                 GroupSubject.objects.update_or_create(
-                    group=group, subject=subject, defaults={"hours_per_week": hours}
+                    group=group, subject=subject,
+                    defaults={"hours_per_week": hours, "block_length": block_length, "blocks_per_day": blocks_per_day},
                 )
                 messages.success(
                     request,
@@ -119,61 +113,16 @@ def home(request):
             settings_instance.save()
             saved = True
 
-        # Generate timetable
-        if "generate" in request.POST:
-            ensure_timeslots(periods=settings_instance.periods_per_day)
-            try:
-                success, msg = generate_timetable()
-                messages.success(request, msg if success else "Failed to generate timetable.")
-            except Exception as e:
-                messages.error(request, f"Error generating timetable: {e}")
+        # Generate timetable ("generate" warm-starts from the saved week, "regenerate" starts over)
+        if "generate" in request.POST or "regenerate" in request.POST:
+            queue_generation(request, incremental="regenerate" not in request.POST)
             return redirect("home")
 
         messages.success(request, "Data saved successfully." if saved else "No valid data to save.")
         return redirect("home")
 
     # ---------- DISPLAY ----------
-    scheduled = ScheduledPeriod.objects.select_related("group", "subject", "teacher", "room", "timeslot")
-    structured = {}
-    for sp in scheduled:
-        gname = sp.group.name
-        dname = DAY_NAMES[sp.timeslot.day]
-        if gname not in structured:
-            structured[gname] = {d: {} for d in DAY_NAMES}
-        structured[gname][dname][sp.timeslot.period] = sp
-
-    period_with_breaks = []
-    period_times = settings_instance.period_times or {}
-    lunch_start = settings_instance.lunch_start
-    lunch_end = settings_instance.lunch_end
-    short_start = settings_instance.short_break_start
-    short_end = settings_instance.short_break_end
-
-    default_start = datetime.combine(datetime.today(), time(9, 30))
-    for i in range(1, settings_instance.periods_per_day + 1):
-        key = f"P{i}"
-        if key in period_times and isinstance(period_times[key], (list, tuple)):
-            start_str, end_str = period_times[key]
-        else:
-            start_dt = default_start + timedelta(hours=(i - 1))
-            end_dt = start_dt + timedelta(hours=1)
-            start_str, end_str = start_dt.strftime("%H:%M"), end_dt.strftime("%H:%M")
-
-        period_with_breaks.append({"type": "period", "number": i, "time": f"{start_str} - {end_str}"})
-
-        if short_start and end_str == short_start.strftime("%H:%M"):
-            period_with_breaks.append({
-                "type": "break",
-                "name": "☕ Short Break",
-                "time": f"{short_start.strftime('%H:%M')} - {short_end.strftime('%H:%M')}",
-            })
-
-        if lunch_start and end_str == lunch_start.strftime("%H:%M"):
-            period_with_breaks.append({
-                "type": "break",
-                "name": "🍱 Lunch Break",
-                "time": f"{lunch_start.strftime('%H:%M')} - {lunch_end.strftime('%H:%M')}",
-            })
+    timetable = get_timetable_view(settings_instance)
 
     context = {
         "teacher_form": teacher_form,
@@ -182,105 +131,181 @@ def home(request):
         "mapping_form": mapping_form,
         "room_form": room_form,
         "settings_form": settings_form,
-        "structured_timetable": structured,
-        "period_with_breaks": period_with_breaks,
+        "structured_timetable": timetable.groups,
+        "period_with_breaks": timetable.layout,
         "day_names": DAY_NAMES,
         "settings": settings_instance,
+        "generation_job": GenerationJob.objects.first(),
+        "last_run": GenerationRun.objects.first(),
+        "import_kinds": IMPORT_KINDS,
     }
     return render(request, "scheduler/home.html", context)
 
 
+# Seconds a generation started from the web pages may search before the
+# best timetable found so far is saved.
+INTERACTIVE_TIME_BUDGET = 2.0
+
+
+def queue_generation(request, incremental=False):
+    """Start a background generation job and tell the user about it."""
+    job = start_generation_job(
+        incremental=incremental, warm_start=incremental, time_budget=INTERACTIVE_TIME_BUDGET
+    )
+    if job.created:
+        messages.success(request, f"Timetable generation started (job #{job.pk}).")
+    else:
+        messages.warning(request, f"A timetable generation is already running (job #{job.pk}).")
+    return job
+
+
 # ---------------- REGENERATE TIMETABLE ----------------
 def regenerate_timetable(request):
     if request.method != "POST":
         return redirect("home")
-    settings = TimetableSettings.objects.first()
-    ensure_timeslots(periods=settings.periods_per_day if settings else 6)
-    try:
-        success, msg = generate_timetable()
-        messages.success(request, msg if success else "Timetable regeneration failed.")
-    except Exception as e:
-        messages.error(request, f"Error regenerating timetable: {e}")
+    queue_generation(request)
+    return redirect("home")
+
+
+# ---------------- GENERATION JOB STATUS ----------------
+def generation_job_status(request, job_id):
+    job = get_object_or_404(GenerationJob, pk=job_id)
+    return JsonResponse(job.to_dict())
+
+
+# ---------------- BULK IMPORT ----------------
+def import_timetable_data(request):
+    """
+    Import uploaded CSV/JSON Lines files, one field per kind (teachers, rooms, ...).
+
+    Answers with the JSON report when the client asks for JSON, otherwise
+    with messages on the home page. ``dry_run`` validates without saving.
+    """
+    if request.method != "POST":
+        return redirect("home")
+    files = {kind: (request.FILES[kind], request.FILES[kind].name) for kind in IMPORT_KINDS if kind in request.FILES}
+    wants_json = "application/json" in request.headers.get("Accept", "")
+    if not files:
+        if wants_json:
+            return JsonResponse({"error": "No files uploaded."}, status=400)
+        messages.warning(request, "Choose at least one file to import.")
+        return redirect("home")
+
+    report = import_data(files, dry_run=bool(request.POST.get("dry_run")))
+    if wants_json:
+        return JsonResponse(report.to_dict())
+    messages.success(request, report.summary())
+    for error in report.errors[:10]:
+        messages.warning(request, f"{error['kind']} line {error['line']}: {error['error']}")
     return redirect("home")
 
 
 # ---------------- DOWNLOAD PDF ----------------
 def download_timetable_pdf(request):
+    """
+    Download the timetable as PDF.
+
+    ``?by=group|teacher|room`` picks whose timetables are exported (groups by
+    default); ``?format=zip`` streams one PDF per group/teacher/room in a ZIP
+    instead of a single combined PDF. The combined PDF is built whole in
+    memory (reportlab lays out the document before writing it), so for
+    large schools the ZIP is the download that stays bounded.
+    """
     settings = TimetableSettings.objects.first()
     if not settings:
         messages.error(request, "No timetable found to export.")
         return redirect("home")
 
-    scheduled = ScheduledPeriod.objects.select_related("group", "subject", "teacher", "room", "timeslot")
-    structured = {}
-    for sp in scheduled:
-        gname = sp.group.name
-        dname = DAY_NAMES[sp.timeslot.day]
-        if gname not in structured:
-            structured[gname] = {d: {} for d in DAY_NAMES}
-        structured[gname][dname][sp.timeslot.period] = sp
-
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="timetable.pdf"'
-
-    doc = SimpleDocTemplate(response, pagesize=landscape(A4))
-    styles = getSampleStyleSheet()
-    cell_style = ParagraphStyle(name='cell', fontSize=9, leading=10, alignment=1)
-    elements = [Paragraph("Automatic Timetable", styles["Title"]), Spacer(1, 12)]
-
-    for group, days in structured.items():
-        elements.append(Paragraph(f"<b>{group}</b>", styles["Heading2"]))
-        data = [["Period", "Time"] + DAY_NAMES]
-        span_rows = []
-
-        period_times = settings.period_times or {}
-        lunch_start, lunch_end = settings.lunch_start, settings.lunch_end
-        short_start, short_end = settings.short_break_start, settings.short_break_end
-
-        for i in range(1, settings.periods_per_day + 1):
-            key = f"P{i}"
-            start, end = period_times.get(key, ["", ""])
-            row = [str(i), f"{start} - {end}"]
-            for d in DAY_NAMES:
-                val = days[d].get(i)
-                if val:
-                    text = f"{val.subject.name}<br/>{val.teacher.name}<br/>{val.room.name}"
-                    cell = Paragraph(text, cell_style)
-                else:
-                    cell = "-"
-                row.append(cell)
-            data.append(row)
-
-            # Add Short Break
-            if short_start and end == short_start.strftime("%H:%M"):
-                data.append(["☕", f"{short_start.strftime('%H:%M')} - {short_end.strftime('%H:%M')}", "Short Break"] + [""] * (len(DAY_NAMES) - 1))
-                span_rows.append(len(data) - 1)
-
-            # Add Lunch Break
-            if lunch_start and end == lunch_start.strftime("%H:%M"):
-                data.append(["🍱", f"{lunch_start.strftime('%H:%M')} - {lunch_end.strftime('%H:%M')}", "Lunch Break"] + [""] * (len(DAY_NAMES) - 1))
-                span_rows.append(len(data) - 1)
-
-        table = Table(data, repeatRows=1)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#1976d2")),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
-        ]))
-
-        # Merge (SPAN) break rows to align properly across columns
-        for row_index in span_rows:
-            table.setStyle(TableStyle([
-                ('SPAN', (2, row_index), (-1, row_index)),
-                ('BACKGROUND', (0, row_index), (-1, row_index), colors.HexColor("#FFF3CD")),
-                ('TEXTCOLOR', (0, row_index), (-1, row_index), colors.HexColor("#795548")),
-                ('ALIGN', (0, row_index), (-1, row_index), 'CENTER'),
-            ]))
-
-        elements.append(table)
-        elements.append(Spacer(1, 20))
-
-    doc.build(elements)
-    return response
\ No newline at end of file
+    kind = request.GET.get("by", "group")
+    if kind not in EXPORT_KINDS:
+        messages.error(request, f"Unknown export '{kind}'.")
+        return redirect("home")
+
+    if request.GET.get("format") == "zip":
+        response = StreamingHttpResponse(stream_zip(settings, kind), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="timetable-{kind}s.zip"'
+        return response
+
+    filename = "timetable.pdf" if kind == "group" else f"timetable-{kind}s.pdf"
+    response = HttpResponse(combined_pdf(settings, kind), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+# ---------------- JSON API ----------------
+def _api_settings(request):
+    """The settings row, read once per request for the validators and the view."""
+    if not hasattr(request, "_timetable_settings"):
+        request._timetable_settings = TimetableSettings.objects.first()
+    return request._timetable_settings
+
+
+def _api_etag(request, *args, **kwargs):
+    settings = _api_settings(request)
+    return f"{settings.pk}-{settings.generation}" if settings else None
+
+
+def _api_last_modified(request, *args, **kwargs):
+    settings = _api_settings(request)
+    return settings.updated_at if settings else None
+
+
+def _api_error(message, status=400):
+    return JsonResponse({"error": message}, status=status)
+
+
+def api_view(view):
+    """GET-only JSON view that clients must revalidate; unchanged timetables answer 304."""
+    view = condition(etag_func=_api_etag, last_modified_func=_api_last_modified)(view)
+    return require_GET(cache_control(no_cache=True)(view))
+
+
+def _entity_timetable(request, kind, pk):
+    settings = _api_settings(request)
+    if not settings:
+        return _api_error("No timetable found.", status=404)
+    model = api.ENTITY_MODELS[kind]
+    name = model.objects.filter(pk=pk).values_list("name", flat=True).first()
+    if name is None:
+        return _api_error(f"No {kind} with id {pk}.", status=404)
+    try:
+        day = api.parse_day(request.GET.get("day"))
+        period = api.parse_period(request.GET.get("period"), settings)
+    except ValueError as e:
+        return _api_error(str(e))
+    return JsonResponse(api.entity_timetable(settings, kind, name, pk, day, period))
+
+
+@api_view
+def group_timetable_api(request, group_id):
+    """``/api/groups/<id>/?day=&period=``: one group's lessons."""
+    return _entity_timetable(request, "group", group_id)
+
+
+@api_view
+def teacher_timetable_api(request, teacher_id):
+    """``/api/teachers/<id>/?day=&period=``: where one teacher is teaching."""
+    return _entity_timetable(request, "teacher", teacher_id)
+
+
+@api_view
+def room_timetable_api(request, room_id):
+    """``/api/rooms/<id>/?day=&period=``: what one room is booked for."""
+    return _entity_timetable(request, "room", room_id)
+
+
+@api_view
+def free_rooms_api(request):
+    """``/api/rooms/free/?day=&period=&min_capacity=``: rooms nobody uses in that slot."""
+    settings = _api_settings(request)
+    if not settings:
+        return _api_error("No timetable found.", status=404)
+    try:
+        day = api.parse_day(request.GET.get("day"))
+        period = api.parse_period(request.GET.get("period"), settings)
+        min_capacity = int(request.GET.get("min_capacity") or 0)
+    except ValueError as e:
+        return _api_error(str(e))
+    if day is None or period is None:
+        return _api_error("Both day and period are required.")
+    return JsonResponse(api.free_rooms(settings, day, period, min_capacity))
@@ -0,0 +1,99 @@
+"""
+Warm starts from the saved timetable.
+
+A warm start begins like an incremental run: every saved period still
+valid is pinned and only the new or invalidated lesson hours are solved,
+each hinted back to the slot and room it had (see ``hints`` in
+scheduler.solver), so it returns to its old place when that is still free.
+An incremental run stops there and reports what does not fit around the
+pinned periods; a warm start repairs it instead. The pinned periods of the
+groups and teachers with unplaced hours are released and solved again with
+them, hinted to where they were, and each further round also releases the
+periods of the groups and teachers just released, up to REPAIR_ROUNDS
+rounds. The result placing the most hours wins, with the fewest periods
+released breaking ties, so saved periods only move when that places more.
+
+Saved periods are ``(id, group_id, subject_id, timeslot_id, teacher_id,
+room_id)`` tuples, as pin_existing returns them.
+"""
+import time
+
+from .lessons import LessonTable
+from .multistart import run_attempt
+
+# Rounds of releasing pinned periods around what is still unplaced.
+REPAIR_ROUNDS = 3
+
+
+def saved_positions(periods, into=None):
+    """``{(group, subject): {slot: room}}`` of saved ``periods``, added to ``into`` when given."""
+    positions = into if into is not None else {}
+    for _, group_id, subject_id, slot_id, _, room_id in periods:
+        positions.setdefault((group_id, subject_id), {})[slot_id] = room_id
+    return positions
+
+
+def fixed_cells(periods):
+    """Saved ``periods`` in the solver's ``fixed`` form."""
+    return [
+        (group_id, subject_id, teacher_id, slot_id, room_id)
+        for _, group_id, subject_id, slot_id, teacher_id, room_id in periods
+    ]
+
+
+def unplaced_hours(result):
+    return sum(hours for _, hours, _ in result.unplaced)
+
+
+def repair(problem, result, pinned, solver=None, seed=None, hints=None, deadline=None, rounds=REPAIR_ROUNDS,
+           **options):
+    """
+    Release pinned periods around the hours ``result`` left unplaced and solve again.
+
+    ``problem`` is the one ``result`` solved, its ``fixed`` cells being the
+    saved ``pinned`` periods. Stops once a result is complete, nothing more
+    can be released, ``rounds`` are spent or ``deadline`` has passed.
+    Returns ``(problem, result, released)``: the best result, the problem it
+    solved (released hours added to its lessons) and the periods it released.
+    """
+    hints = dict(hints or {})
+    best = problem, result, []
+    released, groups, teachers = [], set(), set()
+    for _ in range(rounds):
+        if result.complete or (deadline and time.monotonic() >= deadline):
+            break
+        lessons = problem.lessons
+        for row, _, _ in result.unplaced:
+            groups.add(lessons.group[row])
+            teachers.add(lessons.teacher[row])
+        freed = [p for p in pinned if p[1] in groups or p[4] in teachers]
+        if not freed:
+            break
+        pinned = [p for p in pinned if not (p[1] in groups or p[4] in teachers)]
+        released = released + freed
+        groups.update(p[1] for p in freed)
+        teachers.update(p[4] for p in freed)
+        saved_positions(freed, into=hints)
+
+        problem = problem.replace(lessons=with_hours(lessons, freed), fixed=fixed_cells(pinned))
+        result = run_attempt(problem, solver, seed, None, hints=hints, deadline=deadline, **options)
+        if unplaced_hours(result) < unplaced_hours(best[1]):
+            best = problem, result, released
+    return best
+
+
+def with_hours(lessons, periods):
+    """A copy of ``lessons`` with one more hour per saved period (new rows for mappings not in it)."""
+    row_of = {}
+    table = LessonTable()
+    for row in range(len(lessons)):
+        key = lessons.group[row], lessons.subject[row]
+        row_of[key] = row
+        table.add(key[0], key[1], lessons.teacher[row], lessons.hours[row])
+    for _, group_id, subject_id, _, teacher_id, _ in periods:
+        row = row_of.get((group_id, subject_id))
+        if row is None:
+            row = row_of[group_id, subject_id] = len(table)
+            table.add(group_id, subject_id, teacher_id, 0)
+        table.hours[row] += 1
+    return table